@@ -8,6 +8,8 @@ import tempfile
 import pandas as pd
 import streamlit as st
 from document_crawler import critical_extraction, dependency_analysis, scn_aggregation
+from document_crawler.utils.pdf_backends import DEFAULT_ENGINE, engine_choices
+from document_crawler.utils.response_parser import parse_json_object
 
 # Set page configuration
 st.set_page_config(
@@ -28,6 +30,15 @@ page = st.sidebar.radio(
     ["Home", "Critical Information Extraction", "Software Dependency Analysis", "Software Change Notice Aggregation"]
 )
 
+# PDF engine selection (applies to extraction and SCN aggregation)
+st.sidebar.markdown("---")
+pdf_engine = st.sidebar.selectbox(
+    "PDF text engine",
+    options=engine_choices(),
+    index=engine_choices().index(DEFAULT_ENGINE),
+    help="Library used to read PDF text. Other engines are tried automatically if it fails or finds no text."
+)
+
 # Home page
 if page == "Home":
     st.header("Welcome to Document Crawler and Analyzer")
@@ -85,7 +96,7 @@ elif page == "Critical Information Extraction":
                     output_file = os.path.join(temp_dir, "extracted_data.csv")
                     
                     # Run the extraction
-                    critical_extraction.run(temp_dir, fields, output_file)
+                    critical_extraction.run(temp_dir, fields, output_file, engine=pdf_engine)
                     
                     # Display the results
                     if os.path.exists(output_file):
@@ -209,15 +220,9 @@ elif page == "Critical Information Extraction":
                                                                     st.text(raw_content)
                                                             else:
                                                                 # Try to extract JSON part
-                                                                import re
-                                                                json_match = re.search(r'(\{.*\})', raw_content, re.DOTALL)
-                                                                if json_match:
-                                                                    try:
-                                                                        json_data = json.loads(json_match.group(1))
-                                                                        st.json(json_data)
-                                                                    except Exception:
-                                                                        st.text(raw_content)
-                                                                else:
+                                                                try:
+                                                                    st.json(parse_json_object(raw_content))
+                                                                except ValueError:
                                                                     st.text(raw_content)
                                                         except Exception as file_error:
                                                             st.error(f"Error reading raw file: {str(file_error)}")
@@ -473,7 +478,8 @@ elif page == "Software Change Notice Aggregation":
                         software_name, 
                         current_version, 
                         target_version, 
-                        output_file
+                        output_file,
+                        engine=pdf_engine
                     )
                     
                     # Display the results
@@ -0,0 +1,4 @@
+"""
+Benchmark scripts for the Document Crawler and Analyzer.
+Run them from the repository root, e.g. ``python -m benchmarks.pdf_engines``.
+"""
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Benchmark dependency analysis on large synthetic master sheets.
+
+Generates a seeded master dependency sheet (software x versions x
+dependencies per release, acyclic) plus a current versions file, then times
+loading the sheet, compiling the DependencyGraph index, loading it back from
+its compiled snapshot and answering random upgrade queries from it with the
+transitive resolver. For a smaller number of queries, direct dependencies
+are also looked up both from the index and by the previous approach, which
+filtered the DataFrame with boolean masks for every lookup, and the two are
+compared. The queries are then answered again by analyze_batch on
+--workers processes. Finally, a chain of --chain packages in which each upgrade
+requires the next one is resolved, to time deep transitive upgrades:
+
+    python -m benchmarks.dependency_graph --software 5000 --versions 20 --deps 5 --queries 1000
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from document_crawler.dependency_analysis import DependencyAnalyzer, analyze_batch
+from document_crawler.utils.dependency_graph import DependencyGraph
+from document_crawler.utils.graph_snapshot import load_graph
+from document_crawler.utils.versions import sort_versions
+from document_crawler.utils.dependency_resolver import (DependencyConflict, DependencyResolver,
+                                                         ResolutionLimitExceeded)
+
+def generate_sheet(directory, software=1000, versions=10, deps=3, seed=0):
+    """
+    Write a synthetic master dependency sheet and current versions file.
+
+    Software i only depends on software with a lower index, so the graph is acyclic.
+    Each release requires 'X.Y+' of an existing version of each of its dependencies.
+
+    Args:
+        directory (str): Output directory.
+        software (int, optional): Number of software packages. Defaults to 1000.
+        versions (int, optional): Versions per package. Defaults to 10.
+        deps (int, optional): Dependencies per release. Defaults to 3.
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Returns:
+        tuple: (sheet path, current versions path, number of rows).
+    """
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    names = [f"Software{index:06d}" for index in range(software)]
+    version_names = [f"{index // 5 + 1}.{index % 5}" for index in range(versions)]
+    sheet_path = os.path.join(directory, "dependencies.csv")
+    rows = 0
+    with open(sheet_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["SoftwareName", "Version", "DependsOnSoftware", "DependsOnVersion"])
+        for index, name in enumerate(names):
+            for version in version_names:
+                candidates = rng.sample(range(index), min(deps, index)) if index else []
+                if not candidates:
+                    writer.writerow([name, version, "", ""])
+                    rows += 1
+                for dependency in candidates:
+                    writer.writerow([name, version, names[dependency], rng.choice(version_names) + "+"])
+                    rows += 1
+    current_path = os.path.join(directory, "current_versions.json")
+    with open(current_path, 'w') as f:
+        json.dump({name: rng.choice(version_names) for name in names}, f)
+    return sheet_path, current_path, rows
+
+def generate_chain(length):
+    """
+    Build a dependency chain in which upgrading each package requires upgrading the next.
+
+    Args:
+        length (int): Number of packages in the chain.
+
+    Returns:
+        tuple: (DependencyGraph, current versions dict); every package is installed at 1.0.
+    """
+    rows = []
+    for index in range(length):
+        name = f"Chain{index:06d}"
+        rows.append((name, "1.0", "", ""))
+        if index + 1 < length:
+            rows.append((name, "2.0", f"Chain{index + 1:06d}", "2.0+"))
+        else:
+            rows.append((name, "2.0", "", ""))
+    return DependencyGraph(rows), {f"Chain{index:06d}": "1.0" for index in range(length)}
+
+def legacy_analyze(analyzer, software, target_version):
+    """
+    Answer an upgrade query by filtering the DataFrame, as before the graph index.
+
+    Args:
+        analyzer (DependencyAnalyzer): Loaded analyzer (its DataFrame and helpers are used).
+        software (str): Software to upgrade.
+        target_version (str): Target version.
+
+    Returns:
+        dict: Required upgrades.
+    """
+    df = analyzer.dependencies_df
+    dependencies = df[(df['SoftwareName'] == software) & (df['Version'] == str(target_version))]
+    required_upgrades = {}
+    for _, row in dependencies.iterrows():
+        depends_on = row['DependsOnSoftware']
+        required_version = row['DependsOnVersion']
+        if not depends_on or depends_on not in analyzer.current_versions:
+            continue
+        current_version = analyzer.current_versions[depends_on]
+        if not analyzer._check_version_requirement(current_version, required_version):
+            all_requirements = dependencies[
+                dependencies['DependsOnSoftware'] == depends_on
+            ]['DependsOnVersion'].tolist()
+            all_versions = [str(v) for v in df[df['SoftwareName'] == depends_on]['Version'].unique()]
+            sorted_versions = sort_versions(all_versions)
+            selected = sorted_versions[-1] if sorted_versions else None
+            if analyzer.criteria == 'minimum_changes':
+                for version in sorted_versions:
+                    if all(analyzer._check_version_requirement(version, requirement)
+                           for requirement in all_requirements):
+                        selected = version
+                        break
+            required_upgrades[depends_on] = {'current_version': current_version, 'required_version': selected,
+                                             'required_by': f"{software} {target_version}"}
+    return required_upgrades
+
+def indexed_direct_analyze(analyzer, software, target_version):
+    """
+    Answer an upgrade query like legacy_analyze, checking only direct dependencies, from the graph index.
+
+    Args:
+        analyzer (DependencyAnalyzer): Loaded analyzer (its graph is used).
+        software (str): Software to upgrade.
+        target_version (str): Target version.
+
+    Returns:
+        dict: Required upgrades.
+    """
+    graph = analyzer.graph
+    requirements = graph.requirements_of(software, target_version)
+    required_upgrades = {}
+    for depends_on, required_version in requirements:
+        if not depends_on or depends_on not in analyzer.current_versions:
+            continue
+        current_version = analyzer.current_versions[depends_on]
+        if not analyzer._check_version_requirement(current_version, required_version):
+            all_requirements = [requirement for name, requirement in requirements if name == depends_on]
+            selected = graph.latest_version(depends_on)
+            if analyzer.criteria == 'minimum_changes':
+                matching = graph.matching_versions(depends_on, all_requirements)
+                if matching:
+                    selected = graph.versions_of(depends_on)[matching[0]]
+            required_upgrades[depends_on] = {'current_version': current_version, 'required_version': selected,
+                                             'required_by': f"{software} {target_version}"}
+    return required_upgrades
+
+def time_queries(func, queries):
+    """
+    Time a query function over a list of queries.
+
+    Args:
+        func (callable): Called with (software, target_version).
+        queries (list): (software, target_version) pairs.
+
+    Returns:
+        tuple: (total seconds, results).
+    """
+    start = time.perf_counter()
+    results = [func(software, version) for software, version in queries]
+    return time.perf_counter() - start, results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dependency analysis on large synthetic master sheets")
+    parser.add_argument("--software", type=int, default=5000, help="Software packages in the sheet")
+    parser.add_argument("--versions", type=int, default=20, help="Versions per package")
+    parser.add_argument("--deps", type=int, default=5, help="Dependencies per release")
+    parser.add_argument("--queries", type=int, default=1000, help="Random upgrade queries answered from the index")
+    parser.add_argument("--legacy-queries", type=int, default=20,
+                        help="Queries answered by the previous DataFrame-filtering approach (0 to skip)")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Processes for the batch run of the same queries (0 uses all CPU cores, 1 to skip)")
+    parser.add_argument("--chain", type=int, default=5000, help="Length of the deep upgrade chain (0 to skip)")
+    parser.add_argument("--criteria", default="minimum_changes", choices=["minimum_changes", "latest_available"])
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="docver-deps-")
+    start = time.perf_counter()
+    sheet_path, current_path, rows = generate_sheet(work_dir, args.software, args.versions, args.deps, args.seed)
+    print(f"Generated {rows} rows in {time.perf_counter() - start:.1f}s ({sheet_path})")
+
+    rng = random.Random(args.seed)
+    names = [f"Software{index:06d}" for index in range(args.software)]
+    start = time.perf_counter()
+    analyzer = DependencyAnalyzer(sheet_path, current_path, names[-1], "1.0", args.criteria, snapshot=False)
+    load_seconds = time.perf_counter() - start
+    # Compile the index again on its own to separate it from CSV parsing
+    start = time.perf_counter()
+    analyzer.graph = DependencyGraph.from_dataframe(analyzer.dependencies_df)
+    index_seconds = time.perf_counter() - start
+    # The first snapshot load parses the sheet and saves the snapshot, the second only reads it
+    start = time.perf_counter()
+    load_graph(sheet_path)
+    snapshot_save_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    load_graph(sheet_path)
+    snapshot_load_seconds = time.perf_counter() - start
+
+    queries = []
+    for _ in range(args.queries):
+        software = rng.choice(names)
+        queries.append((software, rng.choice(analyzer.graph.versions_of(software))))
+
+    failures = {"conflicts": [], "give_ups": []}
+
+    def indexed(software, version):
+        analyzer.software_to_upgrade, analyzer.target_version = software, version
+        try:
+            return analyzer.analyze()
+        except DependencyConflict:
+            # Random downgrades can conflict with installed dependents
+            failures["conflicts"].append((software, version))
+        except ResolutionLimitExceeded:
+            # The resolver ran out of steps without an answer either way
+            failures["give_ups"].append((software, version))
+        return None
+
+    indexed_seconds, indexed_results = time_queries(indexed, queries)
+    resolved = [result for result in indexed_results if result is not None]
+    results = {
+        "rows": rows,
+        "graph": analyzer.graph.stats(),
+        "load_seconds": round(load_seconds, 4),
+        "index_seconds": round(index_seconds, 4),
+        "snapshot_save_seconds": round(snapshot_save_seconds, 4),
+        "snapshot_load_seconds": round(snapshot_load_seconds, 4),
+        "queries": len(queries),
+        "query_seconds": round(indexed_seconds, 4),
+        "ms_per_query": round(indexed_seconds / len(queries) * 1000, 4) if queries else None,
+        "conflicts": len(failures["conflicts"]),
+        "give_ups": len(failures["give_ups"]),
+        "mean_upgrades": round(sum(len(result) for result in resolved) / len(resolved), 2) if resolved else None,
+    }
+    print(f"Load (CSV + index): {load_seconds:.2f}s, index build alone: {index_seconds:.2f}s")
+    print(f"Snapshot: first load with save {snapshot_save_seconds:.2f}s, later loads {snapshot_load_seconds:.2f}s "
+          f"({load_seconds / max(snapshot_load_seconds, 1e-9):.1f}x faster than the CSV)")
+    print(f"Indexed queries: {len(queries)} in {indexed_seconds:.3f}s ({results['ms_per_query']} ms/query), "
+          f"{results['mean_upgrades']} transitive upgrades per query, {results['conflicts']} conflicts, "
+          f"{results['give_ups']} give-ups")
+    if failures["give_ups"]:
+        print("Gave up on: " + ", ".join(f"{software} {version}" for software, version in failures["give_ups"]))
+
+    if args.workers != 1:
+        batch = [{"software": software, "target_version": version} for software, version in queries]
+        start = time.perf_counter()
+        batch_results = list(analyze_batch(analyzer, batch, workers=args.workers))
+        batch_seconds = time.perf_counter() - start
+        results.update(batch_workers=args.workers or os.cpu_count(), batch_seconds=round(batch_seconds, 4))
+        print(f"Batch of {len(batch)} queries on {results['batch_workers']} processes: {batch_seconds:.3f}s "
+              f"({indexed_seconds / max(batch_seconds, 1e-9):.1f}x the sequential rate, "
+              f"{sum(1 for result in batch_results if 'error' in result)} errors)")
+
+    if args.legacy_queries:
+        legacy_queries = queries[:args.legacy_queries]
+        # Both sides only look up direct dependencies, so the timings compare like with like
+        legacy_seconds, legacy_results = time_queries(lambda s, v: legacy_analyze(analyzer, s, v), legacy_queries)
+        direct_seconds, direct_results = time_queries(lambda s, v: indexed_direct_analyze(analyzer, s, v),
+                                                      legacy_queries)
+        mismatches = sum(1 for a, b in zip(direct_results, legacy_results) if a != b)
+        legacy_ms = legacy_seconds / len(legacy_queries) * 1000
+        direct_ms = direct_seconds / len(legacy_queries) * 1000
+        results.update(legacy_queries=len(legacy_queries), legacy_query_seconds=round(legacy_seconds, 4),
+                       legacy_ms_per_query=round(legacy_ms, 4), direct_ms_per_query=round(direct_ms, 4),
+                       legacy_mismatches=mismatches)
+        ratio = legacy_ms / max(direct_ms, 1e-9)
+        comparison = f"{ratio:.1f}x faster" if ratio >= 1 else f"{1 / max(ratio, 1e-9):.1f}x slower"
+        print(f"Direct-dependency lookups: index {direct_ms:.4f} ms/query, DataFrame filtering "
+              f"{legacy_ms:.4f} ms/query over {len(legacy_queries)} queries (index {comparison}); "
+              f"{mismatches} results differ")
+
+    if args.chain:
+        graph, current_versions = generate_chain(args.chain)
+        resolver = DependencyResolver(graph, current_versions, args.criteria)
+        start = time.perf_counter()
+        upgrades = resolver.resolve("Chain000000", "2.0")
+        chain_seconds = time.perf_counter() - start
+        results.update(chain_length=args.chain, chain_upgrades=len(upgrades), chain_seconds=round(chain_seconds, 4))
+        print(f"Deep chain: {len(upgrades)} transitive upgrades over {args.chain} packages "
+              f"resolved in {chain_seconds:.3f}s")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.json}")
+
+    if failures["give_ups"]:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Offline stand-in for an OpenAI-compatible chat completions API.
+
+The server answers `POST /v1/chat/completions` with canned responses shaped
+like the extraction and SCN schemas, after a simulated latency drawn from a
+configurable distribution. It can also inject server errors and rate-limit
+(429) responses, so throughput and tail latency of the pipeline can be
+measured without network access or API quota:
+
+    python -m benchmarks.mock_llm_server --port 8765 --latency lognormal:-1.5,0.6 --rate-limit-rate 0.02
+    DOCUMENT_CRAWLER_LLM_BASE_URL=http://127.0.0.1:8765/v1 python main.py extract ...
+
+Request counters are available from `GET /stats`.
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_PORT = 8765
+DEFAULT_MODEL = "mock-llm"
+
+_FIELDS_PATTERN = re.compile(r"Extract the following fields from the document: (.+?)\.\s*\n")
+_SCN_PATTERN = re.compile(r"Analyze the Software Change Notice \(SCN\) for (.+?) version (\S+?)\.\s*\n")
+_LIST_ITEM = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+(.+?)\s*$")
+
+_SCN_SECTIONS = [
+    ("new_features", ("feature", "new", "enhancement")),
+    ("resolved_issues", ("resolved", "fixed", "fix")),
+    ("known_issues", ("known", "open", "limitation")),
+]
+
+class LatencyModel:
+    """Random response delay drawn from a named distribution."""
+
+    def __init__(self, spec, rng):
+        """
+        Parse a latency specification.
+
+        Args:
+            spec (str): 'fixed:S', 'uniform:LOW,HIGH', 'normal:MEAN,STDDEV',
+                'lognormal:MU,SIGMA' or 'exponential:MEAN', in seconds.
+            rng (random.Random): Random number generator.
+
+        Raises:
+            ValueError: If the specification cannot be parsed.
+        """
+        name, _, params = spec.partition(":")
+        try:
+            values = [float(value) for value in params.split(",")] if params else []
+        except ValueError:
+            raise ValueError(f"Invalid latency parameters in '{spec}'")
+        samplers = {
+            "fixed": (1, lambda: values[0]),
+            "uniform": (2, lambda: rng.uniform(values[0], values[1])),
+            "normal": (2, lambda: rng.gauss(values[0], values[1])),
+            "lognormal": (2, lambda: rng.lognormvariate(values[0], values[1])),
+            "exponential": (1, lambda: rng.expovariate(1 / values[0]) if values[0] > 0 else 0.0),
+        }
+        if name not in samplers or len(values) != samplers[name][0]:
+            raise ValueError(f"Unknown latency distribution '{spec}'")
+        self.spec = spec
+        self._sample = samplers[name][1]
+
+    def sample(self):
+        """
+        Draw one delay.
+
+        Returns:
+            float: Delay in seconds (never negative).
+        """
+        return max(0.0, self._sample())
+
+def _document_content(prompt):
+    return prompt.split("Document content:", 1)[1] if "Document content:" in prompt else ""
+
+def extraction_answer(prompt):
+    """
+    Build an extraction response for a prompt.
+
+    Each requested field is filled from a 'Field: value' line of the document
+    when there is one, and 'Not Found' otherwise.
+
+    Args:
+        prompt (str): Rendered prompt.
+
+    Returns:
+        dict: Field name to value, or None if the prompt is not an extraction task.
+    """
+    match = _FIELDS_PATTERN.search(prompt)
+    if not match:
+        return None
+    fields = re.findall(r"'([^']+)'", match.group(1))
+    content = _document_content(prompt)
+    answer = {}
+    for field in fields:
+        value = re.search(rf"^\s*{re.escape(field)}\s*[:#]\s*(\S.*?)\s*$", content, re.IGNORECASE | re.MULTILINE)
+        answer[field] = value.group(1) if value else "Not Found"
+    return answer
+
+def scn_answer(prompt):
+    """
+    Build an SCN response for a prompt.
+
+    List items are taken from the document, grouped by the most recent
+    heading that looks like a features, resolved issues or known issues
+    section; a canned item is used for sections the document does not have.
+
+    Args:
+        prompt (str): Rendered prompt.
+
+    Returns:
+        dict: Lists under 'new_features', 'resolved_issues' and 'known_issues', or None
+            if the prompt is not an SCN task.
+    """
+    match = _SCN_PATTERN.search(prompt)
+    if not match:
+        return None
+    software, version = match.groups()
+    answer = {key: [] for key, _ in _SCN_SECTIONS}
+    section = None
+    for line in _document_content(prompt).splitlines():
+        item = _LIST_ITEM.match(line)
+        if item and section:
+            answer[section].append(item.group(1))
+            continue
+        lowered = line.lower()
+        for key, keywords in _SCN_SECTIONS:
+            if any(keyword in lowered for keyword in keywords) and len(line.strip()) < 60:
+                section = key
+                break
+    for key, items in answer.items():
+        if not items:
+            items.append(f"{key.replace('_', ' ').capitalize()[:-1]} in {software} {version}")
+    return answer
+
+def build_answer(prompt):
+    """
+    Build the response text for a prompt in the format CrewAI agents expect.
+
+    Args:
+        prompt (str): Rendered prompt (all message contents).
+
+    Returns:
+        str: Response text with a 'Final Answer:' section.
+    """
+    answer = extraction_answer(prompt) or scn_answer(prompt) or {"result": "Mock response"}
+    return "Thought: I now can give a great answer\nFinal Answer: " + json.dumps(answer, indent=2)
+
+class MockLLMServer(ThreadingHTTPServer):
+    """HTTP server holding the mock's configuration and request counters."""
+
+    daemon_threads = True
+
+    def __init__(self, address, latency, error_rate=0.0, rate_limit_rate=0.0, model=DEFAULT_MODEL,
+                 seed=None, quiet=True):
+        """
+        Create the server.
+
+        Args:
+            address (tuple): (host, port) to listen on.
+            latency (str): Latency specification, see LatencyModel.
+            error_rate (float, optional): Fraction of requests answered with a 500 error. Defaults to 0.0.
+            rate_limit_rate (float, optional): Fraction of requests answered with a 429. Defaults to 0.0.
+            model (str, optional): Model name reported in responses. Defaults to DEFAULT_MODEL.
+            seed (int, optional): Random seed for reproducible runs. Defaults to None.
+            quiet (bool, optional): Suppress per-request logging. Defaults to True.
+        """
+        super().__init__(address, MockLLMHandler)
+        self.rng = random.Random(seed)
+        self.latency = LatencyModel(latency, self.rng)
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.model = model
+        self.quiet = quiet
+        self.lock = threading.Lock()
+        self.counters = {"requests": 0, "ok": 0, "errors": 0, "rate_limited": 0}
+
+    def draw(self):
+        """
+        Decide the outcome and delay of one request.
+
+        Returns:
+            tuple: (outcome, delay) where outcome is 'ok', 'error' or 'rate_limited'.
+        """
+        with self.lock:
+            roll = self.rng.random()
+            delay = self.latency.sample()
+            if roll < self.rate_limit_rate:
+                outcome = "rate_limited"
+            elif roll < self.rate_limit_rate + self.error_rate:
+                outcome = "error"
+            else:
+                outcome = "ok"
+            self.counters["requests"] += 1
+            self.counters["ok" if outcome == "ok" else "errors" if outcome == "error" else "rate_limited"] += 1
+        return outcome, delay
+
+    def url(self):
+        """
+        Get the base URL clients should use.
+
+        Returns:
+            str: OpenAI-compatible base URL ending in /v1.
+        """
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    """Request handler implementing the chat completions subset used by the pipeline."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": self.server.model, "object": "model"}]})
+        elif self.path.rstrip("/") == "/stats":
+            with self.server.lock:
+                self._send_json(200, dict(self.server.counters))
+        else:
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}", "type": "not_found"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_json(400, {"error": {"message": "Invalid JSON body", "type": "invalid_request_error"}})
+            return
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}", "type": "not_found"}})
+            return
+
+        outcome, delay = self.server.draw()
+        time.sleep(delay)
+        if outcome == "rate_limited":
+            self._send_json(429, {"error": {"message": "Rate limit reached (mock)", "type": "rate_limit_exceeded",
+                                            "code": "rate_limit_exceeded"}},
+                            headers={"Retry-After": "1"})
+            return
+        if outcome == "error":
+            self._send_json(500, {"error": {"message": "Internal server error (mock)", "type": "server_error"}})
+            return
+
+        messages = request.get("messages", [])
+        prompt = "\n".join(str(message.get("content") or "") for message in messages)
+        content = build_answer(prompt)
+        prompt_tokens = len(prompt) // 4
+        completion_tokens = len(content) // 4
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        model = request.get("model") or self.server.model
+        if request.get("stream"):
+            self._send_stream(completion_id, model, content)
+            return
+        self._send_json(200, {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                         "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        })
+
+    def _send_stream(self, completion_id, model, content):
+        chunks = [
+            {"delta": {"role": "assistant", "content": content}, "finish_reason": None},
+            {"delta": {}, "finish_reason": "stop"},
+        ]
+        body = b""
+        for chunk in chunks:
+            payload = {"id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                       "model": model, "choices": [dict(chunk, index=0)]}
+            body += b"data: " + json.dumps(payload).encode("utf-8") + b"\n\n"
+        body += b"data: [DONE]\n\n"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+def start_server(host="127.0.0.1", port=0, **options):
+    """
+    Start a mock server in a background thread.
+
+    Args:
+        host (str, optional): Interface to listen on. Defaults to '127.0.0.1'.
+        port (int, optional): Port to listen on; 0 picks a free port. Defaults to 0.
+        **options: Keyword arguments for MockLLMServer (latency, error_rate, ...).
+
+    Returns:
+        MockLLMServer: The running server; call shutdown() to stop it.
+    """
+    options.setdefault("latency", "fixed:0")
+    server = MockLLMServer((host, port), **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline OpenAI-compatible mock LLM server")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to listen on")
+    parser.add_argument("--latency", default="lognormal:-1.5,0.6",
+                        help="Latency distribution: fixed:S, uniform:LOW,HIGH, normal:MEAN,STDDEV, "
+                             "lognormal:MU,SIGMA or exponential:MEAN (seconds)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests failing with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of requests rejected with 429")
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="Model name reported in responses")
+    parser.add_argument("--seed", type=int, help="Random seed for reproducible runs")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    server = MockLLMServer((args.host, args.port), args.latency, args.error_rate, args.rate_limit_rate,
+                           args.model, args.seed, quiet=not args.verbose)
+    print(f"Mock LLM server listening on {server.url()} (latency {args.latency}, "
+          f"errors {args.error_rate:.0%}, 429s {args.rate_limit_rate:.0%})")
+    print(f"Use it with: DOCUMENT_CRAWLER_LLM_BASE_URL={server.url()} python main.py ...")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Requests: {server.counters}")
+
+if __name__ == "__main__":
+    main()
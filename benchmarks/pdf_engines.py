@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark the available PDF text extraction engines on the sample corpora.
+"""
+import argparse
+import json
+import os
+import time
+
+from document_crawler.utils.pdf_backends import available_backends
+from document_crawler.utils.pdf_utils import list_pdf_files
+
+DEFAULT_CORPORA = ["sample_pdfs", "sample_scns", "pmt-hps-bw2024-08-uoc-eim-elcn-watchdog-timeout.pdf"]
+
+def collect_pdfs(paths):
+    """
+    Collect PDF files from a mix of folders and individual files.
+    
+    Args:
+        paths (list): Folder or file paths.
+        
+    Returns:
+        list: Paths to PDF files.
+    """
+    pdf_files = []
+    for path in paths:
+        if os.path.isdir(path):
+            pdf_files.extend(list_pdf_files(path))
+        elif path.lower().endswith('.pdf') and os.path.exists(path):
+            pdf_files.append(path)
+    return pdf_files
+
+def benchmark_backend(backend, pdf_files, repeat=3):
+    """
+    Time a backend over a list of PDF files.
+    
+    Args:
+        backend (PDFBackend): Backend to benchmark.
+        pdf_files (list): Paths to PDF files.
+        repeat (int, optional): Number of passes; the fastest is reported. Defaults to 3.
+        
+    Returns:
+        dict: Timing and volume statistics for the backend.
+    """
+    best = None
+    pages = chars = failures = 0
+    for _ in range(repeat):
+        pages = chars = failures = 0
+        start = time.perf_counter()
+        for pdf_file in pdf_files:
+            try:
+                for page_text in backend.iter_pages(pdf_file):
+                    pages += 1
+                    chars += len(page_text)
+            except Exception:
+                failures += 1
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return {
+        "engine": backend.name,
+        "version": backend.version,
+        "files": len(pdf_files),
+        "pages": pages,
+        "chars": chars,
+        "failures": failures,
+        "seconds": round(best, 4),
+        "pages_per_sec": round(pages / best, 1) if best else None,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare PDF text extraction engines")
+    parser.add_argument("paths", nargs="*", default=DEFAULT_CORPORA, help="PDF folders or files to benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="Passes per engine (fastest is reported)")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args()
+    
+    pdf_files = collect_pdfs(args.paths)
+    if not pdf_files:
+        print("No PDF files found")
+        return
+    
+    print(f"Benchmarking {len(pdf_files)} PDF files")
+    results = [benchmark_backend(backend, pdf_files, args.repeat) for backend in available_backends()]
+    
+    print(f"{'engine':<10} {'version':<12} {'pages':>7} {'chars':>10} {'fail':>5} {'seconds':>9} {'pages/s':>9}")
+    for result in results:
+        print(f"{result['engine']:<10} {result['version']:<12} {result['pages']:>7} {result['chars']:>10} "
+              f"{result['failures']:>5} {result['seconds']:>9} {result['pages_per_sec']:>9}")
+    
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.json}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of LLM response JSON recovery on adversarial outputs.
+
+Compares document_crawler.utils.response_parser with the previous recovery
+code (find/rfind trimming, a code fence regex and a four-level nested-brace
+regex) on long, brace-heavy and truncated responses of growing size. The
+previous parser runs in a child process that is stopped after a timeout.
+Also checks that the new parser's time grows linearly: the script exits
+with status 1 if its per-character cost at the largest size is more than
+--max-growth times the cost at the smallest.
+
+    python -m benchmarks.response_parser --sizes 1000 10000 100000 --json parser.json
+"""
+import argparse
+import json
+import multiprocessing
+import random
+import re
+import sys
+import time
+
+from document_crawler.utils.response_parser import parse_json_object
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+_VALID_OBJECT = '{"Invoice Number": "INV-2023-0042", "Total Amount": "$1,234.56", "Notes": "See {terms}"}'
+
+def _repeat_to(unit, size):
+    return (unit * (size // len(unit) + 1))[:size]
+
+def _unclosed_braces(size):
+    return "Thought: " + _repeat_to("{a ", size)
+
+def _deep_nesting(size):
+    depth = size // 8
+    return "Final Answer: " + '{"a": ' * depth + "1" + "}" * depth
+
+def _brace_noise(size):
+    rng = random.Random(size)
+    noise = "".join(rng.choice("{}ab \"") for _ in range(size))
+    return noise + " Final Answer: " + _VALID_OBJECT
+
+def _prose_then_object(size):
+    return _repeat_to("The {field} value {is} in {the} table. ", size) + _VALID_OBJECT + " I hope this helps."
+
+def _unterminated_fence(size):
+    return "```json\n{" + _repeat_to('"key": "value {", ', size)
+
+def _braces_in_strings(size):
+    value = _repeat_to("{}{{}}}{", size)
+    return json.dumps({"Notes": value, "Total Amount": "$10.00"}) + " trailing }"
+
+CASES = {
+    "unclosed_braces": _unclosed_braces,
+    "deep_nesting": _deep_nesting,
+    "brace_noise": _brace_noise,
+    "prose_then_object": _prose_then_object,
+    "unterminated_fence": _unterminated_fence,
+    "braces_in_strings": _braces_in_strings,
+}
+
+def legacy_parse(result_str):
+    """
+    The recovery logic the extraction task used before response_parser.
+
+    Args:
+        result_str (str): Raw response text.
+
+    Returns:
+        dict: The decoded object.
+
+    Raises:
+        ValueError: If no object could be recovered.
+    """
+    if not result_str.strip().startswith('{'):
+        start_idx = result_str.find('{')
+        end_idx = result_str.rfind('}')
+        if start_idx != -1 and end_idx != -1:
+            result_str = result_str[start_idx:end_idx+1]
+    if '}' in result_str and result_str.rfind('}') < len(result_str) - 1:
+        result_str = result_str[:result_str.rfind('}')+1]
+    try:
+        return json.loads(result_str)
+    except json.JSONDecodeError:
+        for block in re.findall(r'```(?:json)?\s*([\s\S]*?)```', result_str):
+            try:
+                return json.loads(block.strip())
+            except ValueError:
+                pass
+        json_pattern = r'\{(?:[^{}]|(?:\{(?:[^{}]|(?:\{(?:[^{}]|(?:\{[^{}]*\}))*\}))*\}))*\}'
+        matches = re.findall(json_pattern, result_str)
+        if matches:
+            return json.loads(max(matches, key=len))
+        raise
+
+def _time_call(func, text, repeat):
+    """
+    Time a parser on one input.
+
+    Args:
+        func (callable): Parser.
+        text (str): Input text.
+        repeat (int): Runs; the fastest is reported.
+
+    Returns:
+        tuple: (fastest seconds, True if an object was recovered).
+    """
+    best = None
+    ok = False
+    for _ in range(repeat):
+        start = time.perf_counter()
+        try:
+            ok = isinstance(func(text), dict)
+        except (ValueError, RecursionError):
+            ok = False
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, ok
+
+def _legacy_worker(case, size, repeat, queue):
+    queue.put(_time_call(legacy_parse, CASES[case](size), repeat))
+
+def time_legacy(case, size, repeat, timeout):
+    """
+    Time the previous parser in a child process, giving up after a timeout.
+
+    Args:
+        case (str): Case name from CASES.
+        size (int): Input size in characters.
+        repeat (int): Runs; the fastest is reported.
+        timeout (float): Seconds before the child is stopped.
+
+    Returns:
+        tuple: (fastest seconds or None on timeout, True if an object was recovered).
+    """
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_legacy_worker, args=(case, size, repeat, queue))
+    process.start()
+    process.join(timeout)
+    if process.is_alive():
+        process.terminate()
+        process.join()
+        return None, False
+    return queue.get() if not queue.empty() else (None, False)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark LLM response JSON recovery on adversarial outputs")
+    parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES, help="Input sizes in characters")
+    parser.add_argument("--cases", nargs="+", default=list(CASES), choices=list(CASES), help="Cases to run")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per input (fastest is reported)")
+    parser.add_argument("--legacy-timeout", type=float, default=10.0,
+                        help="Seconds before a run of the previous parser is stopped")
+    parser.add_argument("--no-legacy", action="store_true", help="Only time the new parser")
+    parser.add_argument("--max-growth", type=float, default=4.0,
+                        help="Allowed growth of the new parser's per-character cost from the smallest "
+                             "to the largest size")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    sizes = sorted(args.sizes)
+    results = []
+    print(f"{'case':<20} {'chars':>8} {'new ms':>9} {'ok':>3} {'legacy ms':>10} {'ok':>3}")
+    for case in args.cases:
+        legacy_timed_out = False
+        for size in sizes:
+            text = CASES[case](size)
+            seconds, ok = _time_call(parse_json_object, text, args.repeat)
+            legacy_seconds, legacy_ok = None, False
+            # Once the previous parser times out, larger inputs would too
+            if not args.no_legacy and not legacy_timed_out:
+                legacy_seconds, legacy_ok = time_legacy(case, size, args.repeat, args.legacy_timeout)
+                legacy_timed_out = legacy_seconds is None
+            legacy = f"{legacy_seconds * 1000:.2f}" if legacy_seconds is not None else (
+                "-" if args.no_legacy else f">{args.legacy_timeout * 1000:.0f}")
+            legacy_status = "-" if legacy_seconds is None else ("y" if legacy_ok else "n")
+            print(f"{case:<20} {len(text):>8} {seconds * 1000:>9.2f} {'y' if ok else 'n':>3} {legacy:>10} "
+                  f"{legacy_status:>3}")
+            results.append({"case": case, "chars": len(text), "seconds": seconds, "ok": ok,
+                            "legacy_seconds": legacy_seconds, "legacy_ok": legacy_ok})
+
+    # Linear time means a roughly constant cost per character across sizes
+    unbounded = []
+    for case in args.cases:
+        rows = [row for row in results if row["case"] == case]
+        first, last = rows[0], rows[-1]
+        growth = (last["seconds"] / last["chars"]) / max(first["seconds"] / first["chars"], 1e-12)
+        if len(rows) > 1 and growth > args.max_growth:
+            unbounded.append(f"{case} ({growth:.1f}x)")
+    if unbounded:
+        print(f"Per-character cost grew more than {args.max_growth}x for: {', '.join(unbounded)}")
+    else:
+        print(f"New parser: per-character cost within {args.max_growth}x across sizes for every case")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({"sizes": sizes, "results": results}, f, indent=2)
+        print(f"Results saved to {args.json}")
+
+    if unbounded:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
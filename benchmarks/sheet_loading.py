@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Benchmark loading large master dependency sheets.
+
+Writes a seeded synthetic sheet with benchmarks.dependency_graph, optionally
+sprinkled with ragged rows (rows with a missing trailing cell and rows with
+an extra cell), then loads it with the chunked categorical loader and with
+the previous loader, which read every line into a Python list and built the
+DataFrame from a list of rows. Each loader runs in its own spawned process,
+and the script reports rows/s, MB/s, the size of the loaded DataFrame and
+peak RSS:
+
+    python -m benchmarks.sheet_loading --software 20000 --versions 10 --deps 5 --ragged 100
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.dependency_graph import generate_sheet
+from benchmarks.throughput import _peak_rss_mb
+
+LOADERS = ("chunked", "previous")
+
+def add_ragged_rows(sheet_path, count, seed=0):
+    """
+    Add rows with a missing or an extra trailing cell to a sheet.
+
+    The first ragged row (a long one) goes right under the header, where an
+    extra cell can make a parser take the first column as the index; the
+    others are appended at the end.
+
+    Args:
+        sheet_path (str): Sheet written by generate_sheet.
+        count (int): Number of ragged rows; half are short, half are long.
+        seed (int, optional): Random seed. Defaults to 0.
+    """
+    rng = random.Random(seed)
+    rows = []
+    for index in range(count):
+        row = [f"Ragged{index:06d}", "1.0", f"Software{rng.randint(0, 9):06d}", "1.0+"]
+        rows.append(row[:3] if index % 2 else row + ["unexpected note"])
+    with open(sheet_path, 'r', newline='') as f:
+        lines = f.readlines()
+    with open(sheet_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        f.write(lines[0])
+        writer.writerows(rows[:1])
+        f.writelines(lines[1:])
+        writer.writerows(rows[1:])
+
+def previous_loader(csv_file):
+    """
+    The sheet loading the dependency analyzer used before the chunked loader.
+
+    Args:
+        csv_file (str): Path to the CSV file.
+
+    Returns:
+        pandas.DataFrame: The loaded CSV data.
+    """
+    import pandas as pd
+
+    try:
+        with open(csv_file, 'r') as f:
+            lines = [line.strip() for line in f if line.strip()]
+        reader = csv.reader(lines)
+        header = next(reader)
+        data = []
+        for row in reader:
+            while len(row) < len(header):
+                row.append('')
+            data.append(row)
+        df = pd.DataFrame(data, columns=header)
+        if 'Version' in df.columns:
+            df['Version'] = df['Version'].astype(str)
+        return df
+    except Exception as e:
+        print(f"Warning: Error in manual CSV parsing: {e}")
+        try:
+            df = pd.read_csv(csv_file, engine='python')
+        except Exception as e2:
+            print(f"Error parsing CSV with python engine: {e2}")
+            try:
+                # error_bad_lines was removed in pandas 2.0, so this last resort fails there
+                df = pd.read_csv(csv_file, engine='python', skiprows=0, error_bad_lines=False, warn_bad_lines=True)
+            except Exception as e3:
+                raise ValueError(f"Failed to parse CSV file: {e3}")
+        if 'Version' in df.columns:
+            df['Version'] = df['Version'].astype(str)
+        return df
+
+def _load(loader, sheet_path, chunk_rows):
+    """
+    Load the sheet with one loader (in a fresh worker process).
+
+    Args:
+        loader (str): Loader name from LOADERS.
+        sheet_path (str): Path to the sheet.
+        chunk_rows (int): Rows per chunk for the chunked loader.
+
+    Returns:
+        dict: Timing, memory and row alignment figures, or an error.
+    """
+    from document_crawler.utils.sheet_loader import read_master_sheet
+
+    baseline_mb = _peak_rss_mb()
+    start = time.perf_counter()
+    try:
+        if loader == "chunked":
+            df = read_master_sheet(sheet_path, chunk_rows)
+        else:
+            df = previous_loader(sheet_path)
+    except ValueError as e:
+        return {"loader": loader, "error": str(e)}
+    seconds = time.perf_counter() - start
+    names = df['SoftwareName'].astype(str)
+    return {
+        "loader": loader,
+        "rows": len(df),
+        # Rows whose columns were shifted no longer start with a generated software name
+        "misaligned_rows": int((~(names.str.startswith("Software") | names.str.startswith("Ragged"))).sum()),
+        "seconds": round(seconds, 3),
+        "dataframe_mb": round(df.memory_usage(deep=True).sum() / (1024 * 1024), 1),
+        "baseline_rss_mb": baseline_mb,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+def load_isolated(loader, sheet_path, chunk_rows):
+    """
+    Load the sheet in a freshly spawned process so its peak RSS is measured on its own.
+
+    Args:
+        loader (str): Loader name from LOADERS.
+        sheet_path (str): Path to the sheet.
+        chunk_rows (int): Rows per chunk for the chunked loader.
+
+    Returns:
+        dict: Loader results.
+    """
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        return executor.submit(_load, loader, sheet_path, chunk_rows).result()
+
+def main():
+    from document_crawler.utils.sheet_loader import DEFAULT_CHUNK_ROWS
+
+    parser = argparse.ArgumentParser(description="Benchmark loading large master dependency sheets")
+    parser.add_argument("--software", type=int, default=20000, help="Number of software packages")
+    parser.add_argument("--versions", type=int, default=10, help="Versions per package")
+    parser.add_argument("--deps", type=int, default=5, help="Dependencies per release")
+    parser.add_argument("--ragged", type=int, default=0, help="Ragged rows added to the sheet")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS, help="Rows per chunk")
+    parser.add_argument("--loaders", nargs="+", choices=LOADERS, default=list(LOADERS), help="Loaders to run")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        sheet_path, _, rows = generate_sheet(directory, args.software, args.versions, args.deps, args.seed)
+        if args.ragged:
+            add_ragged_rows(sheet_path, args.ragged, args.seed)
+        size_mb = os.path.getsize(sheet_path) / (1024 * 1024)
+        print(f"Generated {rows + args.ragged} rows ({size_mb:.1f} MB, {args.ragged} ragged) "
+              f"in {time.perf_counter() - start:.1f}s")
+        results = {"rows": rows + args.ragged, "ragged_rows": args.ragged, "size_mb": round(size_mb, 1),
+                   "loaders": []}
+
+        print(f"\n{'loader':<10} {'rows':>10} {'seconds':>8} {'rows/s':>10} {'MB/s':>7} "
+              f"{'frame MB':>9} {'RSS MB':>7}")
+        for loader in args.loaders:
+            result = load_isolated(loader, sheet_path, args.chunk_rows)
+            if "error" in result:
+                print(f"{loader:<10} failed: {result['error']}")
+            else:
+                seconds = max(result["seconds"], 1e-9)
+                result.update(rows_per_second=round(result["rows"] / seconds),
+                              mb_per_second=round(size_mb / seconds, 1))
+                print(f"{loader:<10} {result['rows']:>10} {result['seconds']:>8.2f} "
+                      f"{result['rows_per_second']:>10} {result['mb_per_second']:>7} "
+                      f"{result['dataframe_mb']:>9} {result['peak_rss_mb']:>7}")
+                if result["misaligned_rows"]:
+                    print(f"{'':<10} {result['misaligned_rows']} rows loaded with shifted columns")
+            results["loaders"].append(result)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.json}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Measure CLI startup time against a budget.
+
+Each command is run in a fresh interpreter with `python -X importtime`, so
+the report shows both the wall-clock time and the top-level imports that
+dominate it. The script exits with status 1 when a command is over budget.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Startup budget in seconds for the commands below
+DEFAULT_BUDGET = 1.0
+
+DEFAULT_COMMANDS = {
+    "--help": ["main.py", "--help"],
+    "extract --help": ["main.py", "extract", "--help"],
+    "analyze-deps": ["main.py", "analyze-deps", "--master-sheet", "sample_data/dependencies.csv",
+                     "--current", "sample_data/current_versions.json", "--software", "SoftwareA",
+                     "--target-version", "2.0"],
+    "cache stats --store text": ["main.py", "cache", "stats", "--store", "text"],
+}
+
+def parse_importtime(stderr, top=5):
+    """
+    Summarize the output of `python -X importtime`.
+
+    Args:
+        stderr (str): Standard error of the profiled process.
+        top (int, optional): Number of slowest top-level imports to report. Defaults to 5.
+
+    Returns:
+        tuple: (total import seconds, list of (module, seconds) for the slowest top-level imports).
+    """
+    top_level = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        if not cumulative.strip().isdigit():
+            continue
+        # Nested imports are indented under the module that triggered them
+        if name.startswith(" ") and not name.startswith("  "):
+            top_level.append((name.strip(), int(cumulative) / 1e6))
+    total = sum(seconds for _, seconds in top_level)
+    return total, sorted(top_level, key=lambda item: -item[1])[:top]
+
+def benchmark_command(name, argv, repeat=3):
+    """
+    Time a CLI command started in a fresh interpreter.
+
+    Args:
+        name (str): Display name of the command.
+        argv (list): Arguments passed to the interpreter.
+        repeat (int, optional): Number of runs; the fastest is reported. Defaults to 3.
+
+    Returns:
+        dict: Wall-clock and import timings for the command.
+    """
+    best = None
+    stderr = ""
+    returncode = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        completed = subprocess.run([sys.executable, "-X", "importtime"] + argv, cwd=REPO_ROOT,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+            stderr = completed.stderr
+            returncode = completed.returncode
+    import_seconds, slowest = parse_importtime(stderr)
+    return {
+        "command": name,
+        "returncode": returncode,
+        "seconds": round(best, 4),
+        "import_seconds": round(import_seconds, 4),
+        "slowest_imports": [{"module": module, "seconds": round(seconds, 4)} for module, seconds in slowest],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure CLI startup time against a budget")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per command (fastest is reported)")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET, help="Startup budget in seconds")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    results = [benchmark_command(name, argv, args.repeat) for name, argv in DEFAULT_COMMANDS.items()]
+
+    print(f"{'command':<26} {'seconds':>9} {'imports':>9} {'status':>7}  slowest imports")
+    over_budget = False
+    for result in results:
+        status = "ok" if result["seconds"] <= args.budget else "OVER"
+        if result["returncode"]:
+            status = "FAILED"
+        over_budget = over_budget or status != "ok"
+        slowest = ", ".join(f"{item['module']} {item['seconds']:.2f}s" for item in result["slowest_imports"][:3])
+        print(f"{result['command']:<26} {result['seconds']:>9} {result['import_seconds']:>9} {status:>7}  {slowest}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({"budget": args.budget, "results": results}, f, indent=2)
+        print(f"Results saved to {args.json}")
+
+    if over_budget:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+End-to-end throughput benchmark on a synthetic corpus.
+
+Generates (or reuses) a seeded corpus with create_sample_pdfs.py, starts the
+offline mock LLM server and measures, for each stage:
+
+- batch_extract_text: PDF text extraction only
+- extract: critical_extraction.run
+- aggregate-scn: scn_aggregation.run
+
+For the two task runs, the per-stage timings they record (text extraction,
+LLM calls, JSON recovery, output, ...) are included in the results.
+
+Each stage runs in a fresh process with caches disabled so its wall time,
+docs/sec, pages/sec and peak RSS are not affected by the other stages.
+Results are written as JSON and can be compared with a previous run:
+
+    python -m benchmarks.throughput --invoices 200 --scns 40 --json after.json --compare before.json
+"""
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.mock_llm_server import start_server
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_FIELDS = ["Invoice Number", "Date", "Total Amount", "Vendor"]
+
+STAGES = ["batch_extract_text", "extract", "aggregate-scn"]
+
+def _peak_rss_mb():
+    """
+    Peak resident set size of this process and its finished children.
+
+    Returns:
+        float: Peak RSS in MiB.
+    """
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return round(max(own, children) / scale, 1)
+
+def _run_stage(stage, corpus, options):
+    """
+    Run one benchmark stage (in a fresh worker process).
+
+    Args:
+        stage (str): Stage name from STAGES.
+        corpus (dict): Corpus description from generate_corpus.
+        options (dict): Benchmark options.
+
+    Returns:
+        dict: Timing, volume and memory figures for the stage.
+    """
+    from document_crawler.utils.pdf_utils import batch_extract_text, list_pdf_files
+
+    kinds = {"batch_extract_text": "invoice", "extract": "invoice", "aggregate-scn": "scn"}
+    documents = [document for document in corpus["documents"] if document["kind"] == kinds[stage]]
+    output_dir = options["output_dir"]
+    quiet = open(os.devnull, 'w') if not options["verbose"] else None
+
+    with contextlib.redirect_stdout(quiet) if quiet else contextlib.nullcontext():
+        start = time.perf_counter()
+        if stage == "batch_extract_text":
+            batch_extract_text(list_pdf_files(corpus["invoice_dir"]), workers=options["workers"],
+                               engine=options["engine"], cache=False)
+        elif stage == "extract":
+            from document_crawler import critical_extraction
+            critical_extraction.run(corpus["invoice_dir"], options["fields"],
+                                    os.path.join(output_dir, "extracted.csv"), workers=options["workers"],
+                                    engine=options["engine"], text_cache=False, llm_cache=False,
+                                    concurrency=options["concurrency"], fast_path=options["fast_path"],
+                                    full=True)
+        else:
+            from document_crawler import scn_aggregation
+            versions = corpus["versions"]
+            scn_aggregation.run(corpus["scn_dir"], corpus["software"], versions[0], versions[-1],
+                                os.path.join(output_dir, "aggregated.md"), workers=options["workers"],
+                                engine=options["engine"], text_cache=False, llm_cache=False,
+                                concurrency=options["concurrency"])
+        elapsed = time.perf_counter() - start
+    if quiet:
+        quiet.close()
+
+    # The task modules write their own per-stage timings next to their output
+    breakdown = {}
+    metrics_file = os.path.join(output_dir, {"extract": "extracted.metrics.json",
+                                             "aggregate-scn": "aggregated.metrics.json"}.get(stage, ""))
+    if os.path.isfile(metrics_file):
+        with open(metrics_file, 'r') as f:
+            breakdown = json.load(f)["stages"]
+
+    pages = sum(document["pages"] for document in documents)
+    return {
+        "stage": stage,
+        "docs": len(documents),
+        "pages": pages,
+        "seconds": round(elapsed, 4),
+        "docs_per_sec": round(len(documents) / elapsed, 2) if elapsed else None,
+        "pages_per_sec": round(pages / elapsed, 2) if elapsed else None,
+        "peak_rss_mb": _peak_rss_mb(),
+        "breakdown": breakdown,
+    }
+
+def run_stage_isolated(stage, corpus, options):
+    """
+    Run a stage in a freshly spawned process so its peak RSS is measured on its own.
+
+    Args:
+        stage (str): Stage name from STAGES.
+        corpus (dict): Corpus description.
+        options (dict): Benchmark options.
+
+    Returns:
+        dict: Stage results.
+    """
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        return executor.submit(_run_stage, stage, corpus, options).result()
+
+def compare_results(current, previous):
+    """
+    Print the change in throughput and memory against a previous result file.
+
+    Args:
+        current (dict): Current results.
+        previous (dict): Previous results loaded from JSON.
+    """
+    previous_stages = {stage["stage"]: stage for stage in previous.get("stages", [])}
+    print(f"\n{'stage':<20} {'docs/s before':>14} {'after':>10} {'change':>8} {'RSS before':>11} {'after':>8}")
+    for stage in current["stages"]:
+        before = previous_stages.get(stage["stage"])
+        if not before or not before.get("docs_per_sec") or not stage.get("docs_per_sec"):
+            continue
+        change = stage["docs_per_sec"] / before["docs_per_sec"] - 1
+        print(f"{stage['stage']:<20} {before['docs_per_sec']:>14} {stage['docs_per_sec']:>10} {change:>+8.0%} "
+              f"{before['peak_rss_mb']:>11} {stage['peak_rss_mb']:>8}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput benchmark on a synthetic corpus with a mock LLM")
+    parser.add_argument("--corpus", help="Existing synthetic corpus directory (generated if missing)")
+    parser.add_argument("--invoices", type=int, default=50, help="Invoices to generate")
+    parser.add_argument("--scns", type=int, default=20, help="SCNs to generate")
+    parser.add_argument("--min-pages", type=int, default=1, help="Minimum pages per document")
+    parser.add_argument("--max-pages", type=int, default=3, help="Maximum pages per document")
+    parser.add_argument("--table-rows", type=int, default=8, help="Invoice line items / SCN items per section")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus and mock LLM random seed")
+    parser.add_argument("--stages", nargs="+", default=STAGES, choices=STAGES, help="Stages to run")
+    parser.add_argument("--fields", nargs="+", default=DEFAULT_FIELDS, help="Fields for the extract stage")
+    parser.add_argument("--no-fast-path", action="store_true", help="Send every field to the mock LLM")
+    parser.add_argument("--workers", type=int, default=1, help="Processes for PDF text extraction")
+    parser.add_argument("--concurrency", type=int, default=4, help="LLM requests in flight")
+    parser.add_argument("--engine", default="auto", help="PDF text extraction engine")
+    parser.add_argument("--latency", default="lognormal:-1.5,0.6", help="Mock LLM latency distribution")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Mock LLM 500 error rate")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Mock LLM 429 rate")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Previous JSON results to compare against")
+    parser.add_argument("--verbose", action="store_true", help="Show the pipeline's own output")
+    args = parser.parse_args()
+
+    sys.path.insert(0, REPO_ROOT)
+    from create_sample_pdfs import generate_corpus
+
+    work_dir = tempfile.mkdtemp(prefix="docver-bench-")
+    corpus_dir = args.corpus or os.path.join(work_dir, "corpus")
+    corpus_file = os.path.join(corpus_dir, "corpus.json")
+    if os.path.exists(corpus_file):
+        with open(corpus_file, 'r') as f:
+            corpus = json.load(f)
+        print(f"Using corpus in {corpus_dir}")
+    else:
+        start = time.perf_counter()
+        corpus = generate_corpus(corpus_dir, args.invoices, args.scns, args.min_pages, args.max_pages,
+                                 args.table_rows, seed=args.seed, workers=0)
+        print(f"Generated {args.invoices} invoices and {args.scns} SCNs ({corpus['pages']} pages) "
+              f"in {time.perf_counter() - start:.1f}s")
+
+    # The stages run in spawned processes, which inherit these settings
+    server = start_server(latency=args.latency, error_rate=args.error_rate,
+                          rate_limit_rate=args.rate_limit_rate, seed=args.seed)
+    os.environ["DOCUMENT_CRAWLER_LLM_BASE_URL"] = server.url()
+    os.environ["DOCUMENT_CRAWLER_CACHE_DIR"] = os.path.join(work_dir, "cache")
+
+    options = {"workers": args.workers, "concurrency": args.concurrency, "engine": args.engine,
+               "fields": args.fields, "fast_path": not args.no_fast_path, "verbose": args.verbose,
+               "output_dir": work_dir}
+    stages = []
+    try:
+        for stage in args.stages:
+            print(f"Running {stage}...")
+            stages.append(run_stage_isolated(stage, corpus, options))
+    finally:
+        server.shutdown()
+
+    results = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "config": dict(vars(args), corpus=corpus_dir),
+        "corpus": {"invoices": sum(d["kind"] == "invoice" for d in corpus["documents"]),
+                   "scns": sum(d["kind"] == "scn" for d in corpus["documents"]), "pages": corpus["pages"]},
+        "stages": stages,
+        "mock_llm": dict(server.counters),
+    }
+
+    print(f"\n{'stage':<20} {'docs':>6} {'pages':>7} {'seconds':>9} {'docs/s':>8} {'pages/s':>9} {'peak RSS MiB':>13}")
+    for stage in stages:
+        print(f"{stage['stage']:<20} {stage['docs']:>6} {stage['pages']:>7} {stage['seconds']:>9} "
+              f"{stage['docs_per_sec']:>8} {stage['pages_per_sec']:>9} {stage['peak_rss_mb']:>13}")
+    print(f"Mock LLM requests: {results['mock_llm']}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.json}")
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            compare_results(results, json.load(f))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Benchmark matching candidate versions against version requirements.
+
+Generates a seeded list of versions (mostly two-part, as in the master
+sheets) and a list of requirements, then finds the versions that meet each
+requirement in three ways:
+
+- the previous check, which parsed both strings with semantic_version on
+  every call and fell back to string comparison when that failed;
+- compiled Requirement predicates over cached version keys, one version at
+  a time;
+- filter_versions, which compares packed version codes with numpy.
+
+Also counts the answers on which the previous check disagreed with the
+version keys, e.g. '10.0' >= '9.0' being false:
+
+    python -m benchmarks.version_matching --versions 5000 --requirements 200
+"""
+import argparse
+import json
+import random
+import time
+
+import semantic_version
+
+from document_crawler.utils.versions import compile_requirement, encode_versions, filter_versions, sort_versions
+
+def generate_versions(count, seed=0):
+    """
+    Generate distinct version strings.
+
+    Args:
+        count (int): Number of versions.
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Returns:
+        list: Sorted version strings; about one in five has three parts.
+    """
+    rng = random.Random(seed)
+    versions = set()
+    while len(versions) < count:
+        parts = [rng.randint(0, 30), rng.randint(0, 20)]
+        if rng.random() < 0.2:
+            parts.append(rng.randint(0, 9))
+        versions.add(".".join(str(part) for part in parts))
+    return sort_versions(versions)
+
+def generate_requirements(versions, count, seed=0):
+    """
+    Generate requirement strings against existing versions.
+
+    Args:
+        versions (list): Version strings.
+        count (int): Number of requirements.
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Returns:
+        list: Requirements, mostly 'X.Y+' with some '>=', '>' and '=='.
+    """
+    rng = random.Random(seed + 1)
+    forms = ["{}+"] * 6 + [">={}", ">{}", "=={}"]
+    return [rng.choice(forms).format(rng.choice(versions)) for _ in range(count)]
+
+def legacy_check(current_version, required_version):
+    """
+    The version check the dependency analyzer used before compiled requirements.
+
+    Args:
+        current_version (str): Version string.
+        required_version (str): Requirement string.
+
+    Returns:
+        bool: True if the requirement is met.
+    """
+    if required_version.endswith('+'):
+        operator, version = '>=', required_version[:-1]
+    elif required_version.startswith('>='):
+        operator, version = '>=', required_version[2:]
+    elif required_version.startswith('>'):
+        operator, version = '>', required_version[1:]
+    elif required_version.startswith('=='):
+        operator, version = '==', required_version[2:]
+    else:
+        operator, version = '==', required_version
+    try:
+        current, required = semantic_version.Version(current_version), semantic_version.Version(version)
+    except ValueError:
+        current, required = current_version, version
+    if operator == '>=':
+        return current >= required
+    if operator == '>':
+        return current > required
+    return current == required
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark matching candidate versions against requirements")
+    parser.add_argument("--versions", type=int, default=5000, help="Candidate versions")
+    parser.add_argument("--requirements", type=int, default=200, help="Requirements to match")
+    parser.add_argument("--legacy-requirements", type=int, default=20,
+                        help="Requirements matched by the previous check (0 to skip)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    versions = generate_versions(args.versions, args.seed)
+    requirements = generate_requirements(versions, args.requirements, args.seed)
+    start = time.perf_counter()
+    codes = encode_versions(versions)
+    encode_seconds = time.perf_counter() - start
+    results = {"versions": len(versions), "requirements": len(requirements),
+               "encode_seconds": round(encode_seconds, 4)}
+    print(f"{len(versions)} versions encoded in {encode_seconds * 1000:.1f} ms")
+
+    def time_matching(match, requirements):
+        start = time.perf_counter()
+        matches = [match(requirement) for requirement in requirements]
+        return time.perf_counter() - start, matches
+
+    scalar_seconds, scalar = time_matching(
+        lambda requirement: [index for index, version in enumerate(versions)
+                             if compile_requirement(requirement)(version)], requirements)
+    vector_seconds, vector = time_matching(lambda requirement: filter_versions(versions, [requirement], codes),
+                                           requirements)
+    results.update(compiled_ms_per_requirement=round(scalar_seconds / len(requirements) * 1000, 4),
+                   vectorized_ms_per_requirement=round(vector_seconds / len(requirements) * 1000, 4),
+                   vectorized_mismatches=sum(1 for a, b in zip(scalar, vector) if a != b))
+    print(f"Compiled predicates: {results['compiled_ms_per_requirement']} ms/requirement")
+    print(f"Vectorized codes: {results['vectorized_ms_per_requirement']} ms/requirement "
+          f"({scalar_seconds / max(vector_seconds, 1e-9):.0f}x faster, "
+          f"{results['vectorized_mismatches']} results differ)")
+
+    if args.legacy_requirements:
+        legacy_requirements = requirements[:args.legacy_requirements]
+        legacy_seconds, legacy = time_matching(
+            lambda requirement: [index for index, version in enumerate(versions)
+                                 if legacy_check(version, requirement)], legacy_requirements)
+        wrong = sum(len(set(a) ^ set(b)) for a, b in zip(legacy, scalar))
+        results.update(legacy_ms_per_requirement=round(legacy_seconds / len(legacy_requirements) * 1000, 4),
+                       legacy_wrong_answers=wrong)
+        print(f"Previous check: {results['legacy_ms_per_requirement']} ms/requirement "
+              f"({legacy_seconds / len(legacy_requirements) / max(vector_seconds / len(requirements), 1e-9):.0f}x "
+              f"slower than vectorized); {wrong} of {len(legacy_requirements) * len(versions)} answers "
+              f"disagree with numeric ordering")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.json}")
+
+if __name__ == "__main__":
+    main()
@@ -1,43 +1,64 @@
 #!/usr/bin/env python3
 """
 Script to create sample PDF files for demonstration purposes.
+
+Run without arguments to create the demo invoice and SCNs. With --invoices
+and/or --scns it generates a seeded synthetic corpus of any size in
+parallel, for load testing and benchmarks (see benchmarks/throughput.py).
 """
+import argparse
+import json
 import os
+import random
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
 from reportlab.lib.units import inch
 
-def text_to_pdf(text_file, pdf_file):
-    """Convert a text file to PDF."""
-    print(f"Converting {text_file} to {pdf_file}")
+def lines_to_pdf(lines, pdf_file):
+    """
+    Write lines of text to a PDF, one line per row.
     
-    # Create a canvas
+    A line consisting of a form feed ('\\f') starts a new page.
+    
+    Args:
+        lines (list): Lines of text.
+        pdf_file (str): Path to the PDF file to create.
+        
+    Returns:
+        int: Number of pages written.
+    """
     c = canvas.Canvas(pdf_file, pagesize=letter)
     width, height = letter
-    
-    # Set font and size
     c.setFont("Courier", 10)
     
-    # Read the text file
-    with open(text_file, 'r') as f:
-        text_content = f.readlines()
-    
-    # Set the initial y position
+    pages = 1
     y = height - inch
-    
-    # Add text line by line
-    for line in text_content:
-        if y < inch:
+    for line in lines:
+        if line == "\f" or y < inch:
             c.showPage()
+            pages += 1
             y = height - inch
             c.setFont("Courier", 10)
+            if line == "\f":
+                continue
         
         c.drawString(inch, y, line.rstrip())
         y -= 14  # Line spacing
     
-    # Save the PDF
     c.save()
+    return pages
+
+def text_to_pdf(text_file, pdf_file):
+    """Convert a text file to PDF."""
+    print(f"Converting {text_file} to {pdf_file}")
+    
+    # Read the text file
+    with open(text_file, 'r') as f:
+        text_content = f.readlines()
+    
+    lines_to_pdf(text_content, pdf_file)
     print(f"Created {pdf_file}")
 
 def create_sample_pdfs():
@@ -134,6 +155,276 @@ For detailed instructions, please refer to the Documentation Portal.
     scn_pdf = "sample_scns/SoftwareX_v1.3_SCN.pdf"
     text_to_pdf(scn_text, scn_pdf)
 
+# Vocabulary for synthetic documents
+_VENDORS = ["ACME Corporation", "Globex Industries", "Initech Systems", "Umbrella Services", "Stark Supplies",
+            "Wayne Logistics", "Hooli Cloud", "Vandelay Imports"]
+_CLIENTS = ["Global Enterprises Ltd.", "Northwind Traders", "Contoso Ltd.", "Fabrikam Inc.",
+            "Tailspin Toys", "Wide World Importers", "Litware Inc.", "Proseware Inc."]
+_PRODUCTS = ["Server Hosting", "Domain Registration", "Premium Support Package", "Database Storage (500GB)",
+             "Load Balancer", "Backup Service", "SSL Certificate", "Consulting Hours", "License Seat",
+             "Monitoring Add-on", "CDN Bandwidth (TB)", "Training Session"]
+_COMPONENTS = ["dashboard", "report engine", "sync service", "mobile app", "REST API", "scheduler",
+               "authentication module", "export wizard", "search index", "notification service"]
+_FEATURE_VERBS = ["Added", "Introduced", "Enabled", "New"]
+_FIX_TEMPLATES = ["Fixed crash in the {0} when {1}.", "Resolved memory leak in the {0}.",
+                  "Corrected timeout handling in the {0} when {1}.", "Fixed incorrect totals shown by the {0}."]
+_ISSUE_TEMPLATES = ["The {0} may become unresponsive when {1}.", "Intermittent errors in the {0} when {1}.",
+                    "The {0} does not refresh automatically when {1}."]
+_CONDITIONS = ["more than 20 users are connected", "the network is slow", "large files are processed",
+               "the session expires", "running on older hardware", "offline mode is enabled"]
+_FILLER = ("All services are provided under the master agreement between the parties. Payment is due within "
+           "the agreed terms and late payments may incur interest. Please contact the accounts team with any "
+           "questions regarding this document. Thank you for your business.")
+
+# Text rows per PDF page written by lines_to_pdf
+LINES_PER_PAGE = 45
+
+def _pad_to_pages(lines, pages, rng):
+    """
+    Append filler paragraphs and page breaks until the text fills the requested pages.
+    
+    Args:
+        lines (list): Document lines (may already contain page breaks).
+        pages (int): Target page count.
+        rng (random.Random): Random number generator.
+        
+    Returns:
+        list: Lines including page breaks.
+    """
+    padded = []
+    page_lines = 0
+    for line in lines:
+        if line == "\f" or page_lines >= LINES_PER_PAGE:
+            padded.append("\f")
+            page_lines = 0
+            if line == "\f":
+                continue
+        padded.append(line)
+        page_lines += 1
+    current = padded.count("\f") + 1
+    while current < pages:
+        padded.append("\f")
+        current += 1
+        for _ in range(rng.randint(LINES_PER_PAGE // 3, LINES_PER_PAGE - 5)):
+            start = rng.randrange(0, len(_FILLER) - 60)
+            padded.append(_FILLER[start:start + 60])
+    return padded
+
+def make_invoice(rng, index, pages=1, table_rows=5):
+    """
+    Generate the text of a synthetic invoice.
+    
+    Args:
+        rng (random.Random): Random number generator.
+        index (int): Invoice index, used in the invoice number.
+        pages (int, optional): Page count. Defaults to 1.
+        table_rows (int, optional): Line items in the product table. Defaults to 5.
+        
+    Returns:
+        tuple: (lines, ground truth dict of the labelled fields).
+    """
+    year = rng.randint(2019, 2024)
+    month = rng.randint(1, 12)
+    day = rng.randint(1, 28)
+    months = ["January", "February", "March", "April", "May", "June", "July", "August", "September",
+              "October", "November", "December"]
+    truth = {
+        "Invoice Number": f"INV-{year}-{index:05d}",
+        "Date": f"{months[month - 1]} {day}, {year}",
+        "Due Date": f"{months[month % 12]} {day}, {year + (month == 12)}",
+        "Client ID": f"{rng.choice('ABCDEFGH')}{rng.choice('KLMNPQRS')}-{rng.randint(100, 999)}-{rng.randint(1, 99):02d}",
+    }
+    vendor = rng.choice(_VENDORS)
+    lines = [vendor.upper(), f"{rng.randint(1, 999)} Business Street", "Businessville, CA 90210", "",
+             "================================", "INVOICE", "================================", "",
+             f"Invoice Number: {truth['Invoice Number']}", f"Date: {truth['Date']}",
+             f"Due Date: {truth['Due Date']}", "", "BILL TO:", rng.choice(_CLIENTS),
+             f"Client ID: {truth['Client ID']}", "", "================================", "PRODUCT DETAILS",
+             "================================", "",
+             f"{'Item':<28}{'Quantity':>10}{'Unit Price':>14}{'Amount':>14}", "-" * 66]
+    
+    # Spread the line items over the pages so table density scales with document length
+    subtotal = 0.0
+    rows_per_page = max(1, -(-table_rows // pages))
+    for row in range(table_rows):
+        if row and row % rows_per_page == 0:
+            lines.append("\f")
+        quantity = rng.randint(1, 24)
+        price = round(rng.uniform(5, 500), 2)
+        amount = round(quantity * price, 2)
+        subtotal += amount
+        lines.append(f"{rng.choice(_PRODUCTS):<28}{quantity:>10}{'$' + format(price, ',.2f'):>14}"
+                     f"{'$' + format(amount, ',.2f'):>14}")
+    tax = round(subtotal * 0.08, 2)
+    truth["Subtotal"] = f"${subtotal:,.2f}"
+    truth["Total Amount"] = f"${subtotal + tax:,.2f}"
+    lines += ["-" * 66, f"Subtotal: {truth['Subtotal']}", f"Tax (8%): ${tax:,.2f}",
+              f"Total Amount: {truth['Total Amount']}", "", "Payment Terms: Net 30", "", _FILLER[:60]]
+    return _pad_to_pages(lines, pages, rng), truth
+
+def make_scn(rng, software, version, previous_version, pages=1, items=5):
+    """
+    Generate the text of a synthetic Software Change Notice.
+    
+    Args:
+        rng (random.Random): Random number generator.
+        software (str): Software name.
+        version (str): Version described by the SCN.
+        previous_version (str): Previous version.
+        pages (int, optional): Page count. Defaults to 1.
+        items (int, optional): Items per section. Defaults to 5.
+        
+    Returns:
+        tuple: (lines, ground truth dict with the section lists).
+    """
+    truth = {
+        "new_features": [f"{rng.choice(_FEATURE_VERBS)} {rng.choice(['bulk', 'scheduled', 'custom', 'offline'])} "
+                         f"{rng.choice(_COMPONENTS)} support (v{version}-{n})." for n in range(1, items + 1)],
+        "resolved_issues": [rng.choice(_FIX_TEMPLATES).format(rng.choice(_COMPONENTS), rng.choice(_CONDITIONS))
+                            for _ in range(items)],
+        "known_issues": [rng.choice(_ISSUE_TEMPLATES).format(rng.choice(_COMPONENTS), rng.choice(_CONDITIONS))
+                         for _ in range(max(1, items // 2))],
+    }
+    lines = ["SOFTWARE CHANGE NOTICE", "=============================", "", f"Software: {software}",
+             f"Version: {version}", f"Previous Version: {previous_version}", ""]
+    for title, key in (("NEW FEATURES", "new_features"), ("RESOLVED ISSUES", "resolved_issues"),
+                       ("KNOWN ISSUES", "known_issues")):
+        lines += ["=============================", title, "=============================", ""]
+        lines += [f"{n}. {item}" for n, item in enumerate(truth[key], start=1)]
+        lines.append("")
+    return _pad_to_pages(lines, pages, rng), truth
+
+def make_versions(rng, count, start="1.0.0"):
+    """
+    Generate an increasing sequence of semantic versions with random minor/patch steps.
+    
+    Args:
+        rng (random.Random): Random number generator.
+        count (int): Number of versions.
+        start (str, optional): First version. Defaults to '1.0.0'.
+        
+    Returns:
+        list: Version strings in increasing order.
+    """
+    major, minor, patch = (int(part) for part in start.split("."))
+    versions = []
+    for _ in range(count):
+        versions.append(f"{major}.{minor}.{patch}")
+        step = rng.random()
+        if step < 0.6:
+            patch += 1
+        elif step < 0.95:
+            minor, patch = minor + 1, 0
+        else:
+            major, minor, patch = major + 1, 0, 0
+    return versions
+
+def _generate_document(job):
+    """
+    Generate and write one synthetic document (runs in a worker process).
+    
+    Args:
+        job (dict): Document kind, output path, seed and generation parameters.
+        
+    Returns:
+        dict: Path, kind, page count and ground truth of the document.
+    """
+    rng = random.Random(job["seed"])
+    pages = rng.randint(job["min_pages"], job["max_pages"])
+    if job["kind"] == "invoice":
+        lines, truth = make_invoice(rng, job["index"], pages, job["table_rows"])
+    else:
+        lines, truth = make_scn(rng, job["software"], job["version"], job["previous_version"], pages,
+                                job["table_rows"])
+    written_pages = lines_to_pdf(lines, job["path"])
+    return {"path": job["path"], "kind": job["kind"], "pages": written_pages, "truth": truth}
+
+def generate_corpus(output_dir, invoices=0, scns=0, min_pages=1, max_pages=1, table_rows=5,
+                    software="SoftwareX", start_version="1.0.0", seed=0, workers=1):
+    """
+    Generate a seeded synthetic corpus of invoices and SCNs in parallel.
+    
+    The same seed and parameters always produce the same documents,
+    regardless of the number of workers. A corpus.json file with the page
+    count and ground truth of every document is written next to them.
+    
+    Args:
+        output_dir (str): Directory to create; invoices go to 'invoices/' and SCNs to 'scns/'.
+        invoices (int, optional): Number of invoices. Defaults to 0.
+        scns (int, optional): Number of SCNs, one per consecutive version. Defaults to 0.
+        min_pages (int, optional): Minimum pages per document. Defaults to 1.
+        max_pages (int, optional): Maximum pages per document. Defaults to 1.
+        table_rows (int, optional): Invoice line items, or items per SCN section. Defaults to 5.
+        software (str, optional): Software name of the SCNs. Defaults to 'SoftwareX'.
+        start_version (str, optional): First SCN version. Defaults to '1.0.0'.
+        seed (int, optional): Random seed. Defaults to 0.
+        workers (int, optional): Processes used to write PDFs; 0 uses all CPU cores. Defaults to 1.
+        
+    Returns:
+        dict: Corpus description as written to corpus.json.
+    """
+    invoice_dir = os.path.join(output_dir, "invoices")
+    scn_dir = os.path.join(output_dir, "scns")
+    os.makedirs(invoice_dir, exist_ok=True)
+    os.makedirs(scn_dir, exist_ok=True)
+    
+    common = {"min_pages": min_pages, "max_pages": max(min_pages, max_pages), "table_rows": table_rows}
+    jobs = [dict(common, kind="invoice", index=index, seed=f"{seed}-invoice-{index}",
+                 path=os.path.join(invoice_dir, f"invoice_{index:05d}.pdf"))
+            for index in range(1, invoices + 1)]
+    versions = make_versions(random.Random(f"{seed}-versions"), scns + 1, start_version)
+    for index in range(1, scns + 1):
+        jobs.append(dict(common, kind="scn", index=index, seed=f"{seed}-scn-{index}", software=software,
+                         version=versions[index], previous_version=versions[index - 1],
+                         path=os.path.join(scn_dir, f"{software}_v{versions[index]}_SCN.pdf")))
+    
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1:
+        documents = [_generate_document(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            documents = list(executor.map(_generate_document, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+    
+    corpus = {
+        "seed": seed,
+        "software": software,
+        "versions": versions,
+        "invoice_dir": invoice_dir,
+        "scn_dir": scn_dir,
+        "pages": sum(document["pages"] for document in documents),
+        "documents": documents,
+    }
+    with open(os.path.join(output_dir, "corpus.json"), 'w') as f:
+        json.dump(corpus, f, indent=2)
+    return corpus
+
+def main():
+    parser = argparse.ArgumentParser(description="Create sample PDFs or a synthetic benchmark corpus")
+    parser.add_argument("--invoices", type=int, default=0, help="Number of synthetic invoices to generate")
+    parser.add_argument("--scns", type=int, default=0, help="Number of synthetic SCNs (consecutive versions)")
+    parser.add_argument("--output-dir", default="synthetic_corpus", help="Directory for the synthetic corpus")
+    parser.add_argument("--min-pages", type=int, default=1, help="Minimum pages per document")
+    parser.add_argument("--max-pages", type=int, default=3, help="Maximum pages per document")
+    parser.add_argument("--table-rows", type=int, default=5,
+                        help="Invoice line items, or items per SCN section (table density)")
+    parser.add_argument("--software", default="SoftwareX", help="Software name of the SCNs")
+    parser.add_argument("--start-version", default="1.0.0", help="First SCN version")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--workers", type=int, default=1, help="Processes used to write PDFs (0 uses all CPU cores)")
+    args = parser.parse_args()
+    
+    if not args.invoices and not args.scns:
+        create_sample_pdfs()
+        print("Sample PDFs created successfully!")
+        print("You can now use them with the Streamlit application.")
+        return
+    
+    corpus = generate_corpus(args.output_dir, args.invoices, args.scns, args.min_pages, args.max_pages,
+                             args.table_rows, args.software, args.start_version, args.seed, args.workers)
+    print(f"Created {args.invoices} invoices and {args.scns} SCNs ({corpus['pages']} pages) in {args.output_dir}")
+    if args.scns:
+        print(f"SCN versions: {corpus['versions'][0]} to {corpus['versions'][-1]}")
+
 if __name__ == "__main__":
     # Check if reportlab is installed
     try:
@@ -143,6 +434,4 @@ if __name__ == "__main__":
         print("pip install reportlab")
         sys.exit(1)
     
-    create_sample_pdfs()
-    print("Sample PDFs created successfully!")
-    print("You can now use them with the Streamlit application.") 
\ No newline at end of file
+    main() 
\ No newline at end of file
@@ -4,171 +4,115 @@ This module uses CrewAI with Llama 3.3 via Groq to extract predefined fields fro
 """
 import os
 import json
+import time
 import pandas as pd
 from dotenv import load_dotenv
-from crewai import Task, Crew, Process
 
+from document_crawler.utils.pdf_backends import DEFAULT_ENGINE
 from document_crawler.utils.pdf_utils import list_pdf_files, batch_extract_text
+from document_crawler.utils.checkpoint import RunJournal
+from document_crawler.utils.chunking import (DEFAULT_CHUNK_OVERLAP, DEFAULT_MAX_CHUNKS, merge_field_values,
+                                             split_text, text_budget)
+from document_crawler.utils.concurrency import DEFAULT_CONCURRENCY, imap_concurrently
 from document_crawler.utils.custom_llm import create_document_agent
+from document_crawler.utils.relevance import select_relevant_text
+from document_crawler.utils.response_parser import parse_json_object
+from document_crawler.utils.rule_extraction import extract_fields
+from document_crawler.utils.llm_cache import get_llm_cache
+from document_crawler.utils.manifest import CrawlManifest, fields_signature, manifest_path_for
+from document_crawler.utils.result_sink import ResultSink, read_rows, stream_path_for, write_rows
+from document_crawler.utils.task_runner import run_task
+from document_crawler.utils.telemetry import RunTelemetry
+from document_crawler.utils.timing import StageTimer
 
 # Load environment variables
 load_dotenv()
 
-def run(folder_path, fields_to_extract, output_file):
+# Maximum number of document characters sent to the LLM per prompt
+MAX_CONTENT_CHARS = 8000
+
+def _extract_chunk(document_analyzer, pdf_file, chunk_text, part, total_parts, fields_to_extract,
+                   output_file, llm_cache, timer, telemetry):
     """
-    Run the critical information extraction task.
+    Extract the requested fields from one chunk of a document.
     
     Args:
-        folder_path (str): Path to the folder containing PDF documents.
-        fields_to_extract (list): List of fields to extract from the documents.
-        output_file (str): Path to the output file (CSV or XLSX).
+        document_analyzer (Agent): Agent that runs the extraction task.
+        pdf_file (str): Path to the PDF file.
+        chunk_text (str): Text of this chunk.
+        part (int): 1-based index of the chunk within the document.
+        total_parts (int): Number of chunks in the document.
+        fields_to_extract (list): List of fields to extract.
+        output_file (str): Path to the output file; raw LLM output is saved next to it.
+        llm_cache (LLMCache): LLM response cache, or None.
+        timer (StageTimer): Records the prompt, LLM, raw output and JSON recovery stages.
+        telemetry (RunTelemetry): Records the LLM call.
+        
+    Returns:
+        dict: Extracted fields, or None if the response could not be parsed.
     """
-    print(f"Starting critical information extraction from {folder_path}")
-    print(f"Fields to extract: {fields_to_extract}")
-    
-    # Find all PDF files in the folder
-    pdf_files = list_pdf_files(folder_path)
-    if not pdf_files:
-        print(f"No PDF files found in {folder_path}")
-        return
-    
-    print(f"Found {len(pdf_files)} PDF files")
-    
-    # Extract text from all PDFs
-    pdf_contents = batch_extract_text(pdf_files)
+    stage_start = time.perf_counter()
+    part_note = ""
+    if total_parts > 1:
+        part_note = (f"This is part {part} of {total_parts} of the document. "
+                     f"Return 'Not Found' for fields that do not appear in this part.")
     
-    # Create agent using our new function that directly creates a document analyzer
-    document_analyzer = create_document_agent(verbose=True, allow_delegation=False)
-    
-    results = []
-    
-    for pdf_file, text_content in pdf_contents.items():
-        if not text_content.strip():
-            print(f"Skipping {pdf_file} - No text content extracted")
-            continue
+    fields_str = ", ".join([f"'{field}'" for field in fields_to_extract])
+    task_description = f"""
+        Extract the following fields from the document: {fields_str}.
         
-        fields_str = ", ".join([f"'{field}'" for field in fields_to_extract])
-        extraction_task = Task(
-            description=f"""
-            Extract the following fields from the document: {fields_str}.
-            
-            For each field:
-            1. Provide comprehensive, detailed information rather than just a single line
-            2. Include all relevant details from the document that pertain to each field
-            3. If the field is asking for a list (e.g., "List of Issues"), extract ALL items that should be in that list
-            4. For technical fields, include specific technical details, numbers, dates, and specifications
-            5. If multiple sections of the document relate to a field, combine all relevant information
-            6. Return 'Not Found' only if there is truly no information related to the field
-            7. Format lists consistently, using numbered format (1., 2., etc.) for sequential items
-            8. For dates, extract the complete date including day, month, and year if available
-            9. For amounts or quantities, include units and context
-            10. Structure multi-part fields logically, with clear separation between different components
-            
-            Return the results as a JSON dictionary where:
-            - Keys are the exact field names as specified
-            - Values are the extracted information as strings
-            - Lists should be formatted as strings with proper numbering, not as JSON arrays
-            - Keep formatting consistent and clean
-            
-            Document content:
-            {text_content[:8000]}  # Limit content to avoid token limits
-            """,
-            agent=document_analyzer,
-            expected_output="A comprehensive JSON dictionary with detailed extracted fields",
-            output_file=None
-        )
+        For each field:
+        1. Provide comprehensive, detailed information rather than just a single line
+        2. Include all relevant details from the document that pertain to each field
+        3. If the field is asking for a list (e.g., "List of Issues"), extract ALL items that should be in that list
+        4. For technical fields, include specific technical details, numbers, dates, and specifications
+        5. If multiple sections of the document relate to a field, combine all relevant information
+        6. Return 'Not Found' only if there is truly no information related to the field
+        7. Format lists consistently, using numbered format (1., 2., etc.) for sequential items
+        8. For dates, extract the complete date including day, month, and year if available
+        9. For amounts or quantities, include units and context
+        10. Structure multi-part fields logically, with clear separation between different components
         
-        # Create a crew with just this task
-        extraction_crew = Crew(
-            agents=[document_analyzer],
-            tasks=[extraction_task],
-            verbose=True,
-            process=Process.sequential
-        )
-        
-        # Run the crew and get results
-        result = extraction_crew.kickoff()
-        
-        # Convert CrewOutput to string if needed
-        try:
-            # First try to access the result content properly
-            if hasattr(result, 'raw') and result.raw:
-                result_str = result.raw
-            elif hasattr(result, 'output') and result.output:
-                result_str = result.output
-            elif hasattr(result, 'content') and result.content:
-                result_str = result.content
-            else:
-                # Fallback to string conversion
-                result_str = str(result)
-        except Exception as e:
-            print(f"Error accessing CrewOutput content: {str(e)}")
-            result_str = str(result)
-        
-        # Debug print to help diagnose issues
-        print(f"Raw result from LLM (first 100 chars): {result_str[:100]}...")
+        Return the results as a JSON dictionary where:
+        - Keys are the exact field names as specified
+        - Values are the extracted information as strings
+        - Lists should be formatted as strings with proper numbering, not as JSON arrays
+        - Keep formatting consistent and clean
         
+        {part_note}
+        Document content:
+        {chunk_text}
+        """
+    timer.add("prompt_building", time.perf_counter() - stage_start)
+    
+    with telemetry.call(pdf_file, part) as call:
+        # Run the task (or reuse a cached response) and get results
+        result_str = run_task(
+            document_analyzer,
+            task_description,
+            "A comprehensive JSON dictionary with detailed extracted fields",
+            cache=llm_cache,
+            timer=timer,
+            call=call,
+            validate=parse_json_object
+        )
+        stage_start = time.perf_counter()
+
         # Always save the raw output to a text file for debugging
         raw_output_dir = os.path.dirname(output_file)
-        raw_output_file = os.path.join(raw_output_dir, f"raw_output_{os.path.basename(pdf_file)}.txt")
+        part_suffix = f"_part{part}" if total_parts > 1 else ""
+        raw_output_file = os.path.join(raw_output_dir, f"raw_output_{os.path.basename(pdf_file)}{part_suffix}.txt")
         with open(raw_output_file, "w", encoding="utf-8") as f:
             f.write(result_str)
         
         print(f"Saved raw output to {raw_output_file}")
+        timer.add("raw_output", time.perf_counter() - stage_start)
         
-        # Process the result (assuming it's a valid JSON string)
+        # Process the result
+        stage_start = time.perf_counter()
         try:
-            # Parse the JSON result properly
-            # First, try to find JSON in the response if it's not already in JSON format
-            if not result_str.strip().startswith('{'):
-                # Try to find the JSON part in the response
-                start_idx = result_str.find('{')
-                end_idx = result_str.rfind('}')
-                if start_idx != -1 and end_idx != -1:
-                    result_str = result_str[start_idx:end_idx+1]
-            
-            # Handle cases where the result contains a JSON object followed by text
-            if '}' in result_str and result_str.rfind('}') < len(result_str) - 1:
-                # Extract just the JSON part
-                result_str = result_str[:result_str.rfind('}')+1]
-            
-            # Special case handling: if there's a message about no data at the end,
-            # it should be separated from the JSON content
-            if "No data was successfully extracted" in result_str and result_str:
-                print("Found both JSON data and 'No data' message - using the JSON data")
-            
-            # Attempt to clean up any non-JSON markup
-            try:
-                extracted_data = json.loads(result_str)
-            except json.JSONDecodeError as e:
-                print(f"JSONDecodeError: {e}")
-                # Try a more aggressive approach to find and extract JSON
-                import re
-                
-                # First, check for common CrewAI output patterns
-                # Sometimes CrewAI output is wrapped in markdown or has a prefix
-                json_matches = []
-                
-                # Look for content in triple backticks with json
-                code_blocks = re.findall(r'```(?:json)?\s*([\s\S]*?)```', result_str)
-                for block in code_blocks:
-                    try:
-                        extracted_data = json.loads(block.strip())
-                        print("Found JSON in code block")
-                        break
-                    except:
-                        pass
-                
-                # If that fails, try more generic pattern matching
-                if 'extracted_data' not in locals():
-                    json_pattern = r'\{(?:[^{}]|(?:\{(?:[^{}]|(?:\{(?:[^{}]|(?:\{[^{}]*\}))*\}))*\}))*\}'
-                    matches = re.findall(json_pattern, result_str)
-                    if matches:
-                        # Use the longest match as it's most likely the complete JSON
-                        result_str = max(matches, key=len)
-                        extracted_data = json.loads(result_str)
-                    else:
-                        raise
+            # Recover the JSON object from prose, code fences or trailing text
+            extracted_data = parse_json_object(result_str)
             
             # Clean and structure the extracted data
             cleaned_data = {}
@@ -186,33 +130,274 @@ def run(folder_path, fields_to_extract, output_file):
                 
                 cleaned_data[field] = cleaned_value
             
-            # Add file information
-            cleaned_data["File"] = os.path.basename(pdf_file)
-            results.append(cleaned_data)
+            call["parse_ok"] = True
+            return cleaned_data
         except Exception as e:
             print(f"Error processing result from {pdf_file}: {str(e)}")
             print(f"Raw result: {result_str}")
+            return None
+        finally:
+            timer.add("json_recovery", time.perf_counter() - stage_start)
+
+def _load_previous_results(json_output_file):
+    """
+    Load the results of a previous run from its JSON output.
     
-    # Save results to CSV or Excel
-    if results:
-        df = pd.DataFrame(results)
-        
-        # Ensure 'File' column is the first column
-        if 'File' in df.columns:
-            cols = ['File'] + [col for col in df.columns if col != 'File']
-            df = df[cols]
-        
-        # Store detailed structured data in JSON format as well
-        json_output_file = output_file.replace('.csv', '.json').replace('.xlsx', '.json')
-        with open(json_output_file, 'w') as f:
-            json.dump(results, f, indent=2)
+    Args:
+        json_output_file (str): Path to the JSON output file.
         
-        # Save to appropriate format based on file extension
-        if output_file.lower().endswith('.xlsx'):
-            df.to_excel(output_file, index=False)
-        else:
-            df.to_csv(output_file, index=False)
+    Returns:
+        list: Previous result rows, or an empty list if there are none.
+    """
+    if not os.path.exists(json_output_file):
+        return []
+    try:
+        with open(json_output_file, 'r') as f:
+            results = json.load(f)
+        return results if isinstance(results, list) else []
+    except (OSError, ValueError) as e:
+        print(f"Warning: Could not read previous results from {json_output_file}: {e}")
+        return []
+
+def _combine_results(pdf_file, fields_to_extract, fast_values, partials):
+    """
+    Reduce a document's chunk results and rule-based values into its result row.
+    
+    Args:
+        pdf_file (str): Path to the PDF file.
+        fields_to_extract (list): List of requested fields.
+        fast_values (dict): Fields filled by the rule-based fast path.
+        partials (list): Field dictionaries extracted from each chunk.
         
+    Returns:
+        dict: Result row with a 'File' entry, or None if nothing was extracted.
+    """
+    llm_data = merge_field_values(partials)
+    if llm_data is None and not fast_values:
+        return None
+    
+    # Keep the requested field order, preferring rule-based values
+    llm_data = llm_data or {}
+    cleaned_data = {field: fast_values.get(field, llm_data.get(field))
+                    for field in fields_to_extract if field in fast_values or field in llm_data}
+    cleaned_data.update({field: value for field, value in llm_data.items() if field not in cleaned_data})
+    
+    # Add file information
+    cleaned_data["File"] = os.path.basename(pdf_file)
+    return cleaned_data
+
+def _report_fast_path(fast_path_values, fields_to_extract):
+    """
+    Print how many fields and documents were handled without the LLM.
+    
+    Args:
+        fast_path_values (dict): Mapping of file path to rule-extracted fields.
+        fields_to_extract (list): List of requested fields.
+    """
+    total_fields = len(fast_path_values) * len(fields_to_extract)
+    if not total_fields:
+        return
+    fast_fields = sum(len(values) for values in fast_path_values.values())
+    skipped_docs = sum(1 for values in fast_path_values.values() if len(values) == len(fields_to_extract))
+    print(f"Fast path: {fast_fields} of {total_fields} fields ({fast_fields / total_fields:.0%}) filled without the LLM; "
+          f"{skipped_docs} of {len(fast_path_values)} documents skipped the LLM entirely")
+
+def run(folder_path, fields_to_extract, output_file, workers=1, max_chars=MAX_CONTENT_CHARS,
+        engine=DEFAULT_ENGINE, text_cache=True, llm_cache=True,
+        concurrency=DEFAULT_CONCURRENCY, chunk_overlap=DEFAULT_CHUNK_OVERLAP,
+        max_chunks=DEFAULT_MAX_CHUNKS, top_k=0, fast_path=True, full=False, telemetry=True,
+        run_id=None, metrics_file=None):
+    """
+    Run the critical information extraction task.
+    
+    Args:
+        folder_path (str): Path to the folder containing PDF documents.
+        fields_to_extract (list): List of fields to extract from the documents.
+        output_file (str): Path to the output file (CSV or XLSX).
+        workers (int, optional): Number of processes used for PDF text extraction. Defaults to 1.
+        max_chars (int, optional): Document characters sent to the LLM per prompt (the chunk
+            size). Defaults to MAX_CONTENT_CHARS.
+        engine (str, optional): PDF engine name or 'auto'. Defaults to DEFAULT_ENGINE.
+        text_cache (TextCache or bool, optional): Extracted text cache; True uses the shared
+            default cache and False disables it. Defaults to True.
+        llm_cache (LLMCache or bool, optional): LLM response cache; True uses the shared
+            default cache and False always calls the LLM. Defaults to True.
+        concurrency (int, optional): Maximum number of LLM requests in flight.
+            Defaults to DEFAULT_CONCURRENCY.
+        chunk_overlap (int, optional): Characters repeated between consecutive chunks.
+            Defaults to DEFAULT_CHUNK_OVERLAP.
+        max_chunks (int, optional): Maximum chunks (LLM calls) per document; PDF parsing
+            stops once they are full. Defaults to DEFAULT_MAX_CHUNKS.
+        top_k (int, optional): For documents longer than one prompt, index the whole text and
+            send only the top_k passages per requested field. 0 disables. Defaults to 0.
+        fast_path (bool, optional): Fill well-structured fields (dates, amounts, identifiers)
+            with deterministic rules and only ask the LLM for the rest. Defaults to True.
+        full (bool, optional): Ignore the crawl manifest and re-extract every document.
+            Defaults to False, which only processes new or changed documents.
+        telemetry (TelemetryStore or bool, optional): LLM call telemetry store; True uses the
+            shared default store and False records nothing. Defaults to True.
+        run_id (str, optional): ID of an interrupted run to resume; documents it completed are
+            not extracted again. Defaults to None, which starts a new run.
+        metrics_file (str, optional): Path of the JSON stage timing file. Defaults to None,
+            which writes '<output>.metrics.json'.
+    """
+    print(f"Starting critical information extraction from {folder_path}")
+    print(f"Fields to extract: {fields_to_extract}")
+    timer = StageTimer("extract")
+    
+    # Find all PDF files in the folder
+    with timer.stage("list_pdf_files"):
+        pdf_files = list_pdf_files(folder_path)
+    if not pdf_files:
+        print(f"No PDF files found in {folder_path}")
+        return
+    
+    print(f"Found {len(pdf_files)} PDF files")
+    
+    # Journal completed documents so an interrupted run can be resumed
+    settings = dict(folder_path=os.path.abspath(folder_path), fields_to_extract=list(fields_to_extract),
+                    output_file=os.path.abspath(output_file), workers=workers, max_chars=max_chars,
+                    engine=engine, text_cache=bool(text_cache), llm_cache=bool(llm_cache),
+                    concurrency=concurrency, chunk_overlap=chunk_overlap, max_chunks=max_chunks,
+                    top_k=top_k, fast_path=fast_path, full=full, telemetry=bool(telemetry))
+    journal = RunJournal("extract", settings, run_id)
+    print(f"Run ID: {journal.run_id} (continue an interrupted run with --resume {journal.run_id})")
+    run_telemetry = RunTelemetry(journal.run_id, "extract", store=telemetry)
+    
+    # Reuse results of documents that have not changed since the last run
+    json_output_file = output_file.replace('.csv', '.json').replace('.xlsx', '.json')
+    manifest = CrawlManifest(manifest_path_for(output_file))
+    signature = fields_signature(fields_to_extract)
+    previous_results = [] if full else _load_previous_results(json_output_file)
+    reused_results = {}
+    if previous_results:
+        with timer.stage("manifest"):
+            for pdf_file in pdf_files:
+                pointer = manifest.result_pointer(pdf_file)
+                if pointer is not None and pointer < len(previous_results) and manifest.is_current(pdf_file, signature):
+                    reused_results[pdf_file] = previous_results[pointer]
+    resumed_files = [pdf_file for pdf_file in pdf_files
+                     if pdf_file not in reused_results and journal.is_done(pdf_file)]
+    if resumed_files:
+        print(f"Resuming run {journal.run_id}: {len(resumed_files)} documents already completed")
+    pending_files = [pdf_file for pdf_file in pdf_files
+                     if pdf_file not in reused_results and not journal.is_done(pdf_file)]
+    if reused_results:
+        print(f"Incremental run: reusing {len(reused_results)} unchanged documents, "
+              f"extracting {len(pending_files)} new or changed documents")
+    
+    # Extract text from the pending PDFs, reading only as much as the chunks can hold
+    # (or the whole document when it is indexed for relevant passages)
+    extract_chars = text_budget(max_chars, chunk_overlap, max_chunks) if not top_k else None
+    with timer.stage("text_extraction"):
+        pdf_contents = batch_extract_text(pending_files, workers=workers, max_chars=extract_chars,
+                                          engine=engine, cache=text_cache)
+    
+    if llm_cache is True:
+        llm_cache = get_llm_cache()
+    
+    # Fill well-structured fields with deterministic rules first, then split each document
+    # into prompt-sized chunks for the fields that are left (map step inputs)
+    fast_path_values = {}
+    chunk_jobs = []
+    for pdf_file, text_content in pdf_contents.items():
+        if not text_content.strip():
+            print(f"Skipping {pdf_file} - No text content extracted")
+            continue
+        with timer.stage("fast_path"):
+            fast_path_values[pdf_file] = extract_fields(text_content, fields_to_extract) if fast_path else {}
+        remaining_fields = [field for field in fields_to_extract if field not in fast_path_values[pdf_file]]
+        if not remaining_fields:
+            continue
+        with timer.stage("chunking"):
+            if top_k and len(text_content) > max_chars:
+                # Send only the passages that best match the requested fields
+                text_content = select_relevant_text(text_content, remaining_fields, top_k)
+            chunks = split_text(text_content, max_chars, chunk_overlap, max_chunks)
+        for part, chunk_text in enumerate(chunks, start=1):
+            chunk_jobs.append((pdf_file, chunk_text, part, len(chunks), remaining_fields))
+    
+    # Every finished document is appended to the JSONL stream right away, so an
+    # interrupted run keeps its results; the final outputs are compacted from it.
+    # Rows left by an earlier interrupted run are kept until this run compacts the stream
+    sink = ResultSink(stream_path_for(output_file), append=True)
+    for pdf_file, row in reused_results.items():
+        sink.write(pdf_file, row)
+    for pdf_file in resumed_files:
+        sink.write(pdf_file, journal.result(pdf_file))
+    
+    def finish_document(pdf_file, row):
+        sink.write(pdf_file, row)
+        journal.record(pdf_file, row)
+    
+    for pdf_file, fast_values in fast_path_values.items():
+        if fast_values and len(fast_values) == len(fields_to_extract):
+            finish_document(pdf_file, _combine_results(pdf_file, fields_to_extract, fast_values, []))
+    
+    # Keep several extraction requests in flight; agents are cached per worker thread and
+    # share one LLM client whose connection pool matches the concurrency
+    def extract(job):
+        pdf_file, chunk_text, part, total_parts, remaining_fields = job
+        agent = create_document_agent(verbose=True, allow_delegation=False, pool_size=concurrency)
+        return _extract_chunk(agent, pdf_file, chunk_text, part, total_parts, remaining_fields,
+                              output_file, llm_cache, timer, run_telemetry)
+    
+    # Results come back in job order, so a document is complete at its last chunk (reduce step).
+    # The per-call stages run in worker threads; 'llm_phase' is the wall time of the whole phase
+    llm_phase_start = time.perf_counter()
+    try:
+        partials = []
+        for job, partial in zip(chunk_jobs, imap_concurrently(extract, chunk_jobs, concurrency)):
+            pdf_file, _, part, total_parts, _ = job
+            partials.append(partial)
+            if part < total_parts:
+                continue
+            row = _combine_results(pdf_file, fields_to_extract, fast_path_values[pdf_file], partials)
+            if row:
+                finish_document(pdf_file, row)
+            partials = []
+    finally:
+        sink.close()
+        journal.close()
+        timer.add("llm_phase", time.perf_counter() - llm_phase_start)
+    
+    if fast_path and fast_path_values:
+        _report_fast_path(fast_path_values, fields_to_extract)
+    
+    # Compact the stream into file order, pointing the manifest at each row
+    streamed_rows = read_rows(sink.path, sink.offset)
+    results = []
+    compacted = []
+    for pdf_file in pdf_files:
+        row = streamed_rows.get(pdf_file)
+        manifest.record(pdf_file, signature, len(results) if row else None)
+        if row:
+            results.append(row)
+            compacted.append((pdf_file, row))
+    manifest.retain(pdf_files)
+    
+    # Save results to CSV or Excel
+    if results:
+        with timer.stage("output"):
+            df = pd.DataFrame(results)
+            
+            # Ensure 'File' column is the first column
+            if 'File' in df.columns:
+                cols = ['File'] + [col for col in df.columns if col != 'File']
+                df = df[cols]
+            
+            # Store detailed structured data in JSON format as well
+            with open(json_output_file, 'w') as f:
+                json.dump(results, f, indent=2)
+            
+            # Save to appropriate format based on file extension
+            if output_file.lower().endswith('.xlsx'):
+                df.to_excel(output_file, index=False)
+            else:
+                df.to_csv(output_file, index=False)
+            
+            manifest.save()
+            write_rows(sink.path, compacted)
         print(f"Extraction complete. Results saved to {output_file} and {json_output_file}")
         
         # Display the raw results for debugging
@@ -223,6 +408,12 @@ def run(folder_path, fields_to_extract, output_file):
                     print(f"  {field}: {value[:100]}..." if len(str(value)) > 100 else f"  {field}: {value}")
     else:
         print("No data was successfully extracted from the documents.")
+    
+    journal.finish()
+    if llm_cache:
+        print(llm_cache.summary())
+    print(run_telemetry.summary())
+    timer.report(metrics_file or os.path.splitext(output_file)[0] + ".metrics.json")
 
 if __name__ == "__main__":
     # For testing
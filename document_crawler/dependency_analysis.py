@@ -3,161 +3,129 @@ Software Dependency Analysis Task.
 This module analyzes software dependencies for version upgrades using Llama 3.3 via Groq.
 """
 import json
-import pandas as pd
-import numpy as np
-import semantic_version
-import io
-import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
 from dotenv import load_dotenv
-from crewai import Task, Crew, Process
 
-from document_crawler.utils.llm_config import create_agent
+from document_crawler.utils.dependency_graph import DependencyGraph
+from document_crawler.utils.dependency_resolver import DependencyResolver
+from document_crawler.utils.graph_snapshot import load_graph
+from document_crawler.utils.timing import StageTimer
+from document_crawler.utils.versions import satisfies
 
 # Load environment variables
 load_dotenv()
 
 class DependencyAnalyzer:
-    def __init__(self, master_sheet, current_versions, software_to_upgrade, target_version, criteria):
+    def __init__(self, master_sheet, current_versions, software_to_upgrade=None, target_version=None,
+                 criteria="minimum_changes", snapshot=True):
         """
         Initialize the dependency analyzer.
         
         Args:
             master_sheet (str): Path to the master dependency sheet (CSV).
             current_versions (str): Path to the current software versions (JSON).
-            software_to_upgrade (str): Name of the software to upgrade.
-            target_version (str): Target version for upgrade.
-            criteria (str): Criteria for selecting dependent upgrades ('minimum_changes' or 'latest_available').
+            software_to_upgrade (str, optional): Name of the software to upgrade. Leave unset to
+                answer several queries with analyze_query.
+            target_version (str, optional): Target version for upgrade.
+            criteria (str, optional): Criteria for selecting dependent upgrades ('minimum_changes' or
+                'latest_available'). Defaults to 'minimum_changes'.
+            snapshot (bool, optional): Load the compiled graph from its snapshot next to the sheet
+                when it is current, and save one otherwise. dependencies_df is then None.
+                Defaults to True.
         """
         self.master_sheet = master_sheet
         self.current_versions_file = current_versions
         self.software_to_upgrade = software_to_upgrade
         self.target_version = target_version
         self.criteria = criteria
+        self._resolvers = {}
         
-        # Load data using custom CSV parsing
-        self.dependencies_df = self._load_csv_safely(master_sheet)
+        # Load the compiled graph snapshot, or parse the sheet and index it once for all lookups
+        if snapshot:
+            self.dependencies_df = None
+            self.graph = load_graph(master_sheet)
+        else:
+            self.dependencies_df = self._load_csv_safely(master_sheet)
+            self.graph = DependencyGraph.from_dataframe(self.dependencies_df)
         
         # Load current versions
         with open(current_versions, 'r') as f:
             self.current_versions = json.load(f)
             
         # Validate input data
-        self._validate_input()
+        if software_to_upgrade is not None:
+            self._validate_input()
+    
+    @classmethod
+    def from_graph(cls, graph, current_versions, criteria="minimum_changes"):
+        """
+        Create an analyzer around an already compiled graph, without reading any files.
+        
+        Args:
+            graph (DependencyGraph): Compiled master sheet.
+            current_versions (dict): Installed version of each software.
+            criteria (str, optional): Default criteria for queries. Defaults to 'minimum_changes'.
+            
+        Returns:
+            DependencyAnalyzer: Analyzer for answering queries with analyze_query.
+        """
+        analyzer = cls.__new__(cls)
+        analyzer.master_sheet = analyzer.current_versions_file = None
+        analyzer.software_to_upgrade = analyzer.target_version = None
+        analyzer.criteria = criteria
+        analyzer._resolvers = {}
+        analyzer.dependencies_df = None
+        analyzer.graph = graph
+        analyzer.current_versions = current_versions
+        return analyzer
     
     def _load_csv_safely(self, csv_file):
         """
         Load CSV data safely, handling common parsing issues.
         
+        The sheet is read in chunks into categorical columns; short rows are padded
+        and cells past the header are dropped (see utils/sheet_loader.py).
+        
         Args:
             csv_file (str): Path to the CSV file.
             
         Returns:
             pandas.DataFrame: The loaded CSV data.
         """
-        try:
-            # First try manual parsing to ensure it's clean
-            rows = []
-            with open(csv_file, 'r') as f:
-                # Read lines and strip whitespace
-                lines = [line.strip() for line in f if line.strip()]
-            
-            # Parse the CSV data manually
-            reader = csv.reader(lines)
-            header = next(reader)
-            data = []
-            for row in reader:
-                # Ensure row has enough columns
-                while len(row) < len(header):
-                    row.append('')
-                data.append(row)
-            
-            # Create DataFrame
-            df = pd.DataFrame(data, columns=header)
-            
-            # Convert Version column to string to avoid type issues
-            if 'Version' in df.columns:
-                df['Version'] = df['Version'].astype(str)
-                
-            return df
-            
-        except Exception as e:
-            print(f"Warning: Error in manual CSV parsing: {e}")
-            try:
-                # Fall back to pandas with python engine
-                df = pd.read_csv(csv_file, engine='python')
-                
-                # Convert Version column to string to avoid type issues
-                if 'Version' in df.columns:
-                    df['Version'] = df['Version'].astype(str)
-                    
-                return df
-            except Exception as e2:
-                print(f"Error parsing CSV with python engine: {e2}")
-                # Last resort: try with skiprows
-                try:
-                    df = pd.read_csv(csv_file, engine='python', skiprows=0, error_bad_lines=False, warn_bad_lines=True)
-                    
-                    # Convert Version column to string to avoid type issues
-                    if 'Version' in df.columns:
-                        df['Version'] = df['Version'].astype(str)
-                        
-                    return df
-                except Exception as e3:
-                    raise ValueError(f"Failed to parse CSV file: {e3}")
+        # Imported here so loading a graph snapshot does not load pandas
+        from document_crawler.utils.sheet_loader import read_master_sheet
+        
+        return read_master_sheet(csv_file)
     
     def _validate_input(self):
         """Validate the input data."""
+        self._validate_query(self.software_to_upgrade, self.target_version)
+    
+    def _validate_query(self, software, target_version):
+        """
+        Validate one upgrade query against the loaded data.
+        
+        Args:
+            software (str): Name of the software to upgrade.
+            target_version (str): Target version for upgrade.
+        """
         # Check if the software to upgrade exists in the master sheet
-        software_exists = self.software_to_upgrade in self.dependencies_df['SoftwareName'].unique()
-        if not software_exists:
-            raise ValueError(f"Software '{self.software_to_upgrade}' not found in the master sheet")
+        if not self.graph.has_software(software):
+            raise ValueError(f"Software '{software}' not found in the master sheet")
         
         # Check if the target version exists in the master sheet
-        target_versions = [str(v) for v in self.dependencies_df[
-            self.dependencies_df['SoftwareName'] == self.software_to_upgrade
-        ]['Version'].unique()]
+        target_versions = self.graph.versions_of(software)
         
-        if str(self.target_version) not in target_versions:
+        if str(target_version) not in target_versions:
             raise ValueError(
-                f"Target version '{self.target_version}' not found for software '{self.software_to_upgrade}'. "
+                f"Target version '{target_version}' not found for software '{software}'. "
                 f"Available versions: {', '.join(target_versions)}"
             )
         
         # Check if the software exists in the current versions
-        if self.software_to_upgrade not in self.current_versions:
-            raise ValueError(f"Software '{self.software_to_upgrade}' not found in current versions")
-    
-    def _parse_version_requirement(self, version_req):
-        """
-        Parse a version requirement string like '2.1+' or '>=3.0'.
-        
-        Args:
-            version_req (str): Version requirement string.
-            
-        Returns:
-            tuple: (operator, version) e.g., ('>=', '2.1')
-        """
-        # Convert numpy types to Python types
-        if isinstance(version_req, (np.float64, np.float32, np.int64, np.int32)):
-            version_req = str(version_req)
-            
-        if not version_req or pd.isna(version_req):
-            # Handle empty values
-            return ('==', '0.0.0')
-            
-        if version_req.endswith('+'):
-            return ('>=', version_req[:-1])
-        elif version_req.startswith('>='):
-            return ('>=', version_req[2:])
-        elif version_req.startswith('>'):
-            return ('>', version_req[1:])
-        elif version_req.startswith('=='):
-            return ('==', version_req[2:])
-        elif version_req.startswith('='):
-            return ('==', version_req[1:])
-        else:
-            # Default to exact match
-            return ('==', version_req)
+        if software not in self.current_versions:
+            raise ValueError(f"Software '{software}' not found in current versions")
     
     def _check_version_requirement(self, current_version, required_version):
         """
@@ -170,147 +138,171 @@ class DependencyAnalyzer:
         Returns:
             bool: True if the requirement is met, False otherwise.
         """
-        if not required_version or pd.isna(required_version):
-            # If no requirement is specified, assume it's met
-            return True
-            
-        operator, version = self._parse_version_requirement(required_version)
+        # Requirements are compiled once and versions parsed once, then reused
+        return satisfies(current_version, required_version)
+    
+    def analyze(self):
+        """
+        Analyze dependencies and determine required upgrades.
         
-        try:
-            current_sem = semantic_version.Version(current_version)
-            required_sem = semantic_version.Version(version)
-            
-            if operator == '>=':
-                return current_sem >= required_sem
-            elif operator == '>':
-                return current_sem > required_sem
-            elif operator == '==':
-                return current_sem == required_sem
-            else:
-                return False
-        except ValueError:
-            # Fall back to simple string comparison if semantic versioning fails
-            if operator == '>=':
-                return current_version >= version
-            elif operator == '>':
-                return current_version > version
-            elif operator == '==':
-                return current_version == version
-            else:
-                return False
+        The requirements of the target release are followed transitively: a
+        dependency upgrade can require further upgrades, and installed software
+        whose requirements an upgrade would break is changed as well.
+        
+        Returns:
+            dict: Dictionary of required upgrades.
+        
+        Raises:
+            DependencyConflict: If no consistent set of upgrades exists.
+            ResolutionLimitExceeded: If the search gives up before finding an answer.
+        """
+        resolver = self._resolver(self.criteria)
+        required_upgrades = resolver.resolve(self.software_to_upgrade, self.target_version)
+        
+        for depends_on in resolver.missing:
+            print(f"Warning: Dependency '{depends_on}' not found in current versions")
+        
+        return required_upgrades
     
-    def _get_minimum_required_version(self, software, dependent_versions):
+    def _resolver(self, criteria):
         """
-        Get the minimum required version based on the criteria.
+        Get the resolver for a criteria, reusing its caches across queries.
         
         Args:
-            software (str): Software name.
-            dependent_versions (list): List of required versions.
+            criteria (str): 'minimum_changes' or 'latest_available'.
             
         Returns:
-            str: The selected version based on criteria.
+            DependencyResolver: The resolver.
         """
-        # Convert numpy types to Python types
-        dependent_versions = [str(v) if isinstance(v, (np.float64, np.float32, np.int64, np.int32)) else v 
-                              for v in dependent_versions]
-        
-        if self.criteria == 'minimum_changes':
-            # Sort versions and find the minimum that satisfies all requirements
-            all_versions = [str(v) for v in self.dependencies_df[
-                self.dependencies_df['SoftwareName'] == software
-            ]['Version'].unique()]
-            
-            # Convert to semantic versions for proper sorting
-            try:
-                sorted_versions = sorted(all_versions, key=lambda v: semantic_version.Version(v))
-            except ValueError:
-                # Fall back to string sorting if semantic versioning fails
-                sorted_versions = sorted(all_versions)
-            
-            # Find the minimum version that satisfies all requirements
-            for version in sorted_versions:
-                meets_all = True
-                for req_version in dependent_versions:
-                    if not req_version or pd.isna(req_version):
-                        continue
-                    op, ver = self._parse_version_requirement(req_version)
-                    try:
-                        if op == '>=' and semantic_version.Version(version) < semantic_version.Version(ver):
-                            meets_all = False
-                            break
-                    except ValueError:
-                        # Fall back to string comparison
-                        if op == '>=' and version < ver:
-                            meets_all = False
-                            break
-                
-                if meets_all:
-                    return version
-            
-            # If no version satisfies all requirements, return the highest one
-            return sorted_versions[-1] if sorted_versions else None
-        else:  # 'latest_available'
-            # Return the latest version
-            all_versions = [str(v) for v in self.dependencies_df[
-                self.dependencies_df['SoftwareName'] == software
-            ]['Version'].unique()]
-            
-            try:
-                sorted_versions = sorted(all_versions, key=lambda v: semantic_version.Version(v))
-            except ValueError:
-                sorted_versions = sorted(all_versions)
-            
-            return sorted_versions[-1] if sorted_versions else None
+        if criteria not in self._resolvers:
+            self._resolvers[criteria] = DependencyResolver(self.graph, self.current_versions, criteria)
+        return self._resolvers[criteria]
     
-    def analyze(self):
+    def analyze_query(self, query):
         """
-        Analyze dependencies and determine required upgrades.
+        Answer one upgrade query.
         
+        Args:
+            query (dict): Query with 'software' and 'target_version' keys and an optional
+                'criteria' (defaults to the analyzer's criteria). Other keys, such as an 'id',
+                are copied to the result.
+            
         Returns:
-            dict: Dictionary of required upgrades.
+            dict: The query plus 'upgrades' and 'warnings' (dependencies missing from the current
+                versions), or plus 'error' if the query could not be answered.
         """
-        # Get dependencies for the target version
-        dependencies = self.dependencies_df[
-            (self.dependencies_df['SoftwareName'] == self.software_to_upgrade) &
-            (self.dependencies_df['Version'] == str(self.target_version))
-        ]
+        if not isinstance(query, dict):
+            return {'error': "Query is not a JSON object"}
+        result = dict(query)
+        if 'error' in result:
+            # Lines that could not be read are passed through
+            return result
+        try:
+            software, target_version = query.get('software'), query.get('target_version')
+            if not software or target_version is None:
+                raise ValueError("Query needs 'software' and 'target_version'")
+            if not isinstance(software, str):
+                raise ValueError("Query 'software' must be a string")
+            if isinstance(target_version, bool) or not isinstance(target_version, (str, int, float)):
+                raise ValueError("Query 'target_version' must be a string or a number")
+            criteria = query.get('criteria') or self.criteria
+            if not isinstance(criteria, str) or criteria not in ("minimum_changes", "latest_available"):
+                raise ValueError(f"Unknown criteria {criteria!r}")
+            self._validate_query(software, str(target_version))
+            resolver = self._resolver(criteria)
+            result['upgrades'] = resolver.resolve(software, str(target_version))
+            result['warnings'] = [f"Dependency '{depends_on}' not found in current versions"
+                                  for depends_on in resolver.missing]
+        except ValueError as e:
+            result['error'] = str(e)
+        return result
+
+# Analyzer of each worker process in analyze_batch
+_worker_analyzer = None
+
+def _init_worker(graph, current_versions, criteria):
+    """
+    Build the analyzer of a worker process from the compiled graph.
+    
+    Args:
+        graph (DependencyGraph): Compiled master sheet.
+        current_versions (dict): Installed version of each software.
+        criteria (str): Default criteria for queries.
+    """
+    global _worker_analyzer
+    _worker_analyzer = DependencyAnalyzer.from_graph(graph, current_versions, criteria)
+
+def _analyze_chunk(queries):
+    """
+    Answer a chunk of queries inside a worker process.
+    
+    Args:
+        queries (list): Query dicts.
         
-        required_upgrades = {}
+    Returns:
+        list: One result per query.
+    """
+    return [_worker_analyzer.analyze_query(query) for query in queries]
+
+def analyze_batch(analyzer, queries, workers=1, chunksize=None):
+    """
+    Answer many upgrade queries against one loaded analyzer.
+    
+    With several workers, the compiled graph is sent to each worker process
+    once and the queries are spread across them in chunks.
+    
+    Args:
+        analyzer (DependencyAnalyzer): Loaded analyzer.
+        queries (iterable): Query dicts (see DependencyAnalyzer.analyze_query).
+        workers (int, optional): Worker processes. 1 answers in the current process,
+            0 or None uses all CPU cores. Defaults to 1.
+        chunksize (int, optional): Queries sent to a worker at once. Defaults to
+            roughly four chunks per worker.
         
-        for _, row in dependencies.iterrows():
-            depends_on = row['DependsOnSoftware']
-            required_version = row['DependsOnVersion']
-            
-            # Skip if the dependency is empty or NaN
-            if not depends_on or pd.isna(depends_on):
+    Yields:
+        dict: One result per query, in query order, as soon as it is available.
+    """
+    if not workers or workers < 0:
+        workers = os.cpu_count() or 1
+    if workers <= 1:
+        for query in queries:
+            yield analyzer.analyze_query(query)
+        return
+    
+    queries = list(queries)
+    if not chunksize or chunksize < 1:
+        chunksize = max(1, len(queries) // (workers * 4))
+    chunks = [queries[i:i + chunksize] for i in range(0, len(queries), chunksize)]
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks) or 1), initializer=_init_worker,
+                             initargs=(analyzer.graph, analyzer.current_versions, analyzer.criteria)) as executor:
+        for results in executor.map(_analyze_chunk, chunks):
+            yield from results
+
+def read_queries(queries_file):
+    """
+    Read upgrade queries from a JSONL file.
+    
+    Args:
+        queries_file (str): Path to the file; one JSON object per line, blank lines are skipped.
+        
+    Yields:
+        dict: Each query. A line that is not a JSON object yields {'line': n, 'error': ...}.
+    """
+    with open(queries_file, 'r', encoding='utf-8') as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
                 continue
-                
-            # Skip if the dependency is not in current versions
-            if depends_on not in self.current_versions:
-                print(f"Warning: Dependency '{depends_on}' not found in current versions")
+            try:
+                query = json.loads(line)
+            except ValueError as e:
+                yield {'line': number, 'error': f"Invalid JSON: {e}"}
                 continue
-            
-            current_version = self.current_versions[depends_on]
-            
-            # Check if the current version meets the requirement
-            if not self._check_version_requirement(current_version, required_version):
-                # Get all dependencies that require this software
-                all_requirements = dependencies[
-                    dependencies['DependsOnSoftware'] == depends_on
-                ]['DependsOnVersion'].tolist()
-                
-                # Determine the minimum required version
-                min_version = self._get_minimum_required_version(depends_on, all_requirements)
-                
-                required_upgrades[depends_on] = {
-                    'current_version': current_version,
-                    'required_version': min_version,
-                    'required_by': f"{self.software_to_upgrade} {self.target_version}"
-                }
-        
-        return required_upgrades
+            if not isinstance(query, dict):
+                query = {'line': number, 'error': "Query is not a JSON object"}
+            yield query
 
-def run(master_sheet, current_versions_file, software_to_upgrade, target_version, criteria):
+def run(master_sheet, current_versions_file, software_to_upgrade, target_version, criteria,
+        metrics_file=None, snapshot=True):
     """
     Run the software dependency analysis task.
     
@@ -320,21 +312,29 @@ def run(master_sheet, current_versions_file, software_to_upgrade, target_version
         software_to_upgrade (str): Name of the software to upgrade.
         target_version (str): Target version for upgrade.
         criteria (str): Criteria for selecting dependent upgrades.
+        metrics_file (str, optional): Path of the JSON stage timing file. Defaults to None
+            (timings are only printed).
+        snapshot (bool, optional): Use the compiled graph snapshot next to the master sheet.
+            Defaults to True.
     """
     print(f"Analyzing dependencies for upgrading {software_to_upgrade} to version {target_version}")
+    timer = StageTimer("analyze-deps")
     
     try:
         # Create dependency analyzer
-        analyzer = DependencyAnalyzer(
-            master_sheet, 
-            current_versions_file, 
-            software_to_upgrade, 
-            target_version, 
-            criteria
-        )
+        with timer.stage("load"):
+            analyzer = DependencyAnalyzer(
+                master_sheet, 
+                current_versions_file, 
+                software_to_upgrade, 
+                target_version, 
+                criteria,
+                snapshot=snapshot
+            )
         
         # Analyze dependencies
-        required_upgrades = analyzer.analyze()
+        with timer.stage("analyze"):
+            required_upgrades = analyzer.analyze()
         
         if not required_upgrades:
             print(f"No additional upgrades required to upgrade {software_to_upgrade} to version {target_version}")
@@ -348,6 +348,60 @@ def run(master_sheet, current_versions_file, software_to_upgrade, target_version
     
     except Exception as e:
         print(f"Error analyzing dependencies: {str(e)}")
+    
+    timer.report(metrics_file)
+
+def results_path_for(queries_file):
+    """
+    Get the default JSONL results path for a queries file.
+    
+    Args:
+        queries_file (str): Path to the queries file.
+        
+    Returns:
+        str: Path to the results file.
+    """
+    return os.path.splitext(queries_file)[0] + ".results.jsonl"
+
+def run_queries(master_sheet, current_versions_file, queries_file, criteria, output_file=None, workers=1,
+                metrics_file=None, snapshot=True):
+    """
+    Answer a file of upgrade queries against one load of the master sheet.
+    
+    Args:
+        master_sheet (str): Path to the master dependency sheet (CSV).
+        current_versions_file (str): Path to the current software versions (JSON).
+        queries_file (str): JSONL file of queries (see DependencyAnalyzer.analyze_query).
+        criteria (str): Criteria for queries that do not set their own.
+        output_file (str, optional): JSONL results file, written and flushed one line per query.
+            Defaults to <queries>.results.jsonl.
+        workers (int, optional): Worker processes (0 uses all CPU cores). Defaults to 1.
+        metrics_file (str, optional): Path of the JSON stage timing file. Defaults to None
+            (timings are only printed).
+        snapshot (bool, optional): Use the compiled graph snapshot next to the master sheet.
+            Defaults to True.
+    """
+    output_file = output_file or results_path_for(queries_file)
+    print(f"Analyzing upgrade queries from {queries_file}")
+    timer = StageTimer("analyze-deps")
+    
+    try:
+        with timer.stage("load"):
+            analyzer = DependencyAnalyzer(master_sheet, current_versions_file, criteria=criteria, snapshot=snapshot)
+        
+        answered = failed = 0
+        with timer.stage("analyze"), open(output_file, 'w', encoding='utf-8') as f:
+            for result in analyze_batch(analyzer, read_queries(queries_file), workers=workers):
+                f.write(json.dumps(result) + "\n")
+                f.flush()
+                answered += 1
+                failed += 'error' in result
+        print(f"Answered {answered} queries ({failed} failed); results saved to {output_file}")
+    
+    except Exception as e:
+        print(f"Error analyzing dependencies: {str(e)}")
+    
+    timer.report(metrics_file)
 
 if __name__ == "__main__":
     # For testing
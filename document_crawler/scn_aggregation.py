@@ -3,19 +3,33 @@ Software Change Notice Aggregation Task.
 This module aggregates software change notices between versions using Llama 3.3 via Groq.
 """
 import os
-import json
+import time
 import pandas as pd
 from dotenv import load_dotenv
-from crewai import Task, Crew, Process
 import semantic_version
 
-from document_crawler.utils.pdf_utils import list_pdf_files, extract_text_from_pdf, parse_version_from_filename
-from document_crawler.utils.llm_config import create_agent
+from document_crawler.utils.checkpoint import RunJournal
+from document_crawler.utils.chunking import DEFAULT_CHUNK_OVERLAP, DEFAULT_MAX_CHUNKS, split_text, text_budget
+from document_crawler.utils.concurrency import DEFAULT_CONCURRENCY, imap_concurrently
+from document_crawler.utils.pdf_backends import DEFAULT_ENGINE
+from document_crawler.utils.pdf_utils import list_pdf_files, batch_extract_text, parse_version_from_filename
+from document_crawler.utils.llm_config import get_agent
+from document_crawler.utils.llm_cache import get_llm_cache
+from document_crawler.utils.response_parser import parse_json_object
+from document_crawler.utils.task_runner import run_task
+from document_crawler.utils.telemetry import RunTelemetry
+from document_crawler.utils.timing import StageTimer
 
 # Load environment variables
 load_dotenv()
 
-def run(folder_path, software_name, current_version, target_version, output_file):
+# Maximum number of document characters sent to the LLM per prompt
+MAX_CONTENT_CHARS = 8000
+
+def run(folder_path, software_name, current_version, target_version, output_file,
+        workers=1, max_chars=MAX_CONTENT_CHARS, engine=DEFAULT_ENGINE, text_cache=True,
+        llm_cache=True, concurrency=DEFAULT_CONCURRENCY, chunk_overlap=DEFAULT_CHUNK_OVERLAP,
+        max_chunks=DEFAULT_MAX_CHUNKS, telemetry=True, run_id=None, metrics_file=None):
     """
     Run the software change notice aggregation task.
     
@@ -25,11 +39,33 @@ def run(folder_path, software_name, current_version, target_version, output_file
         current_version (str): Current installed version.
         target_version (str): Target upgrade version.
         output_file (str): Path to the output file (CSV or MD).
+        workers (int, optional): Number of processes used for PDF text extraction. Defaults to 1.
+        max_chars (int, optional): Document characters sent to the LLM per prompt (the chunk
+            size). Defaults to MAX_CONTENT_CHARS.
+        engine (str, optional): PDF engine name or 'auto'. Defaults to DEFAULT_ENGINE.
+        text_cache (TextCache or bool, optional): Extracted text cache; True uses the shared
+            default cache and False disables it. Defaults to True.
+        llm_cache (LLMCache or bool, optional): LLM response cache; True uses the shared
+            default cache and False always calls the LLM. Defaults to True.
+        concurrency (int, optional): Maximum number of LLM requests in flight.
+            Defaults to DEFAULT_CONCURRENCY.
+        chunk_overlap (int, optional): Characters repeated between consecutive chunks.
+            Defaults to DEFAULT_CHUNK_OVERLAP.
+        max_chunks (int, optional): Maximum chunks (LLM calls) per SCN; PDF parsing stops
+            once they are full. Defaults to DEFAULT_MAX_CHUNKS.
+        telemetry (TelemetryStore or bool, optional): LLM call telemetry store; True uses the
+            shared default store and False records nothing. Defaults to True.
+        run_id (str, optional): ID of an interrupted run to resume; versions it completed are
+            not analyzed again. Defaults to None, which starts a new run.
+        metrics_file (str, optional): Path of the JSON stage timing file. Defaults to None,
+            which writes '<output>.metrics.json'.
     """
     print(f"Aggregating SCNs for {software_name} from version {current_version} to {target_version}")
+    timer = StageTimer("aggregate-scn")
     
     # Find all PDF files in the folder
-    pdf_files = list_pdf_files(folder_path)
+    with timer.stage("list_pdf_files"):
+        pdf_files = list_pdf_files(folder_path)
     if not pdf_files:
         print(f"No PDF files found in {folder_path}")
         return
@@ -65,92 +101,107 @@ def run(folder_path, software_name, current_version, target_version, output_file
     
     print(f"Found {len(relevant_pdfs)} relevant SCN PDFs")
     
-    # Create agent with Llama 3.3
-    scn_analyzer = create_agent(
-        role="SCN Analyzer",
-        goal="Extract and categorize information from Software Change Notices",
-        backstory="You are an expert at analyzing software change notices and extracting key information."
-    )
+    # Journal the partial lists of each completed version so an interrupted run can be resumed
+    settings = dict(folder_path=os.path.abspath(folder_path), software_name=software_name,
+                    current_version=current_version, target_version=target_version,
+                    output_file=os.path.abspath(output_file), workers=workers, max_chars=max_chars,
+                    engine=engine, text_cache=bool(text_cache), llm_cache=bool(llm_cache),
+                    concurrency=concurrency, chunk_overlap=chunk_overlap, max_chunks=max_chunks,
+                    telemetry=bool(telemetry))
+    journal = RunJournal("aggregate-scn", settings, run_id)
+    print(f"Run ID: {journal.run_id} (continue an interrupted run with --resume {journal.run_id})")
+    run_telemetry = RunTelemetry(journal.run_id, "aggregate-scn", store=telemetry)
+    pending_pdfs = [(pdf_file, version) for pdf_file, version in relevant_pdfs if not journal.is_done(pdf_file)]
+    if len(pending_pdfs) < len(relevant_pdfs):
+        print(f"Resuming run {journal.run_id}: {len(relevant_pdfs) - len(pending_pdfs)} versions already completed")
     
-    # Process each SCN PDF
-    new_features_all = []
-    resolved_issues_all = []
-    known_issues_all = []
+    # Extract text from all pending PDFs up front so parsing can run in parallel,
+    # reading only as much as the chunks can hold
+    extract_chars = text_budget(max_chars, chunk_overlap, max_chunks)
+    with timer.stage("text_extraction"):
+        pdf_contents = batch_extract_text([pdf_file for pdf_file, _ in pending_pdfs],
+                                          workers=workers, max_chars=extract_chars, engine=engine,
+                                          cache=text_cache)
     
-    for pdf_file, version in relevant_pdfs:
-        print(f"Processing SCN for version {version}...")
-        
-        # Extract text from PDF
-        text_content = extract_text_from_pdf(pdf_file)
+    if llm_cache is True:
+        llm_cache = get_llm_cache()
+    
+    # Split each SCN into prompt-sized chunks (map step inputs)
+    chunk_jobs = []
+    for pdf_file, version in pending_pdfs:
+        text_content = pdf_contents.get(pdf_file, "")
         if not text_content.strip():
             print(f"Skipping {pdf_file} - No text content extracted")
             continue
-        
-        # Create task for this SCN
-        scn_task = Task(
-            description=f"""
-            Analyze the Software Change Notice (SCN) for {software_name} version {version}.
-            
-            Extract the following information:
-            1. New Features: List of new features introduced in this version.
-            2. Resolved Issues: List of issues that were fixed in this version.
-            3. Known Issues: List of known issues mentioned in this version.
-            
-            Return the results as a JSON dictionary with three keys:
-            "new_features", "resolved_issues", and "known_issues", each containing a list of items.
-            
-            Document content:
-            {text_content[:8000]}  # Limit content to avoid token limits
-            """,
-            agent=scn_analyzer,
-            expected_output="A JSON dictionary with extracted lists",
-            output_file=None
-        )
-        
-        # Create a crew with just this task
-        scn_crew = Crew(
-            agents=[scn_analyzer],
-            tasks=[scn_task],
-            verbose=True,
-            process=Process.sequential
+        with timer.stage("chunking"):
+            chunks = split_text(text_content, max_chars, chunk_overlap, max_chunks)
+        for part, chunk_text in enumerate(chunks, start=1):
+            chunk_jobs.append((pdf_file, version, chunk_text, part, len(chunks)))
+    
+    results_by_file = {}
+    incomplete_versions = []
+    
+    # Keep several SCN requests in flight; agents are cached per worker thread and share
+    # one LLM client whose connection pool matches the concurrency
+    def analyze(job):
+        pdf_file, version, chunk_text, part, total_parts = job
+        agent = get_agent(
+            role="SCN Analyzer",
+            goal="Extract and categorize information from Software Change Notices",
+            backstory="You are an expert at analyzing software change notices and extracting key information.",
+            pool_size=concurrency
         )
-        
-        # Run the crew and get results
-        result = scn_crew.kickoff()
-        
-        # Process the result
-        try:
-            # Parse the JSON result properly
-            # First, try to find JSON in the response if it's not already in JSON format
-            result_str = result
-            if not result_str.strip().startswith('{'):
-                # Try to find the JSON part in the response
-                start_idx = result_str.find('{')
-                end_idx = result_str.rfind('}')
-                if start_idx != -1 and end_idx != -1:
-                    result_str = result_str[start_idx:end_idx+1]
-            
-            extracted_data = json.loads(result_str)
-            
-            # Add version information to each item
-            new_features = [{"feature": item, "version": version} for item in extracted_data.get("new_features", [])]
-            resolved_issues = [{"issue": item, "version": version} for item in extracted_data.get("resolved_issues", [])]
-            known_issues = [{"issue": item, "version": version} for item in extracted_data.get("known_issues", [])]
-            
-            new_features_all.extend(new_features)
-            resolved_issues_all.extend(resolved_issues)
-            known_issues_all.extend(known_issues)
-            
-        except Exception as e:
-            print(f"Error processing result from {pdf_file}: {str(e)}")
-            print(f"Raw result: {result}")
+        return _analyze_scn_chunk(agent, pdf_file, version, chunk_text, part, total_parts,
+                                  software_name, llm_cache, timer, run_telemetry)
     
-    # Deduplicate entries and reconcile issues
-    new_features_deduped = _deduplicate_by_text(new_features_all, "feature")
-    resolved_issues_deduped = _deduplicate_by_text(resolved_issues_all, "issue")
+    # Chunk results come back in version order, so a version is complete at its last chunk;
+    # its lists are journaled unless a chunk failed, in which case a resumed run retries it.
+    # The per-call stages run in worker threads; 'llm_phase' is the wall time of the whole phase
+    llm_phase_start = time.perf_counter()
+    try:
+        partials = {"new_features": [], "resolved_issues": [], "known_issues": []}
+        failed = False
+        for job, extracted in zip(chunk_jobs, imap_concurrently(analyze, chunk_jobs, concurrency)):
+            pdf_file, _, _, part, total_parts = job
+            if extracted is None:
+                failed = True
+            else:
+                for key, items in zip(partials, extracted):
+                    partials[key].extend(items)
+            if part < total_parts:
+                continue
+            if failed:
+                results_by_file[pdf_file] = partials
+                incomplete_versions.append(job[1])
+            else:
+                journal.record(pdf_file, partials)
+            partials = {"new_features": [], "resolved_issues": [], "known_issues": []}
+            failed = False
+    finally:
+        journal.close()
+        timer.add("llm_phase", time.perf_counter() - llm_phase_start)
+    
+    # Reduce step: concatenate the lists in version order; duplicates from chunk overlap
+    # are removed below
+    new_features_all = []
+    resolved_issues_all = []
+    known_issues_all = []
+    
+    for pdf_file, _ in relevant_pdfs:
+        extracted = results_by_file.get(pdf_file) or journal.result(pdf_file)
+        if extracted is None:
+            continue
+        new_features_all.extend(extracted["new_features"])
+        resolved_issues_all.extend(extracted["resolved_issues"])
+        known_issues_all.extend(extracted["known_issues"])
     
-    # Remove any issue from known_issues if it appears in resolved_issues
-    remaining_known_issues = _reconcile_issues(known_issues_all, resolved_issues_deduped)
+    # Deduplicate entries and reconcile issues
+    with timer.stage("reconcile"):
+        new_features_deduped = _deduplicate_by_text(new_features_all, "feature")
+        resolved_issues_deduped = _deduplicate_by_text(resolved_issues_all, "issue")
+        
+        # Remove any issue from known_issues if it appears in resolved_issues
+        remaining_known_issues = _reconcile_issues(known_issues_all, resolved_issues_deduped)
     
     # Save results
     results = {
@@ -162,12 +213,97 @@ def run(folder_path, software_name, current_version, target_version, output_file
         "remaining_known_issues": remaining_known_issues
     }
     
-    if output_file.lower().endswith('.md'):
-        _save_to_markdown(results, output_file)
-    else:
-        _save_to_csv(results, output_file)
+    with timer.stage("output"):
+        if output_file.lower().endswith('.md'):
+            _save_to_markdown(results, output_file)
+        else:
+            _save_to_csv(results, output_file)
     
+    if incomplete_versions:
+        # Keep the journal so a resumed run retries only the versions with failed chunks
+        print(f"Warning: Some chunks of versions {', '.join(incomplete_versions)} could not be analyzed; "
+              f"their lists are incomplete. Retry them with --resume {journal.run_id}")
+    else:
+        journal.finish()
     print(f"SCN aggregation complete. Results saved to {output_file}")
+    if llm_cache:
+        print(llm_cache.summary())
+    print(run_telemetry.summary())
+    timer.report(metrics_file or os.path.splitext(output_file)[0] + ".metrics.json")
+
+def _analyze_scn_chunk(scn_analyzer, pdf_file, version, chunk_text, part, total_parts, software_name,
+                       llm_cache, timer, telemetry):
+    """
+    Extract new features, resolved issues and known issues from one chunk of an SCN.
+    
+    Args:
+        scn_analyzer (Agent): Agent that runs the SCN task.
+        pdf_file (str): Path to the SCN PDF.
+        version (str): Version the SCN describes.
+        chunk_text (str): Text of this chunk.
+        part (int): 1-based index of the chunk within the SCN.
+        total_parts (int): Number of chunks in the SCN.
+        software_name (str): Name of the software.
+        llm_cache (LLMCache): LLM response cache, or None.
+        timer (StageTimer): Records the prompt, LLM and JSON recovery stages.
+        telemetry (RunTelemetry): Records the LLM call.
+        
+    Returns:
+        tuple: (new_features, resolved_issues, known_issues) lists tagged with the version,
+            or None if the response could not be processed.
+    """
+    print(f"Processing SCN for version {version} (part {part} of {total_parts})...")
+    
+    stage_start = time.perf_counter()
+    part_note = ""
+    if total_parts > 1:
+        part_note = (f"This is part {part} of {total_parts} of the SCN. "
+                     f"Only list items that appear in this part.")
+    
+    # Create task for this SCN
+    task_description = f"""
+        Analyze the Software Change Notice (SCN) for {software_name} version {version}.
+        
+        Extract the following information:
+        1. New Features: List of new features introduced in this version.
+        2. Resolved Issues: List of issues that were fixed in this version.
+        3. Known Issues: List of known issues mentioned in this version.
+        
+        Return the results as a JSON dictionary with three keys:
+        "new_features", "resolved_issues", and "known_issues", each containing a list of items.
+        
+        {part_note}
+        Document content:
+        {chunk_text}
+        """
+    timer.add("prompt_building", time.perf_counter() - stage_start)
+    
+    with telemetry.call(pdf_file, part) as call:
+        # Run the task (or reuse a cached response) and get results
+        result = run_task(scn_analyzer, task_description, "A JSON dictionary with extracted lists", cache=llm_cache,
+                          timer=timer, call=call, validate=parse_json_object)
+        
+        # Process the result
+        stage_start = time.perf_counter()
+        try:
+            # Recover the JSON object from prose, code fences or trailing text
+            extracted_data = parse_json_object(result)
+            
+            # Add version information to each item
+            new_features = [{"feature": item, "version": version} for item in extracted_data.get("new_features", [])]
+            resolved_issues = [{"issue": item, "version": version}
+                               for item in extracted_data.get("resolved_issues", [])]
+            known_issues = [{"issue": item, "version": version} for item in extracted_data.get("known_issues", [])]
+            
+            call["parse_ok"] = True
+            return new_features, resolved_issues, known_issues
+            
+        except Exception as e:
+            print(f"Error processing result from {pdf_file}: {str(e)}")
+            print(f"Raw result: {result}")
+            return None
+        finally:
+            timer.add("json_recovery", time.perf_counter() - stage_start)
 
 def _deduplicate_by_text(items, text_key):
     """
@@ -0,0 +1,176 @@
+"""
+Run-level checkpoints for long extraction and SCN aggregation runs.
+
+Every run gets a run ID and a directory under the cache directory holding
+the run's command and settings plus a journal of completed documents. The
+journal is appended and flushed after each document, so a killed run can be
+continued with `--resume <run-id>`: finished documents are skipped and their
+journaled results are reused.
+
+A run's directory is deleted once the run completes. Runs that never
+complete are deleted RUN_RETENTION_DAYS after their last journal entry, when
+a later run starts.
+"""
+import json
+import os
+import shutil
+import time
+import uuid
+
+from document_crawler.utils.result_sink import ResultSink, read_rows
+from document_crawler.utils.text_cache import CACHE_DIR
+
+RUNS_DIR = os.path.join(CACHE_DIR, "runs")
+
+# Days an interrupted run stays resumable
+RUN_RETENTION_DAYS = 30
+
+def new_run_id():
+    """
+    Generate a new, sortable run ID.
+
+    Returns:
+        str: Run ID such as '20240131-142501-3fa2c1'.
+    """
+    return time.strftime("%Y%m%d-%H%M%S") + "-" + uuid.uuid4().hex[:6]
+
+def _run_directory(run_id):
+    return os.path.join(RUNS_DIR, run_id)
+
+def _load_metadata(run_id):
+    path = os.path.join(_run_directory(run_id), "run.json")
+    if not os.path.exists(path):
+        raise ValueError(f"Unknown run ID '{run_id}'")
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def prune_runs(max_age_days=RUN_RETENTION_DAYS):
+    """
+    Delete interrupted runs that have not been written to for a while.
+
+    Args:
+        max_age_days (float, optional): Age in days after which a run is deleted.
+            Defaults to RUN_RETENTION_DAYS.
+
+    Returns:
+        int: Number of runs deleted.
+    """
+    if not os.path.isdir(RUNS_DIR):
+        return 0
+    cutoff = time.time() - max_age_days * 24 * 3600
+    removed = 0
+    for run_id in os.listdir(RUNS_DIR):
+        directory = _run_directory(run_id)
+        try:
+            last_write = max(os.path.getmtime(os.path.join(directory, name)) for name in os.listdir(directory))
+        except ValueError:
+            # Empty directory
+            last_write = os.path.getmtime(directory)
+        except OSError:
+            continue
+        if last_write < cutoff:
+            shutil.rmtree(directory, ignore_errors=True)
+            removed += 1
+    return removed
+
+def load_run_settings(run_id, command):
+    """
+    Load the settings a run was started with, so it can be resumed.
+
+    Args:
+        run_id (str): Run ID printed when the run started.
+        command (str): Command being resumed, e.g. 'extract'.
+
+    Returns:
+        dict: Keyword arguments of the run function.
+
+    Raises:
+        ValueError: If the run does not exist or was started by another command.
+    """
+    metadata = _load_metadata(run_id)
+    if metadata["command"] != command:
+        raise ValueError(f"Run '{run_id}' was started by '{metadata['command']}', not '{command}'")
+    return metadata["settings"]
+
+class RunJournal:
+    """Journal of the documents a run has completed, with the result of each."""
+
+    def __init__(self, command, settings, run_id=None):
+        """
+        Start a new run, or reopen an existing one to resume it.
+
+        Args:
+            command (str): Command name, e.g. 'extract' or 'aggregate-scn'.
+            settings (dict): JSON-serializable keyword arguments of the run function.
+            run_id (str, optional): ID of the run to resume. Defaults to None, which starts a new run.
+
+        Raises:
+            ValueError: If the run to resume does not exist or belongs to another command.
+        """
+        self.command = command
+        if run_id is None:
+            prune_runs()
+            self.run_id = new_run_id()
+            os.makedirs(_run_directory(self.run_id), exist_ok=True)
+            self._metadata = {"command": command, "settings": settings, "created": time.time(),
+                              "status": "running"}
+            self._save_metadata()
+        else:
+            load_run_settings(run_id, command)
+            self.run_id = run_id
+            self._metadata = _load_metadata(run_id)
+        journal_path = os.path.join(_run_directory(self.run_id), "journal.jsonl")
+        self.completed = read_rows(journal_path)
+        self._sink = ResultSink(journal_path, append=True)
+
+    def _save_metadata(self):
+        path = os.path.join(_run_directory(self.run_id), "run.json")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self._metadata, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def is_done(self, pdf_file):
+        """
+        Check whether a document was completed by this run.
+
+        Args:
+            pdf_file (str): Path to the PDF file.
+
+        Returns:
+            bool: True if the document's result is in the journal.
+        """
+        return os.path.abspath(pdf_file) in self.completed
+
+    def result(self, pdf_file):
+        """
+        Get the journaled result of a completed document.
+
+        Args:
+            pdf_file (str): Path to the PDF file.
+
+        Returns:
+            The recorded result, or None.
+        """
+        return self.completed.get(os.path.abspath(pdf_file))
+
+    def record(self, pdf_file, result):
+        """
+        Durably mark a document as completed.
+
+        Args:
+            pdf_file (str): Path to the PDF file.
+            result: JSON-serializable result of the document.
+        """
+        key = os.path.abspath(pdf_file)
+        self._sink.write(key, result)
+        self.completed[key] = result
+
+    def finish(self):
+        """Close the journal and delete the run, whose results are now in its outputs."""
+        self.close()
+        shutil.rmtree(_run_directory(self.run_id), ignore_errors=True)
+
+    def close(self):
+        """Close the journal."""
+        self._sink.close()
@@ -0,0 +1,160 @@
+"""
+Chunking and map-reduce helpers for documents longer than one prompt.
+
+Documents are split on page boundaries first, then on blank lines and line
+breaks, so each chunk holds whole pages or sections where possible. Each
+chunk is extracted separately and the per-chunk field values are merged
+back into a single result per document.
+"""
+from document_crawler.utils.pdf_utils import PAGE_SEPARATOR
+
+# Characters of the previous chunk repeated at the start of the next one
+DEFAULT_CHUNK_OVERLAP = 500
+
+# Maximum number of chunks (LLM calls) per document
+DEFAULT_MAX_CHUNKS = 5
+
+# Boundaries to split on, from coarsest to finest
+_SEPARATORS = [PAGE_SEPARATOR, "\n\n", "\n"]
+
+# Values the LLM uses to say a field is absent from a chunk
+_MISSING_VALUES = {"", "not found", "n/a", "none", "null"}
+
+def split_units(text, chunk_size, separators=_SEPARATORS):
+    """
+    Split text into pieces no longer than chunk_size, preferring coarse boundaries.
+
+    Args:
+        text (str): Text to split.
+        chunk_size (int): Maximum piece length.
+        separators (list, optional): Boundaries to try, coarsest first.
+
+    Returns:
+        list: Text pieces, each ending with the separator that followed it.
+    """
+    if len(text) <= chunk_size:
+        return [text]
+    if not separators:
+        return [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+
+    separator, finer = separators[0], separators[1:]
+    pieces = text.split(separator)
+    units = []
+    for index, piece in enumerate(pieces):
+        if index < len(pieces) - 1:
+            piece += separator
+        if len(piece) <= chunk_size:
+            units.append(piece)
+        else:
+            units.extend(split_units(piece, chunk_size, finer))
+    return units
+
+def split_text(text, chunk_size, overlap=DEFAULT_CHUNK_OVERLAP, max_chunks=DEFAULT_MAX_CHUNKS):
+    """
+    Split a document into overlapping chunks on page and section boundaries.
+
+    Args:
+        text (str): Document text, with pages separated by PAGE_SEPARATOR.
+        chunk_size (int): Maximum characters per chunk.
+        overlap (int, optional): Characters of the previous chunk repeated at the start
+            of the next one. Defaults to DEFAULT_CHUNK_OVERLAP.
+        max_chunks (int, optional): Maximum number of chunks; text beyond the last chunk
+            is dropped. None means unlimited. Defaults to DEFAULT_MAX_CHUNKS.
+
+    Returns:
+        list: Chunk texts in document order.
+    """
+    overlap = max(0, min(overlap or 0, chunk_size // 2))
+    chunks = []
+    current = ""
+    for unit in split_units(text, chunk_size):
+        if current and len(current) + len(unit) > chunk_size:
+            chunks.append(current)
+            if max_chunks and len(chunks) >= max_chunks:
+                current = ""
+                break
+            tail = min(overlap, chunk_size - len(unit))
+            current = current[-tail:] if tail > 0 else ""
+        current += unit
+    if current.strip():
+        chunks.append(current)
+    return [chunk.replace(PAGE_SEPARATOR, "\n") for chunk in chunks if chunk.strip()]
+
+def text_budget(chunk_size, overlap=DEFAULT_CHUNK_OVERLAP, max_chunks=DEFAULT_MAX_CHUNKS):
+    """
+    Get the number of document characters that split_text can fit into its chunks.
+
+    Every chunk after the first starts with the overlap repeated from the one
+    before it, so only the rest of it is new text.
+
+    Args:
+        chunk_size (int): Maximum characters per chunk.
+        overlap (int, optional): Characters repeated between chunks. Defaults to DEFAULT_CHUNK_OVERLAP.
+        max_chunks (int, optional): Maximum number of chunks. Defaults to DEFAULT_MAX_CHUNKS.
+
+    Returns:
+        int: Characters worth extracting, or None if the number of chunks is unlimited.
+    """
+    if not max_chunks:
+        return None
+    overlap = max(0, min(overlap or 0, chunk_size // 2))
+    return chunk_size + (max_chunks - 1) * (chunk_size - overlap)
+
+def is_missing_value(value):
+    """
+    Check whether an extracted value means the field was not found.
+
+    Args:
+        value: Extracted value.
+
+    Returns:
+        bool: True if the value is empty or a 'Not Found' marker.
+    """
+    return value is None or (isinstance(value, str) and value.strip().lower() in _MISSING_VALUES)
+
+def merge_field_values(partials):
+    """
+    Reduce per-chunk extraction results into one result per document.
+
+    For each field, 'Not Found' values are ignored and the remaining distinct
+    values are kept in chunk order, joined by newlines. Values that differ
+    only in case or whitespace (e.g. repeated by the chunk overlap) are kept
+    once; values that merely contain one another, such as '1' and '10', are
+    both kept.
+
+    Args:
+        partials (list): Field dictionaries extracted from each chunk.
+
+    Returns:
+        dict: Merged field dictionary, or None if no chunk produced a result.
+    """
+    partials = [partial for partial in partials if partial]
+    if not partials:
+        return None
+    if len(partials) == 1:
+        return dict(partials[0])
+
+    merged = {}
+    for partial in partials:
+        for field, value in partial.items():
+            values = merged.setdefault(field, [])
+            if not is_missing_value(value):
+                values.append(value)
+
+    result = {}
+    for field, values in merged.items():
+        texts = [str(value).strip() for value in values]
+        distinct = []
+        seen = set()
+        for text in texts:
+            key = " ".join(text.lower().split())
+            if key not in seen:
+                seen.add(key)
+                distinct.append(text)
+        if not distinct:
+            result[field] = "Not Found"
+        elif len(distinct) == 1:
+            result[field] = values[texts.index(distinct[0])]
+        else:
+            result[field] = "\n".join(distinct)
+    return result
@@ -0,0 +1,61 @@
+"""
+Helpers for dispatching blocking LLM calls concurrently.
+"""
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+# Default number of LLM requests kept in flight
+DEFAULT_CONCURRENCY = 4
+
+def imap_concurrently(func, items, concurrency=DEFAULT_CONCURRENCY):
+    """
+    Lazily apply a function to every item using a bounded thread pool.
+    
+    At most `concurrency` calls are submitted at a time; the next item is
+    only taken from `items` once the oldest result has been yielded. Results
+    are yielded in input order as soon as each one (and every result before
+    it) is available, so callers can stream them out while later items are
+    still running. If a call raises, or the caller stops iterating, calls
+    that have not started yet are cancelled.
+    
+    Args:
+        func (callable): Function called with each item.
+        items (iterable): Items to process.
+        concurrency (int, optional): Maximum concurrent calls; 1 or less runs
+            sequentially in the calling thread. Defaults to DEFAULT_CONCURRENCY.
+        
+    Yields:
+        Results in the same order as the items.
+    """
+    items = iter(items)
+    if not concurrency or concurrency <= 1:
+        for item in items:
+            yield func(item)
+        return
+    
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        pending = deque(executor.submit(func, item) for item in islice(items, concurrency))
+        try:
+            while pending:
+                result = pending.popleft().result()
+                for item in islice(items, 1):
+                    pending.append(executor.submit(func, item))
+                yield result
+        finally:
+            for future in pending:
+                future.cancel()
+
+def map_concurrently(func, items, concurrency=DEFAULT_CONCURRENCY):
+    """
+    Apply a function to every item using a bounded thread pool.
+    
+    Args:
+        func (callable): Function called with each item.
+        items (iterable): Items to process.
+        concurrency (int, optional): Maximum concurrent calls. Defaults to DEFAULT_CONCURRENCY.
+        
+    Returns:
+        list: Results in the same order as the items.
+    """
+    return list(imap_concurrently(func, items, concurrency))
@@ -0,0 +1,150 @@
+"""
+Indexed dependency graph compiled from a master dependency sheet.
+
+The sheet is read once into two lookups: software -> its versions in sorted
+order, and (software, version) -> the requirements of that release. Every
+dependency query is then a dictionary lookup instead of a scan of the whole
+sheet, so analysis time no longer grows with the number of rows.
+"""
+from document_crawler.utils.versions import cell_text, encode_versions, filter_versions, sort_versions
+
+# Columns of the master dependency sheet
+SOFTWARE_COLUMN = "SoftwareName"
+VERSION_COLUMN = "Version"
+DEPENDS_ON_COLUMN = "DependsOnSoftware"
+DEPENDS_ON_VERSION_COLUMN = "DependsOnVersion"
+
+class DependencyGraph:
+    """Software versions and their requirements, indexed for constant-time lookups."""
+
+    def __init__(self, rows):
+        """
+        Compile the graph from the rows of a master dependency sheet.
+
+        Args:
+            rows (iterable): (software, version, depends_on, depends_on_version) tuples in sheet
+                order. Rows without a dependency only declare that the version exists.
+        """
+        versions = {}
+        self.requirements = {}
+        for software, version, depends_on, depends_on_version in rows:
+            software, version = cell_text(software), cell_text(version)
+            # A dict keeps the versions unique and in first-seen order until they are sorted
+            versions.setdefault(software, {})[version] = None
+            requirements = self.requirements.setdefault((software, version), [])
+            depends_on = cell_text(depends_on)
+            if depends_on:
+                requirements.append((depends_on, cell_text(depends_on_version)))
+        self.versions = {software: sort_versions(list(found)) for software, found in versions.items()}
+        self.rows = sum(len(requirements) for requirements in self.requirements.values())
+        self._codes = {}
+
+    def __getstate__(self):
+        # Version codes are a cache; they are rebuilt on first use after unpickling
+        state = self.__dict__.copy()
+        state['_codes'] = {}
+        return state
+
+    @classmethod
+    def from_dataframe(cls, df):
+        """
+        Compile the graph from a master sheet DataFrame.
+
+        Args:
+            df (pandas.DataFrame): Sheet with the SoftwareName, Version, DependsOnSoftware and
+                DependsOnVersion columns.
+
+        Returns:
+            DependencyGraph: The compiled graph.
+        """
+        columns = [df[column].tolist() if column in df.columns else [''] * len(df)
+                   for column in (SOFTWARE_COLUMN, VERSION_COLUMN, DEPENDS_ON_COLUMN, DEPENDS_ON_VERSION_COLUMN)]
+        return cls(zip(*columns))
+
+    def has_software(self, software):
+        """
+        Check whether a software appears in the sheet.
+
+        Args:
+            software (str): Software name.
+
+        Returns:
+            bool: True if the sheet lists at least one version of it.
+        """
+        return software in self.versions
+
+    def versions_of(self, software):
+        """
+        Get the versions of a software, lowest first.
+
+        Args:
+            software (str): Software name.
+
+        Returns:
+            list: Sorted version strings (empty if the software is unknown).
+        """
+        return self.versions.get(software, [])
+
+    def version_codes(self, software):
+        """
+        Get the packed version codes of a software, in the order of versions_of.
+
+        Args:
+            software (str): Software name.
+
+        Returns:
+            numpy.ndarray: int64 codes from encode_versions, computed on first use.
+        """
+        codes = self._codes.get(software)
+        if codes is None:
+            codes = self._codes[software] = encode_versions(self.versions_of(software))
+        return codes
+
+    def matching_versions(self, software, requirements):
+        """
+        Find the versions of a software that meet every requirement.
+
+        Args:
+            software (str): Software name.
+            requirements (iterable): Requirement strings such as '2.1+'.
+
+        Returns:
+            list: Indexes into versions_of(software) of the matching versions, lowest first.
+        """
+        return filter_versions(self.versions_of(software), requirements,
+                               codes=lambda: self.version_codes(software))
+
+    def latest_version(self, software):
+        """
+        Get the highest version of a software.
+
+        Args:
+            software (str): Software name.
+
+        Returns:
+            str: The latest version, or None if the software is unknown.
+        """
+        versions = self.versions_of(software)
+        return versions[-1] if versions else None
+
+    def requirements_of(self, software, version):
+        """
+        Get the requirements of one release.
+
+        Args:
+            software (str): Software name.
+            version (str): Version of the software.
+
+        Returns:
+            list: (depends_on, required_version) tuples in sheet order.
+        """
+        return self.requirements.get((software, str(version)), [])
+
+    def stats(self):
+        """
+        Describe the size of the graph.
+
+        Returns:
+            dict: Number of software, releases and requirement edges.
+        """
+        return {"software": len(self.versions), "releases": len(self.requirements), "requirements": self.rows}
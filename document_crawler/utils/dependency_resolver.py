@@ -0,0 +1,520 @@
+"""
+Transitive dependency resolution over a DependencyGraph.
+
+Upgrading one software to a target version can require upgrades of its
+dependencies. The chosen releases can require further upgrades, and an
+upgrade can break an installed package that pins the old version. The
+resolver searches for a consistent set of changes:
+
+- Every changed release has its requirements met by the version each
+  dependency ends up at.
+- No unchanged installed package has a requirement broken by a change.
+
+The search is a depth-first backtracking search over single-package
+changes, driven by the first unmet requirement. It is iterative, so deep
+upgrade chains do not hit the recursion limit. States are looked up by an
+incrementally kept hash of the assignment, and every hit is confirmed
+against the assignment itself, so a hash collision cannot skip a state. Constraints are kept
+incrementally with an undo trail, and candidate versions are filtered by
+every known constraint (and by whether their own requirements can be met
+at all) before they are tried; long version lists are filtered with numpy
+over packed version codes. Failed states are memoized, as are the candidate
+lists. When a dependent has to move, versions that need no further changes
+are tried first.
+
+A query that is not answered quickly is searched again after the versions
+each package can still take are narrowed down from the target release (arc
+consistency over the requirements). Narrowing spreads across much of a large
+graph, so it is only done for these queries; it proves many conflicts on its
+own and keeps the search away from versions that cannot be part of a
+solution. A search that runs out of steps raises ResolutionLimitExceeded
+rather than DependencyConflict, since it has not shown that no solution exists.
+"""
+import bisect
+from collections import deque
+
+from document_crawler.utils.versions import satisfies, version_key
+
+MINIMUM_CHANGES = "minimum_changes"
+LATEST_AVAILABLE = "latest_available"
+
+# Upper bound on search steps before giving up on a query
+DEFAULT_MAX_STEPS = 20000
+# Steps searched before the possible versions of every package are narrowed down
+QUICK_STEPS = 1000
+
+class DependencyConflict(ValueError):
+    """Raised when no consistent set of upgrades exists."""
+
+class ResolutionLimitExceeded(ValueError):
+    """Raised when the search gives up within its step limit, without proving a conflict."""
+
+class DependencyResolver:
+    """Finds a consistent set of upgrades for a software upgrade."""
+
+    def __init__(self, graph, current_versions, criteria=MINIMUM_CHANGES, max_steps=DEFAULT_MAX_STEPS):
+        """
+        Prepare a resolver for a graph and an installed base.
+
+        Args:
+            graph (DependencyGraph): Compiled master sheet.
+            current_versions (dict): Installed version of each software.
+            criteria (str, optional): 'minimum_changes' picks the lowest version that meets the
+                requirements, 'latest_available' the highest. Defaults to 'minimum_changes'.
+            max_steps (int, optional): Search steps per query before giving up. Defaults to DEFAULT_MAX_STEPS.
+        """
+        self.graph = graph
+        self.current_versions = current_versions
+        self.criteria = criteria
+        self.max_steps = max_steps
+        self._candidate_cache = {}
+        self._satisfiable_cache = {}
+        self._installed_dependents = None
+        self._links = None
+        self._needs_cache = {}
+
+    def _effective(self, software):
+        version = self._assign.get(software)
+        return version if version is not None else self.current_versions.get(software)
+
+    def _dependents(self, software):
+        """
+        Requirements on a software from the current releases of installed packages.
+
+        Requirements the installed version already fails are left out: a change
+        cannot break them.
+
+        Returns:
+            list: (dependent, requirement, source) tuples, where source names the installed release.
+        """
+        if self._installed_dependents is None:
+            self._installed_dependents = {}
+            for dependent, version in self.current_versions.items():
+                source = f"{dependent} {version}"
+                for depends_on, requirement in self.graph.requirements_of(dependent, version):
+                    installed = self.current_versions.get(depends_on)
+                    if installed is not None and satisfies(installed, requirement):
+                        self._installed_dependents.setdefault(depends_on, []).append(
+                            (dependent, requirement, source))
+        return self._installed_dependents.get(software, [])
+
+    def _constraints_on(self, software):
+        """
+        All requirements that currently apply to a software.
+
+        Returns:
+            list: (requirement, source) pairs, where source is the requiring release, e.g. 'SoftwareB 2.2'.
+        """
+        constraints = list(self._constraints.get(software, {}))
+        if software in self._assign:
+            # Installed packages that are not being changed still need their requirements met
+            assign = self._assign
+            constraints += [(requirement, source) for dependent, requirement, source in self._dependents(software)
+                            if dependent not in assign]
+        return constraints
+
+    def _check(self, software):
+        """Update the violation set for one software."""
+        version = self._effective(software)
+        if version is None:
+            # Not installed and not chosen: the original analysis skipped such dependencies
+            if self._constraints.get(software):
+                self.missing.setdefault(software, None)
+            self._violations.pop(software, None)
+            return
+        if all(satisfies(version, requirement) for requirement, _ in self._constraints_on(software)):
+            self._violations.pop(software, None)
+        else:
+            self._violations.setdefault(software, None)
+
+    def _add_release(self, software, version, sign):
+        """Add (sign=1) or remove (sign=-1) the requirements of a release; return the touched software."""
+        source = f"{software} {version}"
+        touched = []
+        for depends_on, requirement in self.graph.requirements_of(software, version):
+            bucket = self._constraints.setdefault(depends_on, {})
+            key = (requirement, source)
+            count = bucket.get(key, 0) + sign
+            if count:
+                bucket[key] = count
+            else:
+                bucket.pop(key, None)
+            touched.append(depends_on)
+        return touched
+
+    def _set_version(self, software, version):
+        """
+        Assign a version to a software (None restores its installed version).
+
+        Returns:
+            str: The previously assigned version, or None.
+        """
+        previous = self._assign.get(software)
+        touched = [software]
+        if previous is not None:
+            touched += self._add_release(software, previous, -1)
+            self._hash ^= hash((software, previous))
+            del self._assign[software]
+        elif software in self.current_versions:
+            # The installed release no longer constrains its dependencies
+            touched += [depends_on for depends_on, _ in
+                        self.graph.requirements_of(software, self.current_versions[software])]
+        if version is not None:
+            self._assign[software] = version
+            self._hash ^= hash((software, version))
+            touched += self._add_release(software, version, 1)
+        elif software in self.current_versions:
+            touched += [depends_on for depends_on, _ in
+                        self.graph.requirements_of(software, self.current_versions[software])]
+        for name in touched:
+            self._check(name)
+        return previous
+
+    def _needs(self, software, version):
+        """
+        Requirements of a release that a solution has to meet, by dependency.
+
+        The installed release of a package keeps the requirements it already
+        fails (see _dependents).
+
+        Returns:
+            dict: depends_on -> tuple of requirements.
+        """
+        key = (software, version)
+        needs = self._needs_cache.get(key)
+        if needs is None:
+            needs = {}
+            installed = self.current_versions
+            keep_failing = version == installed.get(software)
+            for depends_on, requirement in self.graph.requirements_of(software, version):
+                if keep_failing and not (depends_on in installed and satisfies(installed[depends_on], requirement)):
+                    continue
+                needs[depends_on] = needs.get(depends_on, ()) + (requirement,)
+            self._needs_cache[key] = needs
+        return needs
+
+    def _releases(self, software):
+        """Versions a software can end up at: the versions in the sheet and the installed one."""
+        versions = self.graph.versions_of(software)
+        installed = self.current_versions.get(software)
+        if installed is not None and installed not in versions:
+            versions = versions + [installed]
+        return versions
+
+    def _linked(self, software):
+        """Software that an installed package's release requires, or whose releases require it."""
+        if self._links is None:
+            self._links = {}
+            for dependent in self.current_versions:
+                for version in self._releases(dependent):
+                    for depends_on in self._needs(dependent, version):
+                        self._links.setdefault(dependent, set()).add(depends_on)
+                        self._links.setdefault(depends_on, set()).add(dependent)
+        linked = set(self._links.get(software, ()))
+        if software not in self.current_versions:
+            # The software being upgraded may not be installed
+            for version in self._domains[software]:
+                linked.update(self._needs(software, version))
+        return linked
+
+    def _domain(self, software):
+        domain = self._domains.get(software)
+        if domain is None:
+            domain = self._domains[software] = set(self._releases(software))
+        return domain
+
+    def _allowed(self, software, version):
+        domain = self._domains.get(software)
+        return domain is None or version in domain
+
+    def _revise(self, software, changed):
+        """
+        Keep the versions of a software that work with some version a linked software can still take.
+
+        Args:
+            software (str): Software whose versions are checked.
+            changed (str): Linked software whose versions were narrowed.
+
+        Returns:
+            set: The versions of the software that are still possible.
+        """
+        domain = self._domain(software)
+        versions = self._domains[changed]
+        # Versions of the software that at least one remaining release of the changed one accepts
+        accepted = set()
+        for candidate in versions:
+            needs = self._needs(changed, candidate).get(software)
+            if not needs:
+                accepted = domain
+                break
+            accepted.update(version for version in domain if all(satisfies(version, requirement)
+                                                                  for requirement in needs))
+        kept = set()
+        met = {}
+        for version in accepted:
+            needs = self._needs(software, version).get(changed)
+            if needs and needs not in met:
+                met[needs] = any(all(satisfies(candidate, requirement) for requirement in needs)
+                                 for candidate in versions)
+            if not needs or met[needs]:
+                kept.add(version)
+        return kept
+
+    def _narrow(self):
+        """
+        Narrow the versions every package can end up at, starting from the target release.
+
+        A version is dropped when a requirement of it cannot be met by any
+        version its dependency can still take, or when no version a dependent
+        can still take accepts it. This is repeated until nothing changes.
+
+        Returns:
+            str: A software left without any version, or None.
+        """
+        queue = deque([self._root])
+        queued = {self._root}
+        while queue:
+            changed = queue.popleft()
+            queued.discard(changed)
+            for software in self._linked(changed):
+                if software == self._root or software not in self.current_versions:
+                    continue
+                domain = self._domain(software)
+                kept = self._revise(software, changed)
+                if len(kept) == len(domain):
+                    continue
+                self._domains[software] = kept
+                if not kept:
+                    return software
+                if software not in queued:
+                    queued.add(software)
+                    queue.append(software)
+        return None
+
+    def _satisfiable(self, software, requirement):
+        """Check whether any known version of a software meets a requirement."""
+        key = (software, requirement)
+        if key not in self._satisfiable_cache:
+            installed = self.current_versions.get(software)
+            self._satisfiable_cache[key] = bool(
+                (installed is not None and satisfies(installed, requirement))
+                or self.graph.matching_versions(software, [requirement]))
+        return self._satisfiable_cache[key]
+
+    def _candidates(self, software, requirements):
+        """
+        Versions of a software that meet every requirement, in order of preference.
+
+        Upgrades come first (lowest first for 'minimum_changes', highest first for
+        'latest_available'), then downgrades. Versions whose own requirements
+        cannot be met by any version of an installed dependency are pruned.
+        """
+        key = (software, frozenset(requirements))
+        if key not in self._candidate_cache:
+            versions = self.graph.versions_of(software)
+            allowed = self.graph.matching_versions(software, requirements)
+            installed = self.current_versions.get(software)
+            # Upgrades come before downgrades, which are tried closest first
+            position = 0
+            if installed is not None:
+                installed_key = version_key(installed)
+                position = sum(1 for version in versions if version_key(version) <= installed_key)
+            split = bisect.bisect_left(allowed, position)
+            upgrades, downgrades = allowed[split:], allowed[:split][::-1]
+            if self.criteria == LATEST_AVAILABLE:
+                upgrades = upgrades[::-1]
+            candidates = []
+            for index in upgrades + downgrades:
+                version = versions[index]
+                if any(depends_on in self.current_versions and not self._satisfiable(depends_on, requirement)
+                       for depends_on, requirement in self.graph.requirements_of(software, version)):
+                    continue
+                candidates.append(version)
+            self._candidate_cache[key] = candidates
+        return self._candidate_cache[key]
+
+    def _new_violations(self, software, version):
+        """Count the requirements of a release that the current versions do not meet."""
+        count = 0
+        for depends_on, requirement in self.graph.requirements_of(software, version):
+            effective = self._effective(depends_on)
+            if effective is not None and not satisfies(effective, requirement):
+                count += 1
+        return count
+
+    def _options(self, software):
+        """
+        Changes that could fix the unmet requirements on a software.
+
+        A solution either moves the software or moves each unchanged installed
+        package whose requirement it breaks, so besides other versions of the
+        software only one such package needs to be branched on: the one with the
+        fewest alternatives, so that one without any fails straight away.
+
+        Returns:
+            list: (software, version) changes, best first: other versions of the software,
+                then other versions of one unchanged installed package whose requirement it breaks.
+        """
+        constraints = self._constraints_on(software)
+        current = self._effective(software)
+        options = []
+        if software != self._root:
+            requirements = [requirement for requirement, _ in constraints]
+            options += [(software, version) for version in self._candidates(software, requirements)
+                        if version != current and self._allowed(software, version)]
+        alternatives = None
+        for dependent, requirement, _ in self._dependents(software):
+            if dependent in self._assign or satisfies(current, requirement):
+                continue
+            installed = self.current_versions[dependent]
+            requirements = [requirement for requirement, _ in self._constraints_on(dependent)]
+            # Only versions that accept the software as it now stands fix this conflict
+            fixes = [(dependent, version) for version in self._candidates(dependent, requirements)
+                     if version != installed and self._allowed(dependent, version) and all(satisfies(current, required)
+                                                     for depends_on, required in
+                                                     self.graph.requirements_of(dependent, version)
+                                                     if depends_on == software)]
+            # Versions whose own requirements already hold are tried first, so a fix does not
+            # start a cascade of further changes when it can be avoided
+            fixes.sort(key=lambda option: self._new_violations(*option))
+            if alternatives is None or len(fixes) < len(alternatives):
+                alternatives = fixes
+                if not fixes:
+                    break
+        return options + (alternatives or [])
+
+    def _returns_to(self, frames, index):
+        """
+        Check whether the changes made since a search frame was entered cancel out.
+
+        Args:
+            frames (list): Search frames, each holding the (software, previous version) change it applied.
+            index (int): Index of the frame whose starting state is compared.
+
+        Returns:
+            bool: True if the current assignment equals the one at frames[index].
+        """
+        before = {}
+        for frame in frames[index:]:
+            software, previous = frame[2]
+            before.setdefault(software, previous)
+        return all(self._assign.get(software) == previous for software, previous in before.items())
+
+    def resolve(self, software, target_version):
+        """
+        Find the upgrades needed to move a software to a target version.
+
+        Args:
+            software (str): Software to upgrade.
+            target_version (str): Target version.
+
+        Returns:
+            dict: software -> {'current_version', 'required_version', 'required_by'} for every
+                package that must change, in the order the changes were decided.
+
+        Raises:
+            DependencyConflict: If no consistent set of upgrades exists.
+            ResolutionLimitExceeded: If the search gives up after max_steps steps without an answer.
+        """
+        self._root = software
+        # Most queries are answered quickly; narrowing first only pays off for the hard ones
+        self._domains = {}
+        try:
+            return self._search(software, target_version, min(QUICK_STEPS, self.max_steps))
+        except ResolutionLimitExceeded:
+            if self.max_steps <= QUICK_STEPS:
+                raise
+        self._domains = {software: {str(target_version)}}
+        stuck = self._narrow()
+        if stuck is not None:
+            raise DependencyConflict(f"No consistent set of upgrades for {software} {target_version}: "
+                                     f"no version of {stuck} fits the requirements of the other packages")
+        return self._search(software, target_version, self.max_steps)
+
+    def _search(self, software, target_version, max_steps):
+        """
+        Search for the changes, trying only versions left in the narrowed domains.
+
+        Args:
+            software (str): Software to upgrade.
+            target_version (str): Target version.
+            max_steps (int): Search steps before giving up.
+
+        Returns:
+            dict: The upgrades, as returned by resolve.
+
+        Raises:
+            DependencyConflict: If no consistent set of upgrades exists.
+            ResolutionLimitExceeded: If the search gives up after max_steps steps.
+        """
+        self._assign = {}
+        self._constraints = {}
+        self._violations = {}
+        self._hash = 0
+        self.missing = {}
+        self._set_version(software, str(target_version))
+
+        # State hash -> assignments that failed, and -> indexes of the frames on the path
+        failed = {}
+        on_path = {}
+        frames = []
+        deepest = None
+        steps = 0
+        while True:
+            steps += 1
+            if steps > max_steps:
+                raise ResolutionLimitExceeded(f"Gave up resolving {software} {target_version} after {max_steps} steps")
+            state = self._hash
+            # A state already on the search path would loop; one that failed before fails again
+            looped = any(self._returns_to(frames, index) for index in on_path.get(state, ()))
+            failed_before = state in failed and frozenset(self._assign.items()) in failed[state]
+            if not looped and not failed_before:
+                if not self._violations:
+                    return self._upgrades()
+                conflict = next(iter(self._violations))
+                options = self._options(conflict)
+                if deepest is None or len(frames) >= deepest[0]:
+                    deepest = (len(frames), conflict, self._constraints_on(conflict))
+                on_path.setdefault(state, []).append(len(frames))
+                frames.append([state, iter(options), None])
+            # Try the next option of the innermost choice, backtracking when one runs out
+            while frames:
+                frame = frames[-1]
+                if frame[2] is not None:
+                    self._set_version(frame[2][0], frame[2][1])
+                    frame[2] = None
+                option = next(frame[1], None)
+                if option is None:
+                    # Every change made in this frame is undone, so this is the frame's state
+                    failed.setdefault(frame[0], set()).add(frozenset(self._assign.items()))
+                    indexes = on_path[frame[0]]
+                    indexes.pop()
+                    if not indexes:
+                        del on_path[frame[0]]
+                    frames.pop()
+                    continue
+                frame[2] = (option[0], self._set_version(option[0], option[1]))
+                break
+            else:
+                _, conflict, constraints = deepest
+                required = ", ".join(f"{requirement} (by {source})" for requirement, source in constraints)
+                raise DependencyConflict(f"No consistent set of upgrades for {software} {target_version}: "
+                                         f"{conflict} cannot meet {required}")
+
+    def _upgrades(self):
+        upgrades = {}
+        for software, version in self._assign.items():
+            if software == self._root:
+                continue
+            sources = list(dict.fromkeys(source for _, source in self._constraints.get(software, {})))
+            if not sources:
+                # Changed because its installed release conflicted with another change
+                sources = [f"{changed} {self._assign[changed]}"
+                           for changed, _ in self.graph.requirements_of(software, self.current_versions[software])
+                           if changed in self._assign]
+            upgrades[software] = {
+                'current_version': self.current_versions.get(software),
+                'required_version': version,
+                'required_by': ", ".join(sources) or f"{self._root} {self._assign[self._root]}",
+            }
+        return upgrades
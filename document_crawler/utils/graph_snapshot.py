@@ -0,0 +1,175 @@
+"""
+Persistent snapshots of compiled dependency graphs.
+
+Parsing a large master sheet and compiling its DependencyGraph takes
+seconds, while the sheet itself changes rarely. The compiled graph is
+therefore saved as a snapshot and loaded instead of the CSV on later runs.
+A snapshot starts with a small header recording the snapshot format
+version and the SHA-256 of the sheet it was built from; it is only used
+when both match, so editing the sheet or upgrading the graph format
+rebuilds it.
+
+Snapshots are pickles, and unpickling a file can run arbitrary code. They
+are therefore kept in the user's own cache directory (CACHE_DIR/graphs),
+named by the SHA-256 of the sheet, and never next to the sheet, which often
+sits on a shared drive. Snapshots that have not been used for
+SNAPSHOT_RETENTION_DAYS are deleted when a new one is written.
+"""
+import gc
+import os
+import pickle
+import tempfile
+import time
+
+from document_crawler.utils.dependency_graph import DependencyGraph
+from document_crawler.utils.text_cache import CACHE_DIR, file_content_hash
+
+SNAPSHOT_DIR = os.path.join(CACHE_DIR, "graphs")
+
+# Bump when the pickled DependencyGraph layout changes
+SNAPSHOT_VERSION = 1
+
+# Days an unused snapshot is kept
+SNAPSHOT_RETENTION_DAYS = 30
+
+def snapshot_path_for(sheet_hash):
+    """
+    Get the snapshot path for a master sheet.
+
+    Args:
+        sheet_hash (str): SHA-256 of the master sheet.
+
+    Returns:
+        str: Path to the snapshot file.
+    """
+    return os.path.join(SNAPSHOT_DIR, f"{sheet_hash}.pickle")
+
+def prune_snapshots(max_age_days=SNAPSHOT_RETENTION_DAYS):
+    """
+    Delete snapshots that have not been used for a while.
+
+    Args:
+        max_age_days (float, optional): Age in days after which a snapshot is deleted.
+            Defaults to SNAPSHOT_RETENTION_DAYS.
+
+    Returns:
+        int: Number of snapshots deleted.
+    """
+    if not os.path.isdir(SNAPSHOT_DIR):
+        return 0
+    cutoff = time.time() - max_age_days * 24 * 3600
+    removed = 0
+    for name in os.listdir(SNAPSHOT_DIR):
+        path = os.path.join(SNAPSHOT_DIR, name)
+        try:
+            if name.endswith(".pickle") and os.path.getmtime(path) < cutoff:
+                os.unlink(path)
+                removed += 1
+        except OSError:
+            continue
+    return removed
+
+def read_snapshot(path, sheet_hash):
+    """
+    Load a graph snapshot if it was built from the given sheet contents.
+
+    Args:
+        path (str): Path to the snapshot file.
+        sheet_hash (str): SHA-256 of the master sheet.
+
+    Returns:
+        DependencyGraph: The graph, or None if the snapshot is missing, stale or unreadable.
+    """
+    try:
+        with open(path, 'rb') as f:
+            header = pickle.load(f)
+            if (not isinstance(header, dict) or header.get("version") != SNAPSHOT_VERSION
+                    or header.get("sha256") != sheet_hash):
+                return None
+            # The graph is millions of small objects, none of them cyclic garbage
+            collecting = gc.isenabled()
+            gc.disable()
+            try:
+                graph = pickle.load(f)
+            finally:
+                if collecting:
+                    gc.enable()
+    except FileNotFoundError:
+        return None
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, ValueError) as e:
+        print(f"Warning: Ignoring unreadable graph snapshot {path}: {e}")
+        return None
+    if not isinstance(graph, DependencyGraph):
+        return None
+    try:
+        # Mark the snapshot as used so pruning keeps it
+        os.utime(path)
+    except OSError:
+        pass
+    return graph
+
+def write_snapshot(graph, path, sheet_hash):
+    """
+    Save a graph snapshot, replacing any previous one atomically.
+
+    Args:
+        graph (DependencyGraph): Compiled graph.
+        path (str): Path to the snapshot file.
+        sheet_hash (str): SHA-256 of the master sheet the graph was built from.
+
+    Returns:
+        bool: True if the snapshot was written.
+    """
+    header = {"version": SNAPSHOT_VERSION, "sha256": sheet_hash, "graph": graph.stats()}
+    try:
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(graph, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+    except OSError as e:
+        print(f"Warning: Could not save graph snapshot {path}: {e}")
+        return False
+    return True
+
+def _compile_sheet(csv_file):
+    """Parse a master sheet and compile its graph."""
+    # Imported here so a snapshot hit does not load pandas
+    from document_crawler.utils.sheet_loader import read_master_sheet
+
+    return DependencyGraph.from_dataframe(read_master_sheet(csv_file))
+
+def load_graph(csv_file, snapshot=True):
+    """
+    Load the compiled graph of a master sheet, from its snapshot when it is current.
+
+    When there is no current snapshot, the sheet is parsed and compiled, and
+    the snapshot is (re)written for the next run.
+
+    Args:
+        csv_file (str): Path to the master sheet (CSV).
+        snapshot (bool, optional): Use and maintain the snapshot. Defaults to True.
+
+    Returns:
+        DependencyGraph: The compiled graph.
+
+    Raises:
+        ValueError: If the sheet cannot be parsed as CSV.
+    """
+    if not snapshot:
+        return _compile_sheet(csv_file)
+    sheet_hash = file_content_hash(csv_file)
+    path = snapshot_path_for(sheet_hash)
+    graph = read_snapshot(path, sheet_hash)
+    if graph is None:
+        graph = _compile_sheet(csv_file)
+        prune_snapshots()
+        if write_snapshot(graph, path, sheet_hash):
+            print(f"Saved compiled dependency graph to {path}")
+    return graph
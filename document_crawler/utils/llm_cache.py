@@ -0,0 +1,266 @@
+"""
+Persistent cache for LLM task responses.
+
+Responses are keyed by a hash of everything that determines the answer:
+the model name, endpoint and temperature, the agent's role, goal and backstory, and
+the fully rendered task description and expected output. Entries expire
+after a TTL and the store is kept under a size limit by evicting the least
+recently used entries.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from document_crawler.utils.text_cache import CACHE_DIR
+
+DEFAULT_LLM_CACHE_PATH = os.path.join(CACHE_DIR, "llm_cache.sqlite")
+
+# Cached responses expire after 30 days
+DEFAULT_TTL_SECONDS = 30 * 24 * 60 * 60
+
+# Default size limit for stored (compressed) responses
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    response BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    model TEXT,
+    created REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access);
+CREATE INDEX IF NOT EXISTS responses_created ON responses (created);
+"""
+
+def llm_signature(agent):
+    """
+    Describe the model configuration of a CrewAI agent.
+
+    Args:
+        agent (Agent): The agent.
+
+    Returns:
+        dict: Model name, API endpoint, temperature and agent role, goal and backstory.
+    """
+    llm = getattr(agent, "llm", None)
+    model = getattr(llm, "model_name", None) or getattr(llm, "model", None)
+    api_base = getattr(llm, "openai_api_base", None) or getattr(llm, "base_url", None)
+    return {
+        "model": str(model) if model else None,
+        "api_base": str(api_base) if api_base else None,
+        "temperature": getattr(llm, "temperature", None),
+        "role": getattr(agent, "role", None),
+        "goal": getattr(agent, "goal", None),
+        "backstory": getattr(agent, "backstory", None),
+    }
+
+def make_cache_key(agent, description, expected_output):
+    """
+    Build the cache key for a task run by an agent.
+
+    Args:
+        agent (Agent): Agent that runs the task.
+        description (str): Rendered task description.
+        expected_output (str): Task expected output.
+
+    Returns:
+        str: Cache key.
+    """
+    payload = dict(llm_signature(agent), description=description, expected_output=expected_output)
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+class LLMCache:
+    """TTL- and size-bounded SQLite store of raw LLM task responses."""
+
+    def __init__(self, path=DEFAULT_LLM_CACHE_PATH, ttl_seconds=DEFAULT_TTL_SECONDS, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Open (or create) an LLM response cache.
+
+        Args:
+            path (str, optional): SQLite database path. Defaults to DEFAULT_LLM_CACHE_PATH.
+            ttl_seconds (float, optional): Entry lifetime. Defaults to DEFAULT_TTL_SECONDS.
+            max_bytes (int, optional): Size limit for stored responses. Defaults to DEFAULT_MAX_BYTES.
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Tasks may be dispatched from worker threads, so the connection is shared under a lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def get(self, key):
+        """
+        Look up a cached response that has not expired.
+
+        Args:
+            key (str): Cache key.
+
+        Returns:
+            str: Cached response, or None on a miss.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM responses WHERE key = ? AND created >= ?", (key, now - self.ttl_seconds)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            with self._conn:
+                self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+        return zlib.decompress(row[0]).decode("utf-8")
+
+    def put(self, key, response, model=None):
+        """
+        Store a response and evict expired or least recently used entries if over the size limit.
+
+        Args:
+            key (str): Cache key.
+            response (str): Raw LLM response.
+            model (str, optional): Model name, kept for reporting.
+        """
+        blob = zlib.compress(response.encode("utf-8"))
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, size, model, created, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, blob, len(blob), model, now, now)
+            )
+        if self.total_size() > self.max_bytes:
+            self.prune()
+
+    def total_size(self):
+        """
+        Size of the stored (compressed) responses in bytes.
+
+        Returns:
+            int: Total stored size.
+        """
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def prune(self, max_bytes=None):
+        """
+        Drop expired entries, then evict least recently used entries until under the size limit.
+
+        Args:
+            max_bytes (int, optional): Size limit to prune to. Defaults to the cache limit.
+
+        Returns:
+            int: Number of removed entries.
+        """
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        with self._lock, self._conn:
+            removed = self._conn.execute(
+                "DELETE FROM responses WHERE created < ?", (time.time() - self.ttl_seconds,)
+            ).rowcount
+        total = self.total_size()
+        with self._lock:
+            evicted = []
+            freed = 0
+            for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY last_access"):
+                if total - freed <= limit:
+                    break
+                evicted.append((key,))
+                freed += size
+            with self._conn:
+                self._conn.executemany("DELETE FROM responses WHERE key = ?", evicted)
+        return removed + len(evicted)
+
+    def clear(self):
+        """Remove every cached response."""
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM responses")
+            self._conn.execute("VACUUM")
+
+    def stats(self):
+        """
+        Summarize the cache contents.
+
+        Returns:
+            dict: Entry count, expired count, size and limits.
+        """
+        entries, expired = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(created < ?), 0) FROM responses", (time.time() - self.ttl_seconds,)
+        ).fetchone()
+        return {
+            "path": self.path,
+            "entries": entries,
+            "expired": expired,
+            "stored_bytes": self.total_size(),
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+    def summary(self):
+        """
+        Describe this run's hit and miss counters.
+
+        Returns:
+            str: Human-readable counter summary.
+        """
+        lookups = self.hits + self.misses
+        rate = f" ({self.hits / lookups:.0%} hit rate)" if lookups else ""
+        return f"LLM cache: {self.hits} hits, {self.misses} misses{rate}"
+
+    def close(self):
+        """Close the underlying database connection."""
+        self._conn.close()
+
+_default_cache = None
+
+def get_llm_cache():
+    """
+    Return the process-wide default LLM response cache, opening it on first use.
+
+    Returns:
+        LLMCache: The shared cache.
+    """
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = LLMCache()
+    return _default_cache
+
+def run(action, max_size_mb=None):
+    """
+    Run an LLM cache maintenance command.
+
+    Args:
+        action (str): One of 'stats', 'prune' or 'clear'.
+        max_size_mb (float, optional): Size limit in MiB for 'prune'. Defaults to the cache limit.
+    """
+    cache = get_llm_cache()
+    if action == "stats":
+        stats = cache.stats()
+        print(f"LLM cache: {stats['path']}")
+        print(f"  Entries: {stats['entries']} ({stats['expired']} expired)")
+        print(f"  Stored size: {stats['stored_bytes'] / 1024 / 1024:.1f} MiB "
+              f"(limit {stats['max_bytes'] / 1024 / 1024:.0f} MiB)")
+        print(f"  TTL: {stats['ttl_seconds'] / 86400:.0f} days")
+    elif action == "prune":
+        max_bytes = int(max_size_mb * 1024 * 1024) if max_size_mb is not None else None
+        removed = cache.prune(max_bytes)
+        print(f"Removed {removed} entries from the LLM cache")
+    elif action == "clear":
+        cache.clear()
+        print("LLM cache cleared")
+    else:
+        raise ValueError(f"Unknown cache action '{action}'")
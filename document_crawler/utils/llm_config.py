@@ -2,34 +2,146 @@
 Configuration for Llama 3.3 model with Groq.
 """
 import os
-import sys
+import threading
+
+import httpx
 from dotenv import load_dotenv
 from crewai import Agent
-from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_openai import ChatOpenAI
 
-# Debug print to verify this file is being used
-print(">>> Loading updated llm_config.py with ChatOpenAI <<<")
-print(f">>> Python version: {sys.version} <<<")
-print(f">>> File path: {__file__} <<<")
+# Groq model and endpoint (OpenAI API compatible). Both can be overridden with the
+# DOCUMENT_CRAWLER_LLM_MODEL and DOCUMENT_CRAWLER_LLM_BASE_URL environment variables
+# or configure_llm(), e.g. to point at a local server such as benchmarks/mock_llm_server.py
+DEFAULT_MODEL_NAME = "groq/llama3-70b-8192"
+DEFAULT_API_BASE = "https://api.groq.com/openai/v1"
+TEMPERATURE = 0.2
+
+# Keep-alive connections in the shared pool when no concurrency level is given
+DEFAULT_POOL_SIZE = 4
+
+_overrides = {}
+_llm = None
+_llm_config = None
+_llm_pool_size = 0
+_llm_lock = threading.Lock()
+_agents = threading.local()
+
+# Responses the OpenAI client retries; counted per thread for the call telemetry
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+_http_counters = threading.local()
+
+def _count_request(request):
+    _http_counters.requests = getattr(_http_counters, "requests", 0) + 1
+
+def _count_response(response):
+    if response.status_code in RETRYABLE_STATUS_CODES or response.status_code >= 500:
+        _http_counters.retryable = getattr(_http_counters, "retryable", 0) + 1
+
+def http_request_counts():
+    """
+    Count the HTTP requests the shared client has sent from the current thread.
+    
+    The counters only grow; compare two readings to get the requests made by one call.
+    
+    Returns:
+        tuple: (requests sent, responses with a retryable status such as 429 or 5xx).
+    """
+    return getattr(_http_counters, "requests", 0), getattr(_http_counters, "retryable", 0)
+
+def configure_llm(base_url=None, model=None, api_key=None):
+    """
+    Override the endpoint, model or API key for this process.
+    
+    The shared client is rebuilt with the new settings on its next use.
+    
+    Args:
+        base_url (str, optional): OpenAI-compatible API base URL. Defaults to None (unchanged).
+        model (str, optional): Model name. Defaults to None (unchanged).
+        api_key (str, optional): API key. Defaults to None (unchanged).
+    """
+    for name, value in (("base_url", base_url), ("model", model), ("api_key", api_key)):
+        if value is not None:
+            _overrides[name] = value
 
-# Disable proxies in the environment
-os.environ["HTTP_PROXY"] = ""
-os.environ["HTTPS_PROXY"] = ""
-os.environ["NO_PROXY"] = "*"
+def get_api_base():
+    """
+    Get the OpenAI-compatible API base URL to use.
+    
+    Returns:
+        str: The configured base URL, or DEFAULT_API_BASE.
+    """
+    return _overrides.get("base_url") or os.getenv("DOCUMENT_CRAWLER_LLM_BASE_URL") or DEFAULT_API_BASE
 
-# Load environment variables
-load_dotenv()
+def get_model_name():
+    """
+    Get the model name to use.
+    
+    Returns:
+        str: The configured model name, or DEFAULT_MODEL_NAME.
+    """
+    return _overrides.get("model") or os.getenv("DOCUMENT_CRAWLER_LLM_MODEL") or DEFAULT_MODEL_NAME
 
-# Get API key from environment and set it for CrewAI
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-if not GROQ_API_KEY:
+def get_api_key():
+    """
+    Read the API key from the environment (or the .env file) when a client is built.
+    
+    DOCUMENT_CRAWLER_LLM_API_KEY takes precedence over GROQ_API_KEY. A custom
+    base URL may be used without a key, since local servers do not check it.
+    
+    Returns:
+        str: The API key.
+        
+    Raises:
+        ValueError: If no key is set and the Groq endpoint is used.
+    """
+    load_dotenv()
+    api_key = (_overrides.get("api_key") or os.getenv("DOCUMENT_CRAWLER_LLM_API_KEY")
+               or os.getenv("GROQ_API_KEY"))
+    if api_key:
+        return api_key
+    if get_api_base() != DEFAULT_API_BASE:
+        return "not-needed"
     raise ValueError("GROQ_API_KEY not found in environment variables. Please set it in the .env file.")
 
-# Set the API key in the environment
-os.environ["GROQ_API_KEY"] = GROQ_API_KEY
+def get_llm(pool_size=None):
+    """
+    Return the process-wide chat model, creating it on first use.
+    
+    All agents share one client and one keep-alive connection pool, so
+    connections (and their TLS sessions) are reused across documents. The
+    client is rebuilt with a larger pool if more connections are requested,
+    or when the endpoint or model changes. Proxy settings from the
+    environment are ignored by this client.
+    
+    Args:
+        pool_size (int, optional): Connections to keep open, usually the number of LLM
+            requests in flight. Defaults to DEFAULT_POOL_SIZE.
+        
+    Returns:
+        ChatOpenAI: The shared chat model.
+    """
+    global _llm, _llm_config, _llm_pool_size
+    pool_size = max(pool_size or DEFAULT_POOL_SIZE, 1)
+    config = (get_api_base(), get_model_name())
+    with _llm_lock:
+        if _llm is None or pool_size > _llm_pool_size or config != _llm_config:
+            http_client = httpx.Client(
+                limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+                trust_env=False,  # Disable proxy lookup from environment
+                event_hooks={"request": [_count_request], "response": [_count_response]}
+            )
+            _llm = ChatOpenAI(
+                model=config[1],
+                temperature=TEMPERATURE,
+                openai_api_key=get_api_key(),
+                openai_api_base=config[0],
+                http_client=http_client
+            )
+            _llm_config = config
+            _llm_pool_size = pool_size
+        return _llm
 
-def create_agent(role, goal, backstory, verbose=True, allow_delegation=False):
+def create_agent(role, goal, backstory, verbose=True, allow_delegation=False, pool_size=None):
     """
     Create an agent with Llama 3.3 model.
     
@@ -39,29 +151,44 @@ def create_agent(role, goal, backstory, verbose=True, allow_delegation=False):
         backstory (str): The backstory of the agent.
         verbose (bool, optional): Whether to enable verbose output. Defaults to True.
         allow_delegation (bool, optional): Whether to allow delegation. Defaults to False.
+        pool_size (int, optional): Connections kept open by the shared client. Defaults to None.
         
     Returns:
         Agent: A CrewAI agent configured with Llama 3.3.
     """
-    # Debug print to verify this function is being called
-    print(">>> Creating agent with ChatOpenAI + Groq API <<<")
-    
-    # Create Chat model using ChatOpenAI pointing to Groq's API
-    # Groq provides OpenAI API compatibility
-    llm = ChatOpenAI(
-        model="groq/llama3-70b-8192",
-        temperature=0.2,
-        openai_api_key=GROQ_API_KEY,
-        openai_api_base="https://api.groq.com/openai/v1",
-        http_client_extra_kwargs={"trust_env": False}  # Disable proxy lookup from environment
-    )
-    
-    # Create and return the agent with the LLM
     return Agent(
         role=role,
         goal=goal,
         backstory=backstory,
         verbose=verbose,
         allow_delegation=allow_delegation,
-        llm=llm
-    ) 
\ No newline at end of file
+        llm=get_llm(pool_size)
+    )
+
+def get_agent(role, goal, backstory, verbose=True, allow_delegation=False, pool_size=None):
+    """
+    Return a cached agent for a role and configuration, creating it on first use.
+    
+    Crew runs modify the agent they execute, so agents are cached per thread;
+    they all share the process-wide chat model and its connection pool.
+    
+    Args:
+        role (str): The role of the agent.
+        goal (str): The goal of the agent.
+        backstory (str): The backstory of the agent.
+        verbose (bool, optional): Whether to enable verbose output. Defaults to True.
+        allow_delegation (bool, optional): Whether to allow delegation. Defaults to False.
+        pool_size (int, optional): Connections kept open by the shared client. Defaults to None.
+        
+    Returns:
+        Agent: The cached agent.
+    """
+    if not hasattr(_agents, "cache"):
+        _agents.cache = {}
+    llm = get_llm(pool_size)
+    key = (role, goal, backstory, verbose, allow_delegation)
+    agent = _agents.cache.get(key)
+    if agent is None or agent.llm is not llm:
+        agent = create_agent(role, goal, backstory, verbose, allow_delegation, pool_size)
+        _agents.cache[key] = agent
+    return agent
@@ -0,0 +1,137 @@
+"""
+Incremental crawl manifest for the extraction task.
+
+The manifest is stored next to the extraction output and records, for
+every processed PDF, its size, modification time, content hash, the
+signature of the requested fields and a pointer to its row in the JSON
+output. Later runs use it to skip documents that have not changed.
+"""
+import hashlib
+import json
+import os
+
+from document_crawler.utils.text_cache import file_content_hash
+
+MANIFEST_VERSION = 1
+
+def manifest_path_for(output_file):
+    """
+    Get the manifest path for an extraction output file.
+
+    Args:
+        output_file (str): Path to the CSV/XLSX output file.
+
+    Returns:
+        str: Path to the manifest file.
+    """
+    return os.path.splitext(output_file)[0] + ".manifest.json"
+
+def fields_signature(fields):
+    """
+    Hash a list of requested fields so a change in fields forces re-extraction.
+
+    Args:
+        fields (list): Requested field names.
+
+    Returns:
+        str: Signature of the field list.
+    """
+    return hashlib.sha256(json.dumps(list(fields)).encode("utf-8")).hexdigest()[:16]
+
+class CrawlManifest:
+    """Per-document record of what was extracted and where the result lives."""
+
+    def __init__(self, path):
+        """
+        Load a manifest, starting empty if it does not exist or cannot be read.
+
+        Args:
+            path (str): Path to the manifest file.
+        """
+        self.path = path
+        self.documents = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    data = json.load(f)
+                if data.get("version") == MANIFEST_VERSION:
+                    self.documents = data.get("documents", {})
+            except (OSError, ValueError) as e:
+                print(f"Warning: Ignoring unreadable manifest {path}: {e}")
+
+    def is_current(self, pdf_file, signature):
+        """
+        Check whether a document is unchanged since it was last extracted.
+
+        Size and modification time are compared first; the content hash is
+        only computed when they differ, so touched-but-identical files are
+        still recognized.
+
+        Args:
+            pdf_file (str): Path to the PDF file.
+            signature (str): Fields signature of the current run.
+
+        Returns:
+            bool: True if the stored result can be reused.
+        """
+        entry = self.documents.get(os.path.abspath(pdf_file))
+        if not entry or entry.get("fields_signature") != signature or entry.get("result") is None:
+            return False
+        stat = os.stat(pdf_file)
+        if stat.st_size == entry["size"] and stat.st_mtime == entry["mtime"]:
+            return True
+        if stat.st_size != entry["size"] or file_content_hash(pdf_file) != entry["sha256"]:
+            return False
+        entry["mtime"] = stat.st_mtime
+        return True
+
+    def result_pointer(self, pdf_file):
+        """
+        Get the index of a document's row in the previous JSON output.
+
+        Args:
+            pdf_file (str): Path to the PDF file.
+
+        Returns:
+            int: Row index, or None.
+        """
+        entry = self.documents.get(os.path.abspath(pdf_file))
+        return entry.get("result") if entry else None
+
+    def record(self, pdf_file, signature, result_index):
+        """
+        Record the current state of a document and where its result is stored.
+
+        Args:
+            pdf_file (str): Path to the PDF file.
+            signature (str): Fields signature of the current run.
+            result_index (int): Row index in the JSON output, or None if extraction failed.
+        """
+        key = os.path.abspath(pdf_file)
+        stat = os.stat(pdf_file)
+        previous = self.documents.get(key)
+        unchanged = previous and previous["size"] == stat.st_size and previous["mtime"] == stat.st_mtime
+        self.documents[key] = {
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "sha256": previous["sha256"] if unchanged else file_content_hash(pdf_file),
+            "fields_signature": signature,
+            "result": result_index,
+        }
+
+    def retain(self, pdf_files):
+        """
+        Drop entries for documents that are no longer in the crawl.
+
+        Args:
+            pdf_files (list): Paths of the documents in the current crawl.
+        """
+        keep = {os.path.abspath(pdf_file) for pdf_file in pdf_files}
+        self.documents = {key: entry for key, entry in self.documents.items() if key in keep}
+
+    def save(self):
+        """Write the manifest atomically."""
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({"version": MANIFEST_VERSION, "documents": self.documents}, f, indent=2)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,170 @@
+"""
+Pluggable PDF text extraction backends.
+
+Each backend wraps one PDF library behind the same small interface so the
+extraction engine can be chosen per run and failing engines can fall back
+to the next available one.
+"""
+
+
+class PDFBackend:
+    """Base class for PDF text extraction backends."""
+
+    name = None
+
+    def is_available(self):
+        """
+        Check whether the underlying library can be imported.
+
+        Returns:
+            bool: True if the backend can be used.
+        """
+        try:
+            self._import()
+            return True
+        except ImportError:
+            return False
+
+    @property
+    def version(self):
+        """
+        Version string of the underlying library, used to key cached text.
+
+        Returns:
+            str: Library version, or 'unavailable' if it cannot be imported.
+        """
+        try:
+            return str(self._library_version(self._import()))
+        except ImportError:
+            return "unavailable"
+
+    def iter_pages(self, pdf_path):
+        """
+        Lazily yield the text of each page in a PDF file.
+
+        Args:
+            pdf_path (str): Path to the PDF file.
+
+        Yields:
+            str: Text content of the next page.
+        """
+        raise NotImplementedError
+
+    def _import(self):
+        raise NotImplementedError
+
+    def _library_version(self, module):
+        return getattr(module, "__version__", "unknown")
+
+
+class PyPDF2Backend(PDFBackend):
+    """Pure-Python backend based on PyPDF2."""
+
+    name = "pypdf2"
+
+    def _import(self):
+        import PyPDF2
+        return PyPDF2
+
+    def iter_pages(self, pdf_path):
+        PyPDF2 = self._import()
+        with open(pdf_path, 'rb') as file:
+            pdf_reader = PyPDF2.PdfReader(file)
+            for page in pdf_reader.pages:
+                yield page.extract_text() or ""
+
+
+class PyMuPDFBackend(PDFBackend):
+    """MuPDF-based backend, considerably faster than PyPDF2 on most documents."""
+
+    name = "pymupdf"
+
+    def _import(self):
+        import fitz
+        return fitz
+
+    def _library_version(self, module):
+        return getattr(module, "VersionBind", None) or getattr(module, "__version__", "unknown")
+
+    def iter_pages(self, pdf_path):
+        fitz = self._import()
+        with fitz.open(pdf_path) as document:
+            for page in document:
+                yield page.get_text() or ""
+
+
+# Registered backends in fallback order
+BACKENDS = {}
+
+# Pick the first available backend and fall back through the others
+AUTO_ENGINE = "auto"
+DEFAULT_ENGINE = AUTO_ENGINE
+
+
+def register_backend(backend):
+    """
+    Register a PDF backend so it can be selected by name.
+
+    Args:
+        backend (PDFBackend): Backend instance with a unique name.
+    """
+    BACKENDS[backend.name] = backend
+
+
+def get_backend(name):
+    """
+    Look up a registered backend by name.
+
+    Args:
+        name (str): Backend name.
+
+    Returns:
+        PDFBackend: The backend.
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown PDF engine '{name}'. Available engines: {', '.join(BACKENDS)}")
+    return BACKENDS[name]
+
+
+def engine_choices():
+    """
+    List engine names accepted on the command line and in the UI.
+
+    Returns:
+        list: 'auto' followed by every registered backend name.
+    """
+    return [AUTO_ENGINE] + list(BACKENDS)
+
+
+def available_backends():
+    """
+    List registered backends whose libraries are installed.
+
+    Returns:
+        list: Available PDFBackend instances in fallback order.
+    """
+    return [backend for backend in BACKENDS.values() if backend.is_available()]
+
+
+def resolve_engines(engine=DEFAULT_ENGINE):
+    """
+    Build the ordered list of backends to try for an engine selection.
+
+    The requested engine comes first, followed by every other available
+    backend as a fallback.
+
+    Args:
+        engine (str, optional): Engine name or 'auto'. Defaults to DEFAULT_ENGINE.
+
+    Returns:
+        list: PDFBackend instances to try in order.
+    """
+    fallbacks = available_backends()
+    if not engine or engine == AUTO_ENGINE:
+        return fallbacks
+    preferred = get_backend(engine)
+    return [preferred] + [backend for backend in fallbacks if backend is not preferred]
+
+
+register_backend(PyMuPDFBackend())
+register_backend(PyPDF2Backend())
@@ -2,8 +2,10 @@
 Utility functions for PDF processing.
 """
 import os
-import PyPDF2
-from tqdm import tqdm
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from document_crawler.utils.pdf_backends import DEFAULT_ENGINE, resolve_engines
+from document_crawler.utils.text_cache import get_text_cache
 
 def list_pdf_files(folder_path):
     """
@@ -22,42 +24,218 @@ def list_pdf_files(folder_path):
                 pdf_files.append(os.path.join(root, file))
     return pdf_files
 
-def extract_text_from_pdf(pdf_path):
+# Rough characters-per-token ratio used to turn a token budget into a character budget
+CHARS_PER_TOKEN = 4
+
+# Marks page boundaries in extracted text so long documents can be chunked by page
+PAGE_SEPARATOR = "\f"
+
+def iter_pdf_pages(pdf_path, engine=DEFAULT_ENGINE):
+    """
+    Lazily yield the text of each page in a PDF file.
+    
+    Pages are parsed one at a time, so callers that stop iterating early
+    never pay for the remaining pages.
+    
+    Args:
+        pdf_path (str): Path to the PDF file.
+        engine (str, optional): PDF engine name or 'auto'. Defaults to DEFAULT_ENGINE.
+        
+    Yields:
+        str: Text content of the next page.
+    """
+    backends = resolve_engines(engine)
+    if not backends:
+        raise RuntimeError("No PDF engine is available. Install PyMuPDF or PyPDF2.")
+    yield from backends[0].iter_pages(pdf_path)
+
+def _read_pages(pages, budget=None):
+    """
+    Join page texts with PAGE_SEPARATOR, stopping as soon as the character budget is filled.
+    
+    Args:
+        pages (iterable): Iterable of page texts.
+        budget (int, optional): Character limit.
+        
+    Returns:
+        str: Joined text, truncated to the budget if one is given.
+    """
+    collected_pages = []
+    collected = 0
+    for page_text in pages:
+        collected_pages.append(page_text)
+        collected += len(page_text) + len(PAGE_SEPARATOR)
+        if budget is not None and collected >= budget:
+            break
+    text = PAGE_SEPARATOR.join(collected_pages)
+    return text[:budget] if budget is not None else text
+
+def _resolve_char_budget(max_chars=None, max_tokens=None):
+    """
+    Combine a character and a token budget into a single character limit.
+    
+    Args:
+        max_chars (int, optional): Maximum number of characters.
+        max_tokens (int, optional): Maximum number of tokens.
+        
+    Returns:
+        int: Character limit, or None if unbounded.
+    """
+    budgets = [b for b in (max_chars, max_tokens * CHARS_PER_TOKEN if max_tokens else None) if b]
+    return min(budgets) if budgets else None
+
+def extract_text_from_pdf(pdf_path, max_chars=None, max_tokens=None, engine=DEFAULT_ENGINE):
     """
     Extract text content from a PDF file.
     
+    The requested engine is tried first; if it raises or returns no text,
+    the remaining available engines are tried in turn.
+    
     Args:
         pdf_path (str): Path to the PDF file.
+        max_chars (int, optional): Stop reading pages once this many characters are collected.
+        max_tokens (int, optional): Approximate token budget, converted using CHARS_PER_TOKEN.
+        engine (str, optional): PDF engine name or 'auto'. Defaults to DEFAULT_ENGINE.
         
     Returns:
-        str: Extracted text content.
-    """
-    try:
-        with open(pdf_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            text = ""
-            for page_num in range(len(pdf_reader.pages)):
-                page = pdf_reader.pages[page_num]
-                text += page.extract_text()
+        str: Extracted text content, truncated to the budget if one is given.
+    """
+    budget = _resolve_char_budget(max_chars, max_tokens)
+    for backend in resolve_engines(engine):
+        try:
+            text = _read_pages(backend.iter_pages(pdf_path), budget)
+        except Exception as e:
+            print(f"Error extracting text from {pdf_path} with {backend.name}: {str(e)}")
+            continue
+        if text.strip():
             return text
-    except Exception as e:
-        print(f"Error extracting text from {pdf_path}: {str(e)}")
-        return ""
+    return ""
+
+def _extract_chunk(pdf_files, max_chars=None, engine=DEFAULT_ENGINE):
+    """
+    Extract text from a chunk of PDF files inside a worker process.
+    
+    Args:
+        pdf_files (list): List of paths to PDF files.
+        max_chars (int, optional): Per-file character budget.
+        engine (str, optional): PDF engine name or 'auto'.
+        
+    Returns:
+        list: List of (file path, extracted text) tuples.
+    """
+    return [(pdf_file, extract_text_from_pdf(pdf_file, max_chars=max_chars, engine=engine))
+            for pdf_file in pdf_files]
+
+def _split_into_chunks(pdf_files, workers, chunksize=None):
+    """
+    Split a list of files into chunks for submission to a process pool.
+    
+    Args:
+        pdf_files (list): List of paths to PDF files.
+        workers (int): Number of worker processes.
+        chunksize (int, optional): Files per chunk. Defaults to roughly four chunks per worker.
+        
+    Returns:
+        list: List of file lists.
+    """
+    if not chunksize or chunksize < 1:
+        chunksize = max(1, len(pdf_files) // (workers * 4))
+    return [pdf_files[i:i + chunksize] for i in range(0, len(pdf_files), chunksize)]
+
+def _iter_extracted(pdf_files, workers, chunksize, max_chars, engine):
+    """
+    Extract text from PDF files, in-process or across a process pool.
+    
+    Args:
+        pdf_files (list): List of paths to PDF files.
+        workers (int): Number of worker processes; 1 or fewer extracts in-process.
+        chunksize (int): Files per submitted chunk, or None for the default.
+        max_chars (int): Per-file character budget, or None.
+        engine (str): PDF engine name or 'auto'.
+        
+    Yields:
+        tuple: (file path, extracted text) in completion order.
+    """
+    # Imported here so the CLI can start without loading the progress bar library
+    from tqdm import tqdm
+    
+    if workers <= 1:
+        for pdf_file in tqdm(pdf_files, desc="Extracting text from PDFs"):
+            yield pdf_file, extract_text_from_pdf(pdf_file, max_chars=max_chars, engine=engine)
+        return
+    
+    chunks = _split_into_chunks(pdf_files, workers, chunksize)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(_extract_chunk, chunk, max_chars, engine): chunk for chunk in chunks}
+        with tqdm(total=len(pdf_files), desc=f"Extracting text from PDFs ({workers} workers)") as progress:
+            for future in as_completed(futures):
+                chunk = futures[future]
+                try:
+                    extracted = future.result()
+                except Exception as e:
+                    # A worker died (e.g. a crash inside the PDF parser); keep the batch going
+                    print(f"Error extracting text from chunk starting at {chunk[0]}: {str(e)}")
+                    extracted = [(pdf_file, "") for pdf_file in chunk]
+                yield from extracted
+                progress.update(len(chunk))
 
-def batch_extract_text(pdf_files):
+def batch_extract_text(pdf_files, workers=1, chunksize=None, ordered=True, max_chars=None,
+                       engine=DEFAULT_ENGINE, cache=True):
     """
     Extract text from multiple PDF files.
     
     Args:
         pdf_files (list): List of paths to PDF files.
+        workers (int, optional): Number of worker processes. 1 extracts in the current
+            process, 0 or None uses all CPU cores. Defaults to 1.
+        chunksize (int, optional): Number of files submitted to a worker at once.
+            Defaults to roughly four chunks per worker.
+        ordered (bool, optional): Return results in input order rather than in the
+            order they complete. Defaults to True.
+        max_chars (int, optional): Per-file character budget; page parsing stops once
+            it is reached. Defaults to no limit.
+        engine (str, optional): PDF engine name or 'auto'. Defaults to DEFAULT_ENGINE.
+        cache (TextCache or bool, optional): Text cache to consult before parsing. True
+            uses the shared default cache and False disables caching. Defaults to True.
         
     Returns:
         dict: Dictionary mapping file paths to extracted text.
     """
+    if cache is True:
+        cache = get_text_cache()
+    
     results = {}
-    for pdf_file in tqdm(pdf_files, desc="Extracting text from PDFs"):
-        text = extract_text_from_pdf(pdf_file)
+    pending = pdf_files
+    cache_keys = {}
+    if cache:
+        pending = []
+        for pdf_file in pdf_files:
+            try:
+                key = cache.make_key(pdf_file, engine, max_chars)
+            except OSError:
+                # Unreadable file; let the extractor report the error
+                pending.append(pdf_file)
+                continue
+            text = cache.get(key)
+            if text is None:
+                cache_keys[pdf_file] = key
+                pending.append(pdf_file)
+            else:
+                results[pdf_file] = text
+        print(f"Text cache: {len(results)} cached, {len(pending)} to extract")
+    
+    if not workers or workers < 0:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(pending))
+    
+    for pdf_file, text in _iter_extracted(pending, workers, chunksize, max_chars, engine):
         results[pdf_file] = text
+        # Failed extractions are not cached so they are retried next run
+        if text and pdf_file in cache_keys:
+            cache.put(cache_keys[pdf_file], text)
+    
+    if ordered:
+        results = {pdf_file: results[pdf_file] for pdf_file in pdf_files}
     return results
 
 def parse_version_from_filename(filename, software_name):
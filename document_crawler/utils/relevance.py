@@ -0,0 +1,164 @@
+"""
+Lightweight lexical relevance index for selecting the parts of a document
+that mention the requested fields.
+
+Documents are split into page/paragraph passages and indexed with BM25.
+Each requested field name, expanded with common synonyms, is used as a
+query and only the best-matching passages are kept for the prompt.
+"""
+import math
+import re
+from collections import Counter
+
+from document_crawler.utils.chunking import split_units
+
+# Target passage length when indexing a document
+DEFAULT_PASSAGE_CHARS = 1000
+
+# Synonyms for words that commonly appear in field names
+TERM_SYNONYMS = {
+    "number": ["no", "num", "id", "ref", "reference"],
+    "invoice": ["bill", "inv"],
+    "date": ["dated", "issued", "day"],
+    "due": ["payable", "deadline"],
+    "total": ["amount", "sum", "balance", "grand"],
+    "amount": ["total", "sum", "price", "cost"],
+    "tax": ["vat", "gst"],
+    "vendor": ["supplier", "seller", "from"],
+    "customer": ["client", "buyer", "bill", "to"],
+    "issues": ["issue", "problem", "bug", "fault", "error"],
+    "issue": ["issues", "problem", "bug", "fault", "error"],
+    "version": ["release", "build", "v"],
+    "features": ["feature", "new", "added"],
+}
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+def tokenize(text):
+    """
+    Split text into lowercase alphanumeric tokens.
+
+    Args:
+        text (str): Text to tokenize.
+
+    Returns:
+        list: Tokens.
+    """
+    return _TOKEN_PATTERN.findall(text.lower())
+
+def expand_query(field):
+    """
+    Turn a field name into a query, adding synonyms for its words.
+
+    Args:
+        field (str): Field name such as 'Invoice Number'.
+
+    Returns:
+        list: Query tokens.
+    """
+    tokens = tokenize(field)
+    expanded = list(tokens)
+    for token in tokens:
+        expanded.extend(TERM_SYNONYMS.get(token, []))
+    return expanded
+
+class BM25Index:
+    """Okapi BM25 index over a list of passages."""
+
+    def __init__(self, passages, k1=1.5, b=0.75):
+        """
+        Build the index.
+
+        Args:
+            passages (list): Passage texts.
+            k1 (float, optional): Term frequency saturation. Defaults to 1.5.
+            b (float, optional): Length normalization. Defaults to 0.75.
+        """
+        self.passages = passages
+        self.k1 = k1
+        self.b = b
+        self.lengths = []
+        self.postings = {}
+        for index, passage in enumerate(passages):
+            counts = Counter(tokenize(passage))
+            self.lengths.append(sum(counts.values()))
+            for term, frequency in counts.items():
+                self.postings.setdefault(term, []).append((index, frequency))
+        self.average_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0
+        total = len(passages)
+        self.idf = {
+            term: math.log(1 + (total - len(posting) + 0.5) / (len(posting) + 0.5))
+            for term, posting in self.postings.items()
+        }
+
+    def scores(self, query_tokens):
+        """
+        Score every passage against a query.
+
+        Args:
+            query_tokens (list): Query tokens.
+
+        Returns:
+            dict: Passage index to score, for passages matching at least one term.
+        """
+        scores = {}
+        for term in set(query_tokens):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for index, frequency in self.postings[term]:
+                norm = 1 - self.b + self.b * self.lengths[index] / (self.average_length or 1)
+                scores[index] = scores.get(index, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + self.k1 * norm)
+        return scores
+
+    def search(self, query_tokens, top_k):
+        """
+        Find the passages that best match a query.
+
+        Args:
+            query_tokens (list): Query tokens.
+            top_k (int): Number of passages to return.
+
+        Returns:
+            list: Passage indices, best match first.
+        """
+        scores = self.scores(query_tokens)
+        return sorted(scores, key=lambda index: (-scores[index], index))[:top_k]
+
+def split_passages(text, passage_chars=DEFAULT_PASSAGE_CHARS):
+    """
+    Split a document into page/paragraph passages for indexing.
+
+    Args:
+        text (str): Document text.
+        passage_chars (int, optional): Target passage length. Defaults to DEFAULT_PASSAGE_CHARS.
+
+    Returns:
+        list: Non-empty passages in document order.
+    """
+    return [unit for unit in split_units(text, passage_chars) if unit.strip()]
+
+def select_relevant_text(text, fields, top_k, passage_chars=DEFAULT_PASSAGE_CHARS):
+    """
+    Keep only the passages most relevant to the requested fields.
+
+    The top_k passages for each field are combined and returned in document
+    order, so the prompt still reads naturally.
+
+    Args:
+        text (str): Document text.
+        fields (list): Requested field names.
+        top_k (int): Passages kept per field.
+        passage_chars (int, optional): Target passage length. Defaults to DEFAULT_PASSAGE_CHARS.
+
+    Returns:
+        str: The selected passages, or the full text if nothing matched.
+    """
+    passages = split_passages(text, passage_chars)
+    index = BM25Index(passages)
+    selected = set()
+    for field in fields:
+        selected.update(index.search(expand_query(field), top_k))
+    if not selected:
+        return text
+    return "\n\n".join(passages[i].strip() for i in sorted(selected))
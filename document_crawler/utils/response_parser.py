@@ -0,0 +1,152 @@
+"""
+Recovery of JSON objects from raw LLM output.
+
+Model responses often wrap the requested JSON in prose, a "Final Answer:"
+prefix or a Markdown code fence, or follow it with an explanation. The
+parser below finds the object in one pass over the text without
+backtracking, so its cost grows linearly with the response size even for
+long, brace-heavy or truncated outputs:
+
+1. The whole response, if it starts with an object (trailing text is ignored).
+2. The contents of each ``` code fence.
+3. The outermost brace-balanced spans found by a string-aware scanner; the
+   longest one that decodes to an object is used.
+"""
+import json
+import re
+
+_decoder = json.JSONDecoder()
+
+# Characters the brace scanner reacts to; a single character class cannot backtrack
+_SPECIAL_CHARS = re.compile(r'[{}"\\]')
+
+FENCE = "```"
+
+def _decode_object_at(text, index):
+    """
+    Decode a JSON object starting at an index, ignoring any text after it.
+
+    Args:
+        text (str): Text to decode.
+        index (int): Position of the opening brace.
+
+    Returns:
+        dict: The decoded object, or None if there is no valid object at the index.
+    """
+    try:
+        value, _ = _decoder.raw_decode(text, index)
+    except (ValueError, RecursionError):
+        # Nesting deeper than the decoder's recursion limit is not a usable answer either
+        return None
+    return value if isinstance(value, dict) else None
+
+def code_fence_blocks(text):
+    """
+    Extract the contents of Markdown code fences.
+
+    The language tag on the opening fence line (e.g. ```json) is dropped, and
+    an unterminated fence runs to the end of the text.
+
+    Args:
+        text (str): Raw response text.
+
+    Returns:
+        list: Contents of each fenced block, in order.
+    """
+    blocks = []
+    position = text.find(FENCE)
+    while position != -1:
+        start = position + len(FENCE)
+        line_end = text.find("\n", start)
+        if line_end != -1 and text[start:line_end].strip().isalnum():
+            start = line_end + 1
+        end = text.find(FENCE, start)
+        blocks.append(text[start:] if end == -1 else text[start:end])
+        if end == -1:
+            break
+        position = text.find(FENCE, end + len(FENCE))
+    return blocks
+
+def balanced_spans(text):
+    """
+    Find the outermost brace-balanced spans of a text in a single pass.
+
+    Braces inside JSON strings (between unescaped double quotes within an
+    open brace) are ignored. An unmatched opening brace in surrounding prose
+    does not hide a later balanced object.
+
+    Args:
+        text (str): Raw response text.
+
+    Returns:
+        list: (start, end) index pairs of spans not contained in another span, in order.
+    """
+    spans = []
+    stack = []
+    in_string = False
+    skip_to = 0
+    # Only braces, quotes and backslashes matter, so the scan jumps between them
+    for match in _SPECIAL_CHARS.finditer(text):
+        index = match.start()
+        if index < skip_to:
+            continue
+        char = match.group()
+        if in_string:
+            if char == "\\":
+                skip_to = index + 2
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            # Quotes only start strings inside a brace; prose quotes are ignored
+            in_string = bool(stack)
+        elif char == "{":
+            stack.append(index)
+        elif char == "}" and stack:
+            start = stack.pop()
+            # Spans closed earlier inside this one are no longer outermost
+            while spans and spans[-1][0] > start:
+                spans.pop()
+            spans.append((start, index + 1))
+    return spans
+
+def parse_json_object(text):
+    """
+    Recover the JSON object from a raw LLM response.
+
+    Args:
+        text (str): Raw response text.
+
+    Returns:
+        dict: The decoded object.
+
+    Raises:
+        ValueError: If the response contains no valid JSON object.
+    """
+    stripped = text.strip()
+    if stripped.startswith("{"):
+        value = _decode_object_at(stripped, 0)
+        if value is not None:
+            return value
+
+    for block in code_fence_blocks(text):
+        block = block.strip()
+        if block.startswith("{"):
+            value = _decode_object_at(block, 0)
+            if value is not None:
+                return value
+
+    best = None
+    best_length = -1
+    for start, end in balanced_spans(text):
+        if end - start <= best_length:
+            continue
+        # Slice first: decode errors report line numbers counted from the start of their input
+        candidate = text[start:end]
+        if candidate[1:].lstrip()[:1] not in ('"', '}'):
+            continue  # Prose such as "{field}"; an object starts with a key or is empty
+        value = _decode_object_at(candidate, 0)
+        if value is not None:
+            best, best_length = value, end - start
+    if best is None:
+        raise ValueError("No JSON object found in the LLM response")
+    return best
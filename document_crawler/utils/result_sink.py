@@ -0,0 +1,113 @@
+"""
+Streaming, crash-safe sink for per-document extraction results.
+
+Each result is appended to a JSONL file and flushed to disk as soon as the
+document is finished, so an interrupted run keeps everything extracted so
+far. The final CSV/XLSX/JSON outputs are produced by compacting the stream.
+A new run appends to the stream instead of truncating it, so rows left by an
+interrupted run survive until a later run has finished and compacted it.
+"""
+import json
+import os
+
+def stream_path_for(output_file):
+    """
+    Get the JSONL stream path for an extraction output file.
+    
+    Args:
+        output_file (str): Path to the CSV/XLSX output file.
+        
+    Returns:
+        str: Path to the JSONL stream.
+    """
+    return os.path.splitext(output_file)[0] + ".jsonl"
+
+class ResultSink:
+    """Append-only JSONL writer that makes every row durable before returning."""
+    
+    def __init__(self, path, append=False):
+        """
+        Open the stream.
+        
+        Args:
+            path (str): Path to the JSONL file.
+            append (bool, optional): Keep existing rows instead of starting a new stream.
+                Defaults to False.
+        """
+        self.path = path
+        self.count = 0
+        # Byte offset where this sink's rows start (see read_rows)
+        self.offset = os.path.getsize(path) if append and os.path.exists(path) else 0
+        self._file = open(path, 'a' if append else 'w', encoding='utf-8')
+        if self.offset:
+            with open(path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    # Terminate a line truncated by a crash so the next row starts cleanly
+                    self._file.write("\n")
+                    self.offset += 1
+    
+    def write(self, pdf_file, row):
+        """
+        Append one document's result and flush it to disk.
+        
+        Args:
+            pdf_file (str): Path to the source PDF file.
+            row (dict): Extracted fields for the document.
+        """
+        self._file.write(json.dumps({"path": pdf_file, "row": row}) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.count += 1
+    
+    def close(self):
+        """Close the stream."""
+        self._file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+def read_rows(path, offset=0):
+    """
+    Read the rows of a JSONL stream, keyed by source file.
+    
+    A truncated line (from a crash mid-write) is ignored, and a later
+    row for the same file replaces an earlier one.
+    
+    Args:
+        path (str): Path to the JSONL file.
+        offset (int, optional): Byte offset to start reading at, e.g. a sink's offset
+            to read only the rows it wrote. Defaults to 0.
+        
+    Returns:
+        dict: Mapping of PDF file path to its result row.
+    """
+    rows = {}
+    if not os.path.exists(path):
+        return rows
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            rows[record["path"]] = record["row"]
+    return rows
+
+def write_rows(path, rows):
+    """
+    Replace a JSONL stream with the given rows, atomically.
+    
+    Args:
+        path (str): Path to the JSONL file.
+        rows (list): (PDF file path, result row) pairs in output order.
+    """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for pdf_file, row in rows:
+            f.write(json.dumps({"path": pdf_file, "row": row}) + "\n")
+    os.replace(tmp_path, path)
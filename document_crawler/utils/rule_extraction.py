@@ -0,0 +1,117 @@
+"""
+Deterministic fast-path extraction for well-structured fields.
+
+Many invoices state fields such as the invoice number, dates and totals on
+their own labelled line ("Invoice Number: INV-2023-0042"). This module finds
+such lines and accepts a value only when it is unambiguous and has the
+expected shape for the field type, so the LLM is only needed for the rest.
+"""
+import re
+
+# Alternative labels for common field names (normalized to lowercase)
+LABEL_ALIASES = {
+    "invoice number": ["invoice no", "invoice #", "invoice id", "inv no", "invoice"],
+    "date": ["invoice date", "date issued", "issue date"],
+    "due date": ["payment due", "due"],
+    "total amount": ["total", "amount due", "grand total", "total due", "balance due"],
+    "subtotal": ["sub total", "sub-total"],
+    "tax": ["vat", "sales tax"],
+    "po number": ["purchase order", "po no", "po #"],
+}
+
+_MONTHS = (r"(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|jun(?:e)?|jul(?:y)?|aug(?:ust)?|"
+           r"sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)")
+
+_DATE_PATTERN = re.compile(
+    rf"^(?:{_MONTHS}\.?\s+\d{{1,2}}(?:st|nd|rd|th)?,?\s+\d{{4}}"
+    rf"|\d{{1,2}}(?:st|nd|rd|th)?\s+{_MONTHS}\.?,?\s+\d{{4}}"
+    r"|\d{4}-\d{2}-\d{2}"
+    r"|\d{1,2}[/.-]\d{1,2}[/.-]\d{2,4})$",
+    re.IGNORECASE
+)
+
+_AMOUNT_PATTERN = re.compile(r"^(?:[A-Z]{3}\s*)?[$€£¥]?\s*-?\d{1,3}(?:,?\d{3})*(?:\.\d{1,2})?(?:\s*[A-Z]{3})?$")
+
+_IDENTIFIER_PATTERN = re.compile(r"^[A-Z0-9][A-Z0-9\-/#._]*\d[A-Z0-9\-/#._]*$", re.IGNORECASE)
+
+# Field types recognized from words in the field name, with the value shape they require
+_FIELD_TYPES = [
+    (("date",), _DATE_PATTERN),
+    (("amount", "total", "subtotal", "tax", "price", "cost", "balance"), _AMOUNT_PATTERN),
+    (("number", "id", "no", "reference", "ref"), _IDENTIFIER_PATTERN),
+]
+
+# 'Label:', 'Label #:' and 'Label #' all end a label; a '#' stays part of it ('Invoice #')
+_LABEL_LINE = re.compile(r"^\s*([A-Za-z][A-Za-z #./()-]{0,40}?)\s*(?:(#)\s*:?|:)\s*(\S.*?)\s*$")
+
+def _normalize_label(label):
+    return re.sub(r"\s+", " ", label.strip().lower().rstrip(".:#"))
+
+def _value_pattern(field):
+    """
+    Find the value shape required for a field, based on the words in its name.
+
+    Args:
+        field (str): Field name.
+
+    Returns:
+        re.Pattern: Pattern the value must match, or None if the field is not eligible.
+    """
+    words = set(re.findall(r"[a-z]+", field.lower()))
+    for keywords, pattern in _FIELD_TYPES:
+        if words & set(keywords):
+            return pattern
+    return None
+
+def _labelled_values(text):
+    """
+    Collect 'Label: value' pairs from every line of a document.
+
+    Args:
+        text (str): Document text.
+
+    Returns:
+        dict: Normalized label to the list of values found for it.
+    """
+    values = {}
+    for line in text.splitlines():
+        match = _LABEL_LINE.match(line)
+        if match:
+            label = _normalize_label(match.group(1)) + (" #" if match.group(2) else "")
+            values.setdefault(label, []).append(match.group(3))
+    return values
+
+def extract_fields(text, fields):
+    """
+    Extract the fields that can be found with high confidence without the LLM.
+
+    A field is filled only if its type is recognized (date, amount or
+    identifier), a line labelled with the field name or a known alias is
+    found, every such line agrees on the value, and the value has the
+    expected shape.
+
+    Args:
+        text (str): Document text.
+        fields (list): Requested field names.
+
+    Returns:
+        dict: Field name to extracted value, for the confidently extracted fields only.
+    """
+    labelled = _labelled_values(text)
+    extracted = {}
+    for field in fields:
+        pattern = _value_pattern(field)
+        if pattern is None:
+            continue
+        name = _normalize_label(field)
+        for label in [name] + LABEL_ALIASES.get(name, []):
+            candidates = {value.strip() for value in labelled.get(label, [])}
+            if not candidates:
+                continue
+            if len(candidates) == 1:
+                value = candidates.pop()
+                if pattern.match(value):
+                    extracted[field] = value
+            # The most specific label that appears decides; ambiguity means no fast-path value
+            break
+    return extracted
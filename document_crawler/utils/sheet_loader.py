@@ -0,0 +1,95 @@
+"""
+Chunked, columnar loader for master dependency sheets.
+
+The sheet is read in chunks of rows with pandas' C parser, so the file is
+never held as a list of Python lines or rows. Each chunk is normalized
+(missing cells become '', surrounding whitespace is stripped) and stored as
+categorical columns: software names and versions repeat on many rows, so
+each distinct string is kept once and the rows only hold small integer
+codes. The chunks are then combined column by column.
+
+Ragged rows are tolerated: missing trailing cells are padded with '', and
+extra cells past the header are dropped because only the sheet columns are
+selected.
+"""
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from document_crawler.utils.dependency_graph import (DEPENDS_ON_COLUMN, DEPENDS_ON_VERSION_COLUMN,
+                                                      SOFTWARE_COLUMN, VERSION_COLUMN)
+
+SHEET_COLUMNS = (SOFTWARE_COLUMN, VERSION_COLUMN, DEPENDS_ON_COLUMN, DEPENDS_ON_VERSION_COLUMN)
+
+# Rows parsed per chunk
+DEFAULT_CHUNK_ROWS = 250000
+
+def _read_chunks(csv_file, chunk_rows):
+    """
+    Iterate over the sheet in chunks of string cells.
+
+    Args:
+        csv_file (str): Path to the CSV file.
+        chunk_rows (int): Rows per chunk.
+
+    Returns:
+        iterator: DataFrame chunks holding only the sheet columns.
+    """
+    # Selecting columns also makes the parser accept rows with extra cells; index_col=False stops
+    # pandas from taking the first column as the index when the first row has an extra cell
+    return pd.read_csv(csv_file, chunksize=chunk_rows, dtype=str, keep_default_na=False, skipinitialspace=True,
+                       index_col=False, usecols=lambda column: column.strip() in SHEET_COLUMNS)
+
+def _normalize(chunk):
+    """
+    Turn one chunk into stripped categorical columns.
+
+    Args:
+        chunk (pandas.DataFrame): Chunk from _read_chunks.
+
+    Returns:
+        dict: Column name -> categorical Series; rows without a software name are dropped.
+    """
+    chunk.columns = [column.strip() for column in chunk.columns]
+    columns = {}
+    for column in SHEET_COLUMNS:
+        if column not in chunk.columns:
+            columns[column] = pd.Series('', index=chunk.index, dtype='category')
+            continue
+        values = chunk[column].fillna('').astype('category')
+        # Strip each distinct string once rather than every cell
+        stripped = values.cat.categories.str.strip()
+        if stripped.is_unique:
+            values = values.cat.rename_categories(stripped)
+        else:
+            values = values.str.strip().astype('category')
+        columns[column] = values
+    keep = columns[SOFTWARE_COLUMN] != ''
+    return {column: values[keep] for column, values in columns.items()}
+
+def read_master_sheet(csv_file, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Load a master dependency sheet into a DataFrame of categorical string columns.
+
+    Args:
+        csv_file (str): Path to the CSV file.
+        chunk_rows (int, optional): Rows parsed per chunk. Defaults to DEFAULT_CHUNK_ROWS.
+
+    Returns:
+        pandas.DataFrame: The SoftwareName, Version, DependsOnSoftware and DependsOnVersion
+            columns ('' for missing cells or columns).
+
+    Raises:
+        ValueError: If the file cannot be parsed as CSV.
+    """
+    parts = {column: [] for column in SHEET_COLUMNS}
+    try:
+        for chunk in _read_chunks(csv_file, chunk_rows):
+            for column, values in _normalize(chunk).items():
+                parts[column].append(values)
+    except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError) as e:
+        raise ValueError(f"Failed to parse CSV file: {str(e).strip()}")
+
+    if not parts[SOFTWARE_COLUMN]:
+        return pd.DataFrame({column: pd.Series([], dtype='category') for column in SHEET_COLUMNS})
+    return pd.DataFrame({column: union_categoricals(values, ignore_order=True)
+                         for column, values in parts.items()})
@@ -0,0 +1,134 @@
+"""
+Helpers for running a single CrewAI task and reading its output.
+"""
+import time
+
+from crewai import Task, Crew, Process
+
+from document_crawler.utils.llm_cache import get_llm_cache, llm_signature, make_cache_key
+from document_crawler.utils.llm_config import http_request_counts
+from document_crawler.utils.timing import StageTimer
+
+def crew_output_to_str(result):
+    """
+    Convert the output of Crew.kickoff() to a string.
+    
+    Args:
+        result (CrewOutput or str): Result returned by the crew.
+        
+    Returns:
+        str: The raw text produced by the LLM.
+    """
+    try:
+        # First try to access the result content properly
+        if hasattr(result, 'raw') and result.raw:
+            return result.raw
+        elif hasattr(result, 'output') and result.output:
+            return result.output
+        elif hasattr(result, 'content') and result.content:
+            return result.content
+    except Exception as e:
+        print(f"Error accessing CrewOutput content: {str(e)}")
+    # Fallback to string conversion
+    return str(result)
+
+def token_usage(result, crew=None):
+    """
+    Read the token counts of a crew run.
+    
+    Args:
+        result (CrewOutput): Result returned by the crew.
+        crew (Crew, optional): The crew, whose usage metrics are used if the result has none.
+        
+    Returns:
+        dict: 'prompt_tokens', 'completion_tokens' and 'total_tokens' (0 when not reported).
+    """
+    usage = getattr(result, "token_usage", None) or getattr(crew, "usage_metrics", None) or {}
+    counts = {}
+    for name in ("prompt_tokens", "completion_tokens", "total_tokens"):
+        value = usage.get(name) if isinstance(usage, dict) else getattr(usage, name, None)
+        counts[name] = int(value or 0)
+    if not counts["total_tokens"]:
+        counts["total_tokens"] = counts["prompt_tokens"] + counts["completion_tokens"]
+    return counts
+
+def _is_valid(result, validate):
+    """Check a response with a validator that raises ValueError on unusable responses."""
+    if validate is None:
+        return True
+    try:
+        validate(result)
+    except ValueError:
+        return False
+    return True
+
+def run_task(agent, description, expected_output, cache=None, timer=None, call=None, validate=None):
+    """
+    Run a single task with a one-agent crew, consulting the LLM response cache first.
+    
+    Args:
+        agent (Agent): Agent that runs the task.
+        description (str): Rendered task description.
+        expected_output (str): Task expected output.
+        cache (LLMCache or bool, optional): Response cache. True uses the shared default
+            cache; None or False always calls the LLM. Defaults to None.
+        timer (StageTimer, optional): Records 'llm_cache' and 'llm_call' stage times.
+            Defaults to None.
+        call (dict, optional): Telemetry record from RunTelemetry.call(); the model, token
+            counts, latency, HTTP requests and retries are filled in. Defaults to None.
+        validate (callable, optional): Called with the response; raises ValueError if it cannot
+            be used. Only responses that pass are cached, and cached responses that fail are
+            ignored, so a bad response is asked for again on the next run. Defaults to None.
+        
+    Returns:
+        str: The raw text produced by the LLM.
+    """
+    if cache is True:
+        cache = get_llm_cache()
+    timer = timer or StageTimer("task")
+    call = {} if call is None else call
+    call["model"] = llm_signature(agent)["model"]
+    
+    if cache:
+        start = time.perf_counter()
+        with timer.stage("llm_cache"):
+            key = make_cache_key(agent, description, expected_output)
+            cached = cache.get(key)
+        if cached is not None and _is_valid(cached, validate):
+            call["cached"] = True
+            call["latency"] = time.perf_counter() - start
+            return cached
+    
+    requests_before, retryable_before = http_request_counts()
+    start = time.perf_counter()
+    with timer.stage("llm_call"):
+        task = Task(
+            description=description,
+            agent=agent,
+            expected_output=expected_output,
+            output_file=None
+        )
+        
+        # Create a crew with just this task
+        crew = Crew(
+            agents=[agent],
+            tasks=[task],
+            verbose=True,
+            process=Process.sequential
+        )
+        
+        try:
+            result = crew.kickoff()
+        finally:
+            # Each retryable error response is followed by a retry of the same request
+            requests_after, retryable_after = http_request_counts()
+            call["latency"] = time.perf_counter() - start
+            call["requests"] = requests_after - requests_before
+            call["retries"] = retryable_after - retryable_before
+        call.update(token_usage(result, crew))
+        result_str = crew_output_to_str(result)
+    
+    if cache and _is_valid(result_str, validate):
+        with timer.stage("llm_cache"):
+            cache.put(key, result_str, model=call["model"])
+    return result_str
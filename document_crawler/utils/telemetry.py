@@ -0,0 +1,406 @@
+"""
+Local telemetry store for LLM calls.
+
+Every LLM call made by the extraction and SCN aggregation tasks is recorded
+in SQLite with its run, document, model, token counts, latency, retries and
+whether its response could be parsed. `python main.py stats` summarizes the
+store: latency percentiles and histogram, tokens per document, peak tokens
+per minute and estimated cost per run, for capacity planning against the
+provider's rate limits.
+"""
+import bisect
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from document_crawler.utils.text_cache import CACHE_DIR
+
+DEFAULT_TELEMETRY_PATH = os.path.join(CACHE_DIR, "telemetry.sqlite")
+
+# Calls older than this are dropped when the store is opened
+DEFAULT_RETENTION_SECONDS = 90 * 24 * 60 * 60
+
+# USD per million (prompt, completion) tokens, keyed by model name without the provider prefix
+MODEL_PRICES = {
+    "llama3-70b-8192": (0.59, 0.79),
+    "llama3-8b-8192": (0.05, 0.08),
+    "llama-3.3-70b-versatile": (0.59, 0.79),
+    "llama-3.1-8b-instant": (0.05, 0.08),
+}
+
+# Upper bounds in seconds of the latency histogram buckets
+LATENCY_BUCKETS = [0.25, 0.5, 1, 2, 4, 8, 16, 32, 64]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS calls (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT,
+    command TEXT,
+    timestamp REAL NOT NULL,
+    model TEXT,
+    document TEXT,
+    part INTEGER,
+    prompt_tokens INTEGER NOT NULL DEFAULT 0,
+    completion_tokens INTEGER NOT NULL DEFAULT 0,
+    total_tokens INTEGER NOT NULL DEFAULT 0,
+    requests INTEGER NOT NULL DEFAULT 0,
+    retries INTEGER NOT NULL DEFAULT 0,
+    latency REAL NOT NULL DEFAULT 0,
+    cached INTEGER NOT NULL DEFAULT 0,
+    parse_ok INTEGER NOT NULL DEFAULT 0,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS calls_run_id ON calls (run_id);
+CREATE INDEX IF NOT EXISTS calls_timestamp ON calls (timestamp);
+"""
+
+_COLUMNS = ["run_id", "command", "timestamp", "model", "document", "part", "prompt_tokens",
+            "completion_tokens", "total_tokens", "requests", "retries", "latency", "cached", "parse_ok", "error"]
+
+def percentile(values, pct):
+    """
+    Nearest-rank percentile of a list of numbers.
+
+    Args:
+        values (list): Numbers, in any order.
+        pct (float): Percentile between 0 and 100.
+
+    Returns:
+        float: The percentile, or None for an empty list.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[min(rank, len(ordered)) - 1]
+
+def model_prices(model, input_price=None, output_price=None):
+    """
+    Look up the per-million-token prices of a model.
+
+    Args:
+        model (str): Model name, with or without a provider prefix such as 'groq/'.
+        input_price (float, optional): Prompt token price override. Defaults to None.
+        output_price (float, optional): Completion token price override. Defaults to None.
+
+    Returns:
+        tuple: (prompt price, completion price) in USD per million tokens, or None if unknown.
+    """
+    known = MODEL_PRICES.get((model or "").split("/")[-1])
+    if input_price is None and output_price is None:
+        return known
+    known = known or (0.0, 0.0)
+    return (known[0] if input_price is None else input_price,
+            known[1] if output_price is None else output_price)
+
+def peak_tokens_per_minute(calls):
+    """
+    Highest number of tokens (and requests) completed within any 60-second window.
+
+    Args:
+        calls (list): Call records with 'timestamp', 'latency', 'total_tokens' and 'cached'.
+
+    Returns:
+        tuple: (peak tokens per minute, peak LLM requests per minute).
+    """
+    events = sorted((call["timestamp"] + call["latency"], call["total_tokens"])
+                    for call in calls if not call["cached"])
+    peak_tokens = peak_requests = 0
+    window_tokens = 0
+    start = 0
+    for end, (finished, tokens) in enumerate(events):
+        window_tokens += tokens
+        while events[start][0] <= finished - 60:
+            window_tokens -= events[start][1]
+            start += 1
+        peak_tokens = max(peak_tokens, window_tokens)
+        peak_requests = max(peak_requests, end - start + 1)
+    return peak_tokens, peak_requests
+
+def summarize_calls(calls, input_price=None, output_price=None):
+    """
+    Aggregate call records into latency, token and cost figures.
+
+    Args:
+        calls (list): Call records as returned by TelemetryStore.calls().
+        input_price (float, optional): Prompt token price override (USD per million). Defaults to None.
+        output_price (float, optional): Completion token price override (USD per million). Defaults to None.
+
+    Returns:
+        dict: Call, cache, retry and parse counts, latency percentiles and histogram
+            (uncached calls only), token totals, tokens per document, peak tokens per
+            minute and estimated cost (None when a model's price is unknown).
+    """
+    live = [call for call in calls if not call["cached"]]
+    latencies = [call["latency"] for call in live]
+    documents = {call["document"] for call in calls if call["document"]}
+    prompt_tokens = sum(call["prompt_tokens"] for call in calls)
+    completion_tokens = sum(call["completion_tokens"] for call in calls)
+    total_tokens = sum(call["total_tokens"] for call in calls)
+
+    cost = 0.0
+    for call in live:
+        if not call["total_tokens"]:
+            continue
+        prices = model_prices(call["model"], input_price, output_price)
+        if prices is None:
+            cost = None
+            break
+        cost += (call["prompt_tokens"] * prices[0] + call["completion_tokens"] * prices[1]) / 1e6
+
+    histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+    for latency in latencies:
+        histogram[bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+    peak_tokens, peak_requests = peak_tokens_per_minute(calls)
+
+    return {
+        "calls": len(calls),
+        "cached": len(calls) - len(live),
+        "errors": sum(1 for call in calls if call["error"]),
+        "parse_failures": sum(1 for call in calls if not call["parse_ok"] and not call["error"]),
+        "retries": sum(call["retries"] for call in calls),
+        "documents": len(documents),
+        "latency": {name: percentile(latencies, pct)
+                    for name, pct in (("p50", 50), ("p95", 95), ("p99", 99), ("max", 100))},
+        "latency_histogram": histogram,
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": total_tokens,
+        "tokens_per_document": round(total_tokens / len(documents), 1) if documents else None,
+        "peak_tokens_per_minute": peak_tokens,
+        "peak_requests_per_minute": peak_requests,
+        "cost_usd": round(cost, 6) if cost is not None else None,
+    }
+
+class TelemetryStore:
+    """SQLite store of LLM call records."""
+
+    def __init__(self, path=DEFAULT_TELEMETRY_PATH, retention_seconds=DEFAULT_RETENTION_SECONDS):
+        """
+        Open (or create) a telemetry store and drop calls past the retention period.
+
+        Args:
+            path (str, optional): SQLite database path. Defaults to DEFAULT_TELEMETRY_PATH.
+            retention_seconds (float, optional): How long calls are kept. Defaults to DEFAULT_RETENTION_SECONDS.
+        """
+        self.path = path
+        self.retention_seconds = retention_seconds
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Calls are recorded from worker threads, so the connection is shared under a lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        with self._conn:
+            self._conn.execute("DELETE FROM calls WHERE timestamp < ?", (time.time() - retention_seconds,))
+
+    def record(self, run_id, command, call):
+        """
+        Store one call record.
+
+        Args:
+            run_id (str): Run the call belongs to.
+            command (str): Command of the run, e.g. 'extract'.
+            call (dict): Call record as filled in by RunTelemetry.call() and run_task().
+        """
+        row = dict(call, run_id=run_id, command=command)
+        values = [row.get(column) for column in _COLUMNS]
+        with self._lock, self._conn:
+            self._conn.execute(f"INSERT INTO calls ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+                               values)
+
+    def calls(self, run_id=None, command=None, since=None):
+        """
+        Load call records, oldest first.
+
+        Args:
+            run_id (str, optional): Only calls of this run. Defaults to None.
+            command (str, optional): Only calls of this command. Defaults to None.
+            since (float, optional): Only calls made after this Unix time. Defaults to None.
+
+        Returns:
+            list: Call records as dictionaries.
+        """
+        conditions, params = [], []
+        for column, value in (("run_id", run_id), ("command", command)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            conditions.append("timestamp >= ?")
+            params.append(since)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self._lock:
+            rows = self._conn.execute(f"SELECT * FROM calls{where} ORDER BY timestamp, id", params).fetchall()
+        return [dict(row) for row in rows]
+
+    def clear(self):
+        """Remove every call record."""
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM calls")
+            self._conn.execute("VACUUM")
+
+    def close(self):
+        """Close the underlying database connection."""
+        self._conn.close()
+
+_default_store = None
+
+def get_telemetry_store():
+    """
+    Return the process-wide telemetry store, opening it on first use.
+
+    Returns:
+        TelemetryStore: The shared store.
+    """
+    global _default_store
+    if _default_store is None:
+        _default_store = TelemetryStore()
+    return _default_store
+
+class RunTelemetry:
+    """Records the LLM calls of one run."""
+
+    def __init__(self, run_id, command, store=True):
+        """
+        Start recording a run's calls.
+
+        Args:
+            run_id (str): Run ID.
+            command (str): Command of the run, e.g. 'extract'.
+            store (TelemetryStore or bool, optional): Store to record into; True uses the shared
+                default store and False only keeps this run's in-memory summary. Defaults to True.
+        """
+        self.run_id = run_id
+        self.command = command
+        self.store = get_telemetry_store() if store is True else (store or None)
+        self._calls = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def call(self, document, part=1):
+        """
+        Record one LLM call when the block exits, including calls that raise.
+
+        The block receives the call record; run_task() fills in the model, tokens,
+        latency and retries, and the caller sets 'parse_ok' once the response is parsed.
+
+        Args:
+            document (str): Path of the document the call is for.
+            part (int, optional): Chunk of the document. Defaults to 1.
+        """
+        call = {"timestamp": time.time(), "model": None, "document": document, "part": part,
+                "prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0, "requests": 0,
+                "retries": 0, "latency": 0.0, "cached": False, "parse_ok": False, "error": None}
+        try:
+            yield call
+        except Exception as e:
+            call["error"] = type(e).__name__
+            raise
+        finally:
+            with self._lock:
+                self._calls.append(call)
+            if self.store:
+                self.store.record(self.run_id, self.command, call)
+
+    def summary(self):
+        """
+        Describe this run's LLM calls.
+
+        Returns:
+            str: Human-readable summary.
+        """
+        with self._lock:
+            stats = summarize_calls(list(self._calls))
+        latency = stats["latency"]
+        text = (f"LLM calls: {stats['calls']} ({stats['cached']} cached, {stats['retries']} retries, "
+                f"{stats['parse_failures']} unparsable), {stats['prompt_tokens']} prompt + "
+                f"{stats['completion_tokens']} completion tokens")
+        if latency["p50"] is not None:
+            text += f", latency p50 {latency['p50']:.2f}s / p95 {latency['p95']:.2f}s"
+        return text
+
+def _format_seconds(value):
+    return f"{value:.2f}s" if value is not None else "-"
+
+def _format_histogram(histogram):
+    labels = [f"<= {bound}s" for bound in LATENCY_BUCKETS] + [f"> {LATENCY_BUCKETS[-1]}s"]
+    widest = max(histogram) or 1
+    return [f"    {label:>9} {count:>7}  {'#' * round(40 * count / widest)}".rstrip()
+            for label, count in zip(labels, histogram)]
+
+def run(run_id=None, command=None, days=None, limit=10, input_price=None, output_price=None, json_file=None):
+    """
+    Report LLM call statistics from the telemetry store.
+
+    Args:
+        run_id (str, optional): Only report this run. Defaults to None.
+        command (str, optional): Only report runs of this command. Defaults to None.
+        days (float, optional): Only report calls from the last N days. Defaults to None.
+        limit (int, optional): Number of most recent runs listed. Defaults to 10.
+        input_price (float, optional): Prompt token price in USD per million tokens, overriding
+            MODEL_PRICES. Defaults to None.
+        output_price (float, optional): Completion token price in USD per million tokens, overriding
+            MODEL_PRICES. Defaults to None.
+        json_file (str, optional): Also write the statistics to this JSON file. Defaults to None.
+    """
+    store = get_telemetry_store()
+    since = time.time() - days * 86400 if days else None
+    calls = store.calls(run_id=run_id, command=command, since=since)
+    if not calls:
+        print(f"No LLM calls recorded in {store.path}")
+        return
+
+    by_run = {}
+    for call in calls:
+        by_run.setdefault(call["run_id"], []).append(call)
+    runs = []
+    for run_calls in sorted(by_run.values(), key=lambda items: -items[0]["timestamp"])[:limit]:
+        stats = summarize_calls(run_calls, input_price, output_price)
+        stats.update(run_id=run_calls[0]["run_id"], command=run_calls[0]["command"],
+                     started=time.strftime("%Y-%m-%d %H:%M", time.localtime(run_calls[0]["timestamp"])))
+        runs.append(stats)
+    overall = summarize_calls(calls, input_price, output_price)
+
+    print(f"LLM telemetry: {store.path}")
+    print(f"\n{'run':<24} {'command':<14} {'started':<17} {'calls':>6} {'cached':>7} {'docs':>5} "
+          f"{'tokens':>9} {'tok/doc':>8} {'peak TPM':>9} {'p95':>7} {'cost $':>9}")
+    for stats in runs:
+        cost = f"{stats['cost_usd']:.4f}" if stats["cost_usd"] is not None else "?"
+        print(f"{stats['run_id'] or '-':<24} {stats['command'] or '-':<14} {stats['started']:<17} "
+              f"{stats['calls']:>6} {stats['cached']:>7} {stats['documents']:>5} {stats['total_tokens']:>9} "
+              f"{stats['tokens_per_document'] or 0:>8} {stats['peak_tokens_per_minute']:>9} "
+              f"{_format_seconds(stats['latency']['p95']):>7} {cost:>9}")
+    if len(by_run) > limit:
+        print(f"... and {len(by_run) - limit} older runs")
+
+    latency = overall["latency"]
+    print(f"\nAll selected calls: {overall['calls']} in {len(by_run)} runs, {overall['cached']} served from cache")
+    print(f"  Latency (uncached): p50 {_format_seconds(latency['p50'])}, p95 {_format_seconds(latency['p95'])}, "
+          f"p99 {_format_seconds(latency['p99'])}, max {_format_seconds(latency['max'])}")
+    if overall["calls"] > overall["cached"]:
+        print("\n".join(_format_histogram(overall["latency_histogram"])))
+    print(f"  Tokens: {overall['prompt_tokens']} prompt + {overall['completion_tokens']} completion, "
+          f"{overall['tokens_per_document'] or 0} per document")
+    print(f"  Peak rate: {overall['peak_tokens_per_minute']} tokens/min, "
+          f"{overall['peak_requests_per_minute']} requests/min")
+    print(f"  Retries: {overall['retries']}, errors: {overall['errors']}, "
+          f"unparsable responses: {overall['parse_failures']}")
+    if overall["cost_usd"] is None:
+        print("  Estimated cost: unknown model price (pass --input-price and --output-price)")
+    else:
+        print(f"  Estimated cost: ${overall['cost_usd']:.4f}")
+
+    if json_file:
+        with open(json_file, 'w') as f:
+            json.dump({"path": store.path, "overall": overall, "runs": runs}, f, indent=2)
+        print(f"Statistics saved to {json_file}")
@@ -0,0 +1,262 @@
+"""
+Persistent cache for extracted PDF text.
+
+Entries are keyed by the SHA-256 of the PDF contents together with the
+extraction engine, its library version and the character budget, so a
+file that is renamed or moved is still a cache hit while a changed file or
+an upgraded parser is not. Text is stored zlib-compressed in SQLite and the
+store is kept under a size limit by evicting the least recently used entries.
+"""
+import functools
+import hashlib
+import os
+import sqlite3
+import time
+import zlib
+
+from document_crawler.utils.pdf_backends import AUTO_ENGINE, resolve_engines
+
+# Directory for on-disk caches, overridable through the environment
+CACHE_DIR = os.getenv("DOCUMENT_CRAWLER_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "document_crawler"))
+
+DEFAULT_TEXT_CACHE_PATH = os.path.join(CACHE_DIR, "text_cache.sqlite")
+
+# Bump when the layout of extracted text changes so stale entries are not reused
+TEXT_FORMAT_VERSION = 2
+
+# Default size limit for the stored (compressed) text
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    text BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    raw_size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (name, value) VALUES ('total_size', 0);
+"""
+
+def file_content_hash(path, block_size=1024 * 1024):
+    """
+    Compute the SHA-256 of a file's contents.
+
+    Args:
+        path (str): Path to the file.
+        block_size (int, optional): Read size in bytes. Defaults to 1 MiB.
+
+    Returns:
+        str: Hex digest.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+@functools.lru_cache(maxsize=None)
+def engine_signature(engine=AUTO_ENGINE):
+    """
+    Describe an engine selection, including library versions, for cache keys.
+
+    Args:
+        engine (str, optional): PDF engine name or 'auto'. Defaults to 'auto'.
+
+    Returns:
+        str: Signature such as 'auto:pymupdf=1.24.6,pypdf2=3.0.1'.
+    """
+    backends = ",".join(f"{backend.name}={backend.version}" for backend in resolve_engines(engine))
+    return f"{engine}:{backends}"
+
+class TextCache:
+    """Size-bounded, content-addressed SQLite store of extracted text."""
+
+    def __init__(self, path=DEFAULT_TEXT_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Open (or create) a text cache.
+
+        Args:
+            path (str, optional): SQLite database path. Defaults to DEFAULT_TEXT_CACHE_PATH.
+            max_bytes (int, optional): Size limit for stored text. Defaults to DEFAULT_MAX_BYTES.
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def make_key(self, pdf_path, engine=AUTO_ENGINE, max_chars=None):
+        """
+        Build the cache key for a PDF file.
+
+        Args:
+            pdf_path (str): Path to the PDF file.
+            engine (str, optional): PDF engine name or 'auto'.
+            max_chars (int, optional): Character budget used for extraction.
+
+        Returns:
+            str: Cache key.
+        """
+        parts = [file_content_hash(pdf_path), engine_signature(engine), str(max_chars or ""),
+                 str(TEXT_FORMAT_VERSION)]
+        return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """
+        Look up cached text and mark it as recently used.
+
+        Args:
+            key (str): Cache key.
+
+        Returns:
+            str: Cached text, or None on a miss.
+        """
+        row = self._conn.execute("SELECT text FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+        self._conn.commit()
+        return zlib.decompress(row[0]).decode("utf-8")
+
+    def put(self, key, text):
+        """
+        Store text and evict least recently used entries if over the size limit.
+
+        Args:
+            key (str): Cache key.
+            text (str): Extracted text.
+        """
+        raw = text.encode("utf-8")
+        blob = zlib.compress(raw)
+        now = time.time()
+        with self._conn:
+            previous = self._conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, text, size, raw_size, created, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, blob, len(blob), len(raw), now, now)
+            )
+            delta = len(blob) - (previous[0] if previous else 0)
+            self._conn.execute("UPDATE meta SET value = value + ? WHERE name = 'total_size'", (delta,))
+        if self.total_size() > self.max_bytes:
+            self.prune()
+
+    def total_size(self):
+        """
+        Size of the stored (compressed) text in bytes.
+
+        Returns:
+            int: Total stored size.
+        """
+        return self._conn.execute("SELECT value FROM meta WHERE name = 'total_size'").fetchone()[0]
+
+    def prune(self, max_bytes=None):
+        """
+        Evict least recently used entries until the cache fits the size limit.
+
+        Args:
+            max_bytes (int, optional): Size limit to prune to. Defaults to the cache limit.
+
+        Returns:
+            int: Number of evicted entries.
+        """
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        total = self.total_size()
+        evicted = []
+        freed = 0
+        for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY last_access"):
+            if total - freed <= limit:
+                break
+            evicted.append((key,))
+            freed += size
+        with self._conn:
+            self._conn.executemany("DELETE FROM entries WHERE key = ?", evicted)
+            self._conn.execute("UPDATE meta SET value = value - ? WHERE name = 'total_size'", (freed,))
+        return len(evicted)
+
+    def clear(self):
+        """Remove every entry from the cache."""
+        with self._conn:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.execute("UPDATE meta SET value = 0 WHERE name = 'total_size'")
+        self._conn.execute("VACUUM")
+
+    def stats(self):
+        """
+        Summarize the cache contents.
+
+        Returns:
+            dict: Entry count, sizes, limit and access time range.
+        """
+        entries, raw_size, oldest, newest = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(raw_size), 0), MIN(last_access), MAX(last_access) FROM entries"
+        ).fetchone()
+        return {
+            "path": self.path,
+            "entries": entries,
+            "stored_bytes": self.total_size(),
+            "text_bytes": raw_size,
+            "max_bytes": self.max_bytes,
+            "oldest_access": oldest,
+            "newest_access": newest,
+        }
+
+    def close(self):
+        """Close the underlying database connection."""
+        self._conn.close()
+
+_default_cache = None
+
+def get_text_cache():
+    """
+    Return the process-wide default text cache, opening it on first use.
+
+    Returns:
+        TextCache: The shared cache.
+    """
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = TextCache()
+    return _default_cache
+
+def run(action, max_size_mb=None):
+    """
+    Run a text cache maintenance command.
+
+    Args:
+        action (str): One of 'stats', 'prune' or 'clear'.
+        max_size_mb (float, optional): Size limit in MiB for 'prune'. Defaults to the cache limit.
+    """
+    cache = get_text_cache()
+    if action == "stats":
+        stats = cache.stats()
+        print(f"Text cache: {stats['path']}")
+        print(f"  Entries: {stats['entries']}")
+        print(f"  Stored size: {stats['stored_bytes'] / 1024 / 1024:.1f} MiB "
+              f"(limit {stats['max_bytes'] / 1024 / 1024:.0f} MiB)")
+        print(f"  Uncompressed text: {stats['text_bytes'] / 1024 / 1024:.1f} MiB")
+    elif action == "prune":
+        max_bytes = int(max_size_mb * 1024 * 1024) if max_size_mb is not None else None
+        evicted = cache.prune(max_bytes)
+        print(f"Evicted {evicted} entries from the text cache")
+    elif action == "clear":
+        cache.clear()
+        print("Text cache cleared")
+    else:
+        raise ValueError(f"Unknown cache action '{action}'")
@@ -0,0 +1,111 @@
+"""
+Per-stage timing for the task modules.
+
+A StageTimer accumulates wall-clock time and call counts per named stage.
+Stages that run in worker threads (such as LLM calls) are summed across
+threads, so their totals can exceed the run's elapsed time; the elapsed
+time is reported alongside for comparison.
+"""
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+class StageTimer:
+    """Thread-safe accumulator of time spent in named stages."""
+
+    def __init__(self, name):
+        """
+        Start timing a run.
+
+        Args:
+            name (str): Name of the run, e.g. 'extract'.
+        """
+        self.name = name
+        self.stages = {}
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+
+    def add(self, stage, seconds, calls=1):
+        """
+        Record time spent in a stage.
+
+        Args:
+            stage (str): Stage name.
+            seconds (float): Time spent.
+            calls (int, optional): Number of calls the time covers. Defaults to 1.
+        """
+        with self._lock:
+            entry = self.stages.setdefault(stage, {"seconds": 0.0, "calls": 0})
+            entry["seconds"] += seconds
+            entry["calls"] += calls
+
+    @contextmanager
+    def stage(self, stage):
+        """
+        Time a block of code as one call of a stage.
+
+        Args:
+            stage (str): Stage name.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start)
+
+    def elapsed(self):
+        """
+        Time since the timer was created.
+
+        Returns:
+            float: Elapsed seconds.
+        """
+        return time.perf_counter() - self._start
+
+    def to_dict(self):
+        """
+        Describe the recorded stages.
+
+        Returns:
+            dict: Run name, elapsed time and per-stage seconds, calls and mean.
+        """
+        with self._lock:
+            stages = {
+                stage: {
+                    "seconds": round(entry["seconds"], 4),
+                    "calls": entry["calls"],
+                    "mean_seconds": round(entry["seconds"] / entry["calls"], 4) if entry["calls"] else None,
+                }
+                for stage, entry in self.stages.items()
+            }
+        return {"run": self.name, "elapsed_seconds": round(self.elapsed(), 4), "stages": stages}
+
+    def summary_table(self):
+        """
+        Format the recorded stages as a table.
+
+        Returns:
+            str: Table with one row per stage, in the order the stages were first seen.
+        """
+        data = self.to_dict()
+        elapsed = data["elapsed_seconds"] or 1
+        lines = [f"Stage timings for {self.name} ({data['elapsed_seconds']:.2f}s elapsed):",
+                 f"  {'stage':<22} {'calls':>7} {'seconds':>10} {'mean':>9} {'% elapsed':>10}"]
+        for stage, entry in data["stages"].items():
+            lines.append(f"  {stage:<22} {entry['calls']:>7} {entry['seconds']:>10.3f} "
+                         f"{entry['mean_seconds'] or 0:>9.3f} {entry['seconds'] / elapsed:>10.0%}")
+        return "\n".join(lines)
+
+    def report(self, metrics_file=None):
+        """
+        Print the summary table and optionally save the metrics as JSON.
+
+        Args:
+            metrics_file (str, optional): Path of the JSON metrics file. Defaults to None.
+        """
+        print(self.summary_table())
+        if metrics_file:
+            with open(metrics_file, 'w') as f:
+                json.dump(self.to_dict(), f, indent=2)
+            print(f"Stage metrics saved to {metrics_file}")
@@ -0,0 +1,261 @@
+"""
+Version keys and compiled version requirements.
+
+Version strings from the master sheet are parsed once into compact,
+comparable tuples. Partial versions are normalized ('2' == '2.0' == '2.0.0')
+and numeric parts compare as numbers, so '10.0' sorts after '9.0'.
+Requirements such as '2.1+', '>=3.0', '>2' or '==1.5' are compiled once into
+Requirement predicates. To filter many candidate versions at once, versions
+are also packed into int64 codes that keep their order, so a requirement is
+checked against a whole numpy array in one comparison.
+"""
+import functools
+import math
+import operator
+import re
+
+import numpy as np
+
+_VERSION_PATTERN = re.compile(
+    r'^[vV]?(\d+(?:\.\d+)*)(?:-([0-9A-Za-z.-]+)|([A-Za-z][0-9A-Za-z.-]*))?(?:\+[0-9A-Za-z.-]*)?$')
+
+# Numeric parts kept in a key before trailing zeros are dropped ('2' -> (2, 0, 0))
+_MIN_PARTS = 3
+
+# Packed codes hold four numeric parts of 15 bits each plus a release bit
+CODE_PARTS = 4
+CODE_PART_BITS = 15
+
+# Shortest version list that filter_versions checks with numpy
+VECTORIZE_MIN_VERSIONS = 16
+
+_OPERATORS = {
+    '>=': operator.ge,
+    '>': operator.gt,
+    '==': operator.eq,
+}
+
+def cell_text(value):
+    """
+    Normalize a sheet cell to a stripped string, treating missing values as empty.
+
+    Args:
+        value: Cell value (str, number, None or NaN).
+
+    Returns:
+        str: The stripped string, or '' if the value is missing.
+    """
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ''
+    return str(value).strip()
+
+@functools.lru_cache(maxsize=None)
+def version_key(version):
+    """
+    Parse a version string into a comparable key.
+
+    Numeric parts are compared as numbers and padded with zeros, so partial
+    versions compare equal to their full form. A pre-release ('1.0-beta',
+    '1.0rc1') sorts before its release. Strings that are not versions sort
+    before all versions, in string order.
+
+    Args:
+        version (str): Version string.
+
+    Returns:
+        tuple: The version key.
+    """
+    text = cell_text(version)
+    match = _VERSION_PATTERN.match(text)
+    if not match:
+        return (0, (), (0, text))
+    parts = [int(part) for part in match.group(1).split('.')]
+    parts += [0] * (_MIN_PARTS - len(parts))
+    while len(parts) > _MIN_PARTS and parts[-1] == 0:
+        parts.pop()
+    prerelease = match.group(2) or match.group(3)
+    return (1, tuple(parts), (0, prerelease) if prerelease else (1,))
+
+def version_code(version):
+    """
+    Pack a version into an int64 code that orders like its key.
+
+    Args:
+        version (str): Version string.
+
+    Returns:
+        int: The code, or None if the version has a pre-release, more than four
+            numeric parts or a part too large to pack (compare its key instead).
+    """
+    parsed, parts, release = version_key(version)
+    if not parsed or len(release) > 1 or len(parts) > CODE_PARTS:
+        return None
+    code = 0
+    for part in parts + (0,) * (CODE_PARTS - len(parts)):
+        if part >> CODE_PART_BITS:
+            return None
+        code = (code << CODE_PART_BITS) | part
+    return (code << 1) | 1
+
+def encode_versions(versions):
+    """
+    Pack versions into a numpy array of codes.
+
+    Args:
+        versions (list): Version strings.
+
+    Returns:
+        numpy.ndarray: int64 codes, with -1 where a version cannot be packed.
+    """
+    codes = [version_code(version) for version in versions]
+    return np.array([-1 if code is None else code for code in codes], dtype=np.int64)
+
+def sort_versions(versions):
+    """
+    Sort version strings by their version keys.
+
+    Args:
+        versions (list): Version strings.
+
+    Returns:
+        list: The sorted versions.
+    """
+    return sorted(versions, key=version_key)
+
+class Requirement:
+    """A compiled version requirement that can be checked against one version or an array of them."""
+
+    __slots__ = ("text", "operator", "version", "key", "code")
+
+    def __init__(self, text):
+        """
+        Compile a requirement string.
+
+        Args:
+            text (str): Requirement such as '2.1+', '>=2.1', '>2.1', '==2.1', '=2.1' or '2.1'
+                (an exact match). An empty requirement is met by every version.
+        """
+        self.text = cell_text(text)
+        if not self.text:
+            self.operator, self.version = None, ''
+        elif self.text.endswith('+'):
+            self.operator, self.version = '>=', self.text[:-1]
+        elif self.text.startswith('>='):
+            self.operator, self.version = '>=', self.text[2:]
+        elif self.text.startswith('>'):
+            self.operator, self.version = '>', self.text[1:]
+        elif self.text.startswith('=='):
+            self.operator, self.version = '==', self.text[2:]
+        elif self.text.startswith('='):
+            self.operator, self.version = '==', self.text[1:]
+        else:
+            self.operator, self.version = '==', self.text
+        self.version = self.version.strip()
+        self.key = version_key(self.version)
+        self.code = version_code(self.version) if self.operator else None
+
+    def __repr__(self):
+        return f"Requirement({self.text!r})"
+
+    def __call__(self, version):
+        """
+        Check whether a version meets the requirement.
+
+        Args:
+            version (str): Version string.
+
+        Returns:
+            bool: True if the requirement is met.
+        """
+        if self.operator is None:
+            return True
+        key = version_key(version)
+        if not key[0] or not self.key[0]:
+            # Not a version: compare the strings, as before version keys existed
+            return _OPERATORS[self.operator](cell_text(version), self.version)
+        return _OPERATORS[self.operator](key, self.key)
+
+    def mask(self, versions, codes):
+        """
+        Check many versions at once.
+
+        Args:
+            versions (list): Version strings.
+            codes (numpy.ndarray): Their codes from encode_versions.
+
+        Returns:
+            numpy.ndarray: Boolean array, True where the version meets the requirement.
+        """
+        if self.operator is None:
+            return np.ones(len(versions), dtype=bool)
+        if self.code is None:
+            return np.fromiter((self(version) for version in versions), dtype=bool, count=len(versions))
+        mask = _OPERATORS[self.operator](codes, self.code)
+        # Versions that could not be packed are checked one by one
+        unpacked = np.flatnonzero(codes < 0)
+        for index in unpacked:
+            mask[index] = self(versions[index])
+        return mask
+
+@functools.lru_cache(maxsize=None)
+def _compile(text):
+    return Requirement(text)
+
+def compile_requirement(requirement):
+    """
+    Compile a requirement string, reusing earlier compilations.
+
+    Args:
+        requirement (str): Requirement string (None or NaN count as empty).
+
+    Returns:
+        Requirement: The compiled requirement.
+    """
+    return _compile(cell_text(requirement))
+
+@functools.lru_cache(maxsize=None)
+def satisfies(version, requirement):
+    """
+    Check whether a version meets a requirement string.
+
+    Results are cached per (version, requirement) pair, as the same pairs come
+    up again and again while resolving.
+
+    Args:
+        version (str): Version string.
+        requirement (str): Requirement string; an empty requirement is always met.
+
+    Returns:
+        bool: True if the requirement is met.
+    """
+    return compile_requirement(requirement)(version)
+
+def filter_versions(versions, requirements, codes=None):
+    """
+    Find the versions that meet every requirement.
+
+    Lists of at least VECTORIZE_MIN_VERSIONS versions are filtered with numpy
+    over their codes; shorter ones are cheaper to check one by one.
+
+    Args:
+        versions (list): Version strings.
+        requirements (iterable): Requirement strings.
+        codes (numpy.ndarray or callable, optional): Codes of the versions from encode_versions,
+            or a function returning them, only called when numpy is used. Defaults to encoding
+            the versions when needed.
+
+    Returns:
+        list: Indexes of the versions that meet all requirements, in ascending order.
+    """
+    requirements = [compile_requirement(requirement) for requirement in requirements]
+    if len(versions) < VECTORIZE_MIN_VERSIONS:
+        return [index for index, version in enumerate(versions)
+                if all(requirement(version) for requirement in requirements)]
+    if codes is None:
+        codes = encode_versions(versions)
+    elif callable(codes):
+        codes = codes()
+    mask = np.ones(len(versions), dtype=bool)
+    for requirement in requirements:
+        mask &= requirement.mask(versions, codes)
+    return np.flatnonzero(mask).tolist()
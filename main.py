@@ -5,49 +5,240 @@ This application uses CrewAI to orchestrate different document analysis tasks.
 """
 
 import argparse
+import cProfile
+import importlib
 import os
-from document_crawler import critical_extraction, dependency_analysis, scn_aggregation
+import pstats
+from document_crawler.utils import checkpoint, llm_cache, telemetry, text_cache
+from document_crawler.utils.chunking import DEFAULT_CHUNK_OVERLAP, DEFAULT_MAX_CHUNKS
+from document_crawler.utils.concurrency import DEFAULT_CONCURRENCY
+from document_crawler.utils.pdf_backends import DEFAULT_ENGINE, engine_choices
+
+# Task module behind each subcommand; they pull in CrewAI, LangChain and pandas,
+# so they are only imported once the subcommand is known
+TASK_MODULES = {
+    "extract": "document_crawler.critical_extraction",
+    "analyze-deps": "document_crawler.dependency_analysis",
+    "aggregate-scn": "document_crawler.scn_aggregation",
+}
+
+def load_task(command):
+    """
+    Import the task module for a subcommand.
+    
+    Args:
+        command (str): Subcommand name.
+        
+    Returns:
+        module: The task module.
+    """
+    return importlib.import_module(TASK_MODULES[command])
 
 def main():
     parser = argparse.ArgumentParser(description="Document Crawler and Analyzer")
+    parser.add_argument("--llm-base-url",
+                        help="OpenAI-compatible API base URL (default: Groq, or DOCUMENT_CRAWLER_LLM_BASE_URL)")
+    parser.add_argument("--llm-model", help="Model name (default: groq/llama3-70b-8192, or DOCUMENT_CRAWLER_LLM_MODEL)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Run the command under cProfile and save its stats and a sorted report")
+    parser.add_argument("--profile-output", default="profile.prof", metavar="FILE",
+                        help="cProfile stats file for --profile; the sorted report is written next to it")
     subparsers = parser.add_subparsers(dest="command", help="Command to run")
     
     # Task 1: Critical Information Extraction
     extract_parser = subparsers.add_parser("extract", help="Extract critical information from PDFs")
-    extract_parser.add_argument("--folder", required=True, help="Path to folder containing PDF documents")
-    extract_parser.add_argument("--fields", required=True, nargs="+", help="Fields to extract (e.g., 'Invoice Number' 'Date')")
+    extract_parser.add_argument("--folder", help="Path to folder containing PDF documents (required unless resuming)")
+    extract_parser.add_argument("--fields", nargs="+",
+                                help="Fields to extract (e.g., 'Invoice Number' 'Date'; required unless resuming)")
     extract_parser.add_argument("--output", default="extracted_data.csv", help="Output file path (CSV or XLSX)")
+    extract_parser.add_argument("--workers", type=int, default=1,
+                                help="Processes for PDF text extraction (0 uses all CPU cores)")
+    extract_parser.add_argument("--max-chars", type=int, default=8000,
+                                help="Document characters sent to the LLM per prompt (chunk size)")
+    extract_parser.add_argument("--chunk-overlap", type=int, default=DEFAULT_CHUNK_OVERLAP,
+                                help="Characters repeated between consecutive chunks of a long document")
+    extract_parser.add_argument("--max-chunks", type=int, default=DEFAULT_MAX_CHUNKS,
+                                help="Maximum chunks (LLM calls) per document; text beyond them is ignored")
+    extract_parser.add_argument("--top-k", type=int, default=0,
+                                help="For long documents, send only the K passages most relevant to each field")
+    extract_parser.add_argument("--no-fast-path", action="store_true",
+                                help="Send every field to the LLM instead of extracting well-structured ones with rules")
+    extract_parser.add_argument("--full", action="store_true",
+                                help="Re-extract every document instead of only new or changed ones")
+    extract_parser.add_argument("--engine", default=DEFAULT_ENGINE, choices=engine_choices(),
+                                help="PDF text extraction engine (falls back to the others on failure)")
+    extract_parser.add_argument("--no-text-cache", action="store_true",
+                                help="Re-parse every PDF instead of using the extracted text cache")
+    extract_parser.add_argument("--no-llm-cache", action="store_true",
+                                help="Call the LLM for every document instead of reusing cached responses")
+    extract_parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                                help="Maximum number of LLM requests in flight")
+    extract_parser.add_argument("--no-telemetry", action="store_true",
+                                help="Do not record LLM calls in the telemetry store used by 'stats'")
+    extract_parser.add_argument("--metrics", help="Stage timing JSON file (default: <output>.metrics.json)")
+    extract_parser.add_argument("--resume", metavar="RUN_ID",
+                                help="Continue an interrupted run with its original fields and settings")
     
     # Task 2: Software Dependency Analysis
     dependency_parser = subparsers.add_parser("analyze-deps", help="Analyze software dependencies")
     dependency_parser.add_argument("--master-sheet", required=True, help="Path to master dependency sheet (CSV)")
     dependency_parser.add_argument("--current", required=True, help="Path to current software versions (JSON)")
-    dependency_parser.add_argument("--software", required=True, help="Name of software to upgrade")
-    dependency_parser.add_argument("--target-version", required=True, help="Target version for upgrade")
+    dependency_parser.add_argument("--software",
+                                   help="Name of software to upgrade (required unless --queries is given)")
+    dependency_parser.add_argument("--target-version",
+                                   help="Target version for upgrade (required unless --queries is given)")
     dependency_parser.add_argument("--criteria", default="minimum_changes", 
                                   choices=["minimum_changes", "latest_available"],
                                   help="Criteria for selecting dependent upgrades")
+    dependency_parser.add_argument("--queries",
+                                   help="JSONL file of upgrade queries to answer in one run, one object per line "
+                                        "with 'software', 'target_version' and optional 'criteria'")
+    dependency_parser.add_argument("--output", help="JSONL results file for --queries "
+                                                    "(default: <queries>.results.jsonl)")
+    dependency_parser.add_argument("--workers", type=int, default=1,
+                                   help="Processes answering --queries (0 uses all CPU cores)")
+    dependency_parser.add_argument("--no-snapshot", action="store_true",
+                                   help="Parse the master sheet instead of using its compiled graph snapshot")
+    dependency_parser.add_argument("--metrics", help="Write stage timings to this JSON file")
     
     # Task 3: Software Change Notice Aggregation
     scn_parser = subparsers.add_parser("aggregate-scn", help="Aggregate Software Change Notices")
-    scn_parser.add_argument("--folder", required=True, help="Path to folder containing SCN PDFs")
-    scn_parser.add_argument("--software", required=True, help="Software name")
-    scn_parser.add_argument("--current-version", required=True, help="Current installed version")
-    scn_parser.add_argument("--target-version", required=True, help="Target upgrade version")
+    scn_parser.add_argument("--folder", help="Path to folder containing SCN PDFs (required unless resuming)")
+    scn_parser.add_argument("--software", help="Software name (required unless resuming)")
+    scn_parser.add_argument("--current-version", help="Current installed version (required unless resuming)")
+    scn_parser.add_argument("--target-version", help="Target upgrade version (required unless resuming)")
     scn_parser.add_argument("--output", default="aggregated_scn.md", help="Output file path (CSV or MD)")
+    scn_parser.add_argument("--workers", type=int, default=1,
+                            help="Processes for PDF text extraction (0 uses all CPU cores)")
+    scn_parser.add_argument("--max-chars", type=int, default=8000,
+                            help="Document characters sent to the LLM per prompt (chunk size)")
+    scn_parser.add_argument("--chunk-overlap", type=int, default=DEFAULT_CHUNK_OVERLAP,
+                            help="Characters repeated between consecutive chunks of a long document")
+    scn_parser.add_argument("--max-chunks", type=int, default=DEFAULT_MAX_CHUNKS,
+                            help="Maximum chunks (LLM calls) per document; text beyond them is ignored")
+    scn_parser.add_argument("--engine", default=DEFAULT_ENGINE, choices=engine_choices(),
+                            help="PDF text extraction engine (falls back to the others on failure)")
+    scn_parser.add_argument("--no-text-cache", action="store_true",
+                            help="Re-parse every PDF instead of using the extracted text cache")
+    scn_parser.add_argument("--no-llm-cache", action="store_true",
+                            help="Call the LLM for every document instead of reusing cached responses")
+    scn_parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                            help="Maximum number of LLM requests in flight")
+    scn_parser.add_argument("--no-telemetry", action="store_true",
+                            help="Do not record LLM calls in the telemetry store used by 'stats'")
+    scn_parser.add_argument("--metrics", help="Stage timing JSON file (default: <output>.metrics.json)")
+    scn_parser.add_argument("--resume", metavar="RUN_ID",
+                            help="Continue an interrupted run with its original versions and settings")
+    
+    # Cache maintenance
+    cache_parser = subparsers.add_parser("cache", help="Inspect or maintain the text and LLM response caches")
+    cache_parser.add_argument("action", choices=["stats", "prune", "clear"], help="Cache operation")
+    cache_parser.add_argument("--store", default="all", choices=["all", "text", "llm"], help="Cache to operate on")
+    cache_parser.add_argument("--max-size", type=float, help="Size limit in MiB for 'prune'")
+    
+    # LLM call statistics
+    stats_parser = subparsers.add_parser("stats", help="Report LLM latency, token and cost statistics")
+    stats_parser.add_argument("--run", help="Only report this run ID")
+    stats_parser.add_argument("--task", choices=["extract", "aggregate-scn"], help="Only report runs of this command")
+    stats_parser.add_argument("--days", type=float, help="Only report calls from the last N days")
+    stats_parser.add_argument("--limit", type=int, default=10, help="Number of most recent runs listed")
+    stats_parser.add_argument("--input-price", type=float,
+                              help="Prompt token price in USD per million tokens (default: built-in model prices)")
+    stats_parser.add_argument("--output-price", type=float,
+                              help="Completion token price in USD per million tokens (default: built-in model prices)")
+    stats_parser.add_argument("--json", help="Also write the statistics to this JSON file")
     
     args = parser.parse_args()
     
-    if args.command == "extract":
-        critical_extraction.run(args.folder, args.fields, args.output)
+    # Passed through the environment so the LLM modules are not imported before they are needed
+    if args.llm_base_url:
+        os.environ["DOCUMENT_CRAWLER_LLM_BASE_URL"] = args.llm_base_url
+    if args.llm_model:
+        os.environ["DOCUMENT_CRAWLER_LLM_MODEL"] = args.llm_model
+    
+    profiler = None
+    if args.profile:
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        run_command(args, parser)
+    finally:
+        if profiler:
+            profiler.disable()
+            save_profile(profiler, args.profile_output)
+
+def run_command(args, parser):
+    """
+    Dispatch a parsed command line to its task.
+    
+    Args:
+        args (Namespace): Parsed arguments.
+        parser (ArgumentParser): Parser, used to report usage errors.
+    """
+    if args.command in ("extract", "aggregate-scn") and args.resume:
+        # Resume with the settings the run was started with
+        try:
+            settings = checkpoint.load_run_settings(args.resume, args.command)
+        except ValueError as e:
+            parser.error(str(e))
+        load_task(args.command).run(**settings, run_id=args.resume, metrics_file=args.metrics)
+    elif args.command == "extract":
+        if not args.folder or not args.fields:
+            parser.error("extract requires --folder and --fields unless --resume is given")
+        load_task(args.command).run(args.folder, args.fields, args.output, workers=args.workers,
+                                    max_chars=args.max_chars, engine=args.engine,
+                                    text_cache=not args.no_text_cache, llm_cache=not args.no_llm_cache,
+                                    concurrency=args.concurrency, chunk_overlap=args.chunk_overlap,
+                                    max_chunks=args.max_chunks, top_k=args.top_k,
+                                    fast_path=not args.no_fast_path, full=args.full,
+                                    telemetry=not args.no_telemetry, metrics_file=args.metrics)
     elif args.command == "analyze-deps":
-        dependency_analysis.run(args.master_sheet, args.current, args.software, 
-                              args.target_version, args.criteria)
+        if args.queries:
+            load_task(args.command).run_queries(args.master_sheet, args.current, args.queries, args.criteria,
+                                                output_file=args.output, workers=args.workers,
+                                                metrics_file=args.metrics, snapshot=not args.no_snapshot)
+        elif not args.software or not args.target_version:
+            parser.error("analyze-deps requires --software and --target-version unless --queries is given")
+        else:
+            load_task(args.command).run(args.master_sheet, args.current, args.software, 
+                                        args.target_version, args.criteria, metrics_file=args.metrics,
+                                        snapshot=not args.no_snapshot)
     elif args.command == "aggregate-scn":
-        scn_aggregation.run(args.folder, args.software, args.current_version, 
-                          args.target_version, args.output)
+        if not all([args.folder, args.software, args.current_version, args.target_version]):
+            parser.error("aggregate-scn requires --folder, --software, --current-version and "
+                         "--target-version unless --resume is given")
+        load_task(args.command).run(args.folder, args.software, args.current_version, 
+                                    args.target_version, args.output, workers=args.workers,
+                                    max_chars=args.max_chars, engine=args.engine,
+                                    text_cache=not args.no_text_cache, llm_cache=not args.no_llm_cache,
+                                    concurrency=args.concurrency, chunk_overlap=args.chunk_overlap,
+                                    max_chunks=args.max_chunks, telemetry=not args.no_telemetry,
+                                    metrics_file=args.metrics)
+    elif args.command == "cache":
+        if args.store in ("all", "text"):
+            text_cache.run(args.action, args.max_size)
+        if args.store in ("all", "llm"):
+            llm_cache.run(args.action, args.max_size)
+    elif args.command == "stats":
+        telemetry.run(run_id=args.run, command=args.task, days=args.days, limit=args.limit,
+                      input_price=args.input_price, output_price=args.output_price, json_file=args.json)
     else:
         parser.print_help()
 
+def save_profile(profiler, profile_file):
+    """
+    Save profiler statistics, plus a text report sorted by cumulative time.
+    
+    Args:
+        profiler (Profile): Finished profiler.
+        profile_file (str): Path of the binary stats file; the report is written next to it as .txt.
+    """
+    profiler.dump_stats(profile_file)
+    report_file = os.path.splitext(profile_file)[0] + ".txt"
+    with open(report_file, 'w') as f:
+        stats = pstats.Stats(profiler, stream=f)
+        stats.sort_stats("cumulative").print_stats(100)
+    print(f"Profile saved to {profile_file} (sorted report: {report_file})")
+
 if __name__ == "__main__":
     main() 
\ No newline at end of file
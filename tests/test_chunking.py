@@ -0,0 +1,33 @@
+"""
+Tests for splitting documents into chunks and merging per-chunk results.
+"""
+from document_crawler.utils.chunking import merge_field_values, split_text, text_budget
+
+def test_merge_skips_missing_values():
+    partials = [{"Invoice Number": "Not Found", "Date": "2024-01-31"},
+                {"Invoice Number": "INV-1001", "Date": "Not Found"}]
+    assert merge_field_values(partials) == {"Invoice Number": "INV-1001", "Date": "2024-01-31"}
+
+def test_merge_keeps_overlap_repeats_once():
+    partials = [{"Vendor": "Acme  Corp"}, {"Vendor": "acme corp"}, {"Vendor": " ACME CORP "}]
+    assert merge_field_values(partials) == {"Vendor": "Acme  Corp"}
+
+def test_merge_keeps_values_that_contain_each_other():
+    partials = [{"Line Items": "1"}, {"Line Items": "10"}]
+    assert merge_field_values(partials) == {"Line Items": "1\n10"}
+
+def test_merge_field_missing_from_every_chunk():
+    partials = [{"Date": "Not Found"}, {"Date": ""}]
+    assert merge_field_values(partials) == {"Date": "Not Found"}
+
+def test_merge_without_results():
+    assert merge_field_values([None, {}]) is None
+    assert merge_field_values([None, {"Date": "2024-01-31"}]) == {"Date": "2024-01-31"}
+
+def test_text_budget_fits_every_chunk():
+    paragraphs = [" ".join(f"w{index}" for index in range(start, start + 40)) for start in range(0, 8000, 40)]
+    text = "\n\n".join(paragraphs)
+    budget = text_budget(1000, 200, 5)
+    assert budget == 1000 + 4 * 800
+    assert split_text(text[:budget], 1000, 200, 5) == split_text(text, 1000, 200, 5)
+    assert text_budget(1000, 200, None) is None
@@ -0,0 +1,113 @@
+"""
+Tests for the transitive dependency resolver.
+"""
+import pytest
+
+from document_crawler.utils import dependency_resolver
+from document_crawler.utils.dependency_graph import DependencyGraph
+from document_crawler.utils.dependency_resolver import (LATEST_AVAILABLE, DependencyConflict, DependencyResolver,
+                                                         ResolutionLimitExceeded)
+
+def test_transitive_chain():
+    graph = DependencyGraph([
+        ("A", "1.0", "", ""), ("A", "2.0", "B", "2.0+"),
+        ("B", "1.0", "", ""), ("B", "2.0", "C", "3.2+"),
+        ("C", "1.0", "", ""), ("C", "3.2", "", ""), ("C", "3.5", "", ""),
+    ])
+    upgrades = DependencyResolver(graph, {"A": "1.0", "B": "1.0", "C": "1.0"}).resolve("A", "2.0")
+    assert upgrades == {
+        "B": {"current_version": "1.0", "required_version": "2.0", "required_by": "A 2.0"},
+        "C": {"current_version": "1.0", "required_version": "3.2", "required_by": "B 2.0"},
+    }
+
+def test_latest_available_picks_highest_version():
+    graph = DependencyGraph([
+        ("A", "1.0", "", ""), ("A", "2.0", "C", "3.2+"),
+        ("C", "1.0", "", ""), ("C", "3.2", "", ""), ("C", "3.5", "", ""),
+    ])
+    resolver = DependencyResolver(graph, {"A": "1.0", "C": "1.0"}, criteria=LATEST_AVAILABLE)
+    assert resolver.resolve("A", "2.0")["C"]["required_version"] == "3.5"
+
+def test_deep_chain_does_not_recurse():
+    length = 3000
+    rows = []
+    for index in range(length):
+        name = f"P{index}"
+        rows.append((name, "1.0", "", ""))
+        rows.append((name, "2.0", f"P{index + 1}", "2.0+") if index + 1 < length else (name, "2.0", "", ""))
+    current_versions = {f"P{index}": "1.0" for index in range(length)}
+    upgrades = DependencyResolver(DependencyGraph(rows), current_versions).resolve("P0", "2.0")
+    assert len(upgrades) == length - 1
+
+def test_installed_dependent_is_upgraded_with_the_change():
+    graph = DependencyGraph([
+        ("A", "1.0", "", ""), ("A", "2.0", "B", "2.0+"),
+        ("B", "1.0", "", ""), ("B", "2.0", "", ""),
+        ("D", "1.0", "B", "==1.0"), ("D", "2.0", "B", "2.0+"),
+    ])
+    upgrades = DependencyResolver(graph, {"A": "1.0", "B": "1.0", "D": "1.0"}).resolve("A", "2.0")
+    assert upgrades["B"]["required_version"] == "2.0"
+    assert upgrades["D"]["required_version"] == "2.0"
+    assert upgrades["D"]["required_by"] == "B 2.0"
+
+def test_conflict_with_installed_dependent():
+    graph = DependencyGraph([
+        ("A", "1.0", "", ""), ("A", "2.0", "B", "2.0+"),
+        ("B", "1.0", "", ""), ("B", "2.0", "", ""),
+        ("D", "1.0", "B", "==1.0"),
+    ])
+    resolver = DependencyResolver(graph, {"A": "1.0", "B": "1.0", "D": "1.0"})
+    with pytest.raises(DependencyConflict):
+        resolver.resolve("A", "2.0")
+
+def test_backtracks_to_next_candidate():
+    graph = DependencyGraph([
+        ("A", "1.0", "", ""), ("A", "2.0", "B", "2.0+"), ("A", "2.0", "C", "==2.0"),
+        ("B", "1.0", "", ""), ("B", "2.0", "C", "==3.0"), ("B", "3.0", "C", "2.0+"),
+        ("C", "1.0", "", ""), ("C", "2.0", "", ""), ("C", "3.0", "", ""),
+    ])
+    upgrades = DependencyResolver(graph, {"A": "1.0", "B": "1.0", "C": "1.0"}).resolve("A", "2.0")
+    assert upgrades["B"]["required_version"] == "3.0"
+    assert upgrades["C"]["required_version"] == "2.0"
+
+def test_downgrade_moves_dependent_to_closest_compatible_version():
+    graph = DependencyGraph([
+        ("A", "1.0", "", ""), ("A", "2.0", "", ""),
+        ("D", "1.0", "A", "1.0+"), ("D", "1.5", "A", "1.0+"), ("D", "2.0", "A", "2.0+"),
+    ])
+    upgrades = DependencyResolver(graph, {"A": "2.0", "D": "2.0"}).resolve("A", "1.0")
+    assert upgrades == {"D": {"current_version": "2.0", "required_version": "1.5", "required_by": "A 1.0"}}
+
+def test_step_limit_raises_distinct_error():
+    graph = DependencyGraph([
+        ("A", "1.0", "", ""), ("A", "2.0", "B", "2.0+"),
+        ("B", "1.0", "", ""), ("B", "2.0", "C", "2.0+"),
+        ("C", "1.0", "", ""), ("C", "2.0", "", ""),
+    ])
+    resolver = DependencyResolver(graph, {"A": "1.0", "B": "1.0", "C": "1.0"}, max_steps=1)
+    with pytest.raises(ResolutionLimitExceeded) as error:
+        resolver.resolve("A", "2.0")
+    assert not isinstance(error.value, DependencyConflict)
+
+def test_narrowed_search_finds_the_same_upgrades(monkeypatch):
+    # Skip the quick search so every query is narrowed first
+    monkeypatch.setattr(dependency_resolver, "QUICK_STEPS", 0)
+    graph = DependencyGraph([
+        ("A", "1.0", "", ""), ("A", "2.0", "B", "2.0+"),
+        ("B", "1.0", "", ""), ("B", "2.0", "", ""),
+        ("D", "1.0", "B", "==1.0"), ("D", "2.0", "B", "2.0+"),
+    ])
+    upgrades = DependencyResolver(graph, {"A": "1.0", "B": "1.0", "D": "1.0"}).resolve("A", "2.0")
+    assert {software: upgrade["required_version"] for software, upgrade in upgrades.items()} == {
+        "B": "2.0", "D": "2.0"}
+
+def test_narrowing_proves_conflict(monkeypatch):
+    monkeypatch.setattr(dependency_resolver, "QUICK_STEPS", 0)
+    graph = DependencyGraph([
+        ("A", "1.0", "", ""), ("A", "2.0", "B", "2.0+"),
+        ("B", "1.0", "", ""), ("B", "2.0", "", ""),
+        ("D", "1.0", "B", "==1.0"),
+    ])
+    resolver = DependencyResolver(graph, {"A": "1.0", "B": "1.0", "D": "1.0"})
+    with pytest.raises(DependencyConflict, match="no version of"):
+        resolver.resolve("A", "2.0")
@@ -0,0 +1,47 @@
+"""
+Tests for version keys, requirements and sheet cell normalization.
+"""
+import pytest
+
+from document_crawler.utils.versions import (VECTORIZE_MIN_VERSIONS, cell_text, filter_versions, satisfies,
+                                             sort_versions, version_key)
+
+def test_numeric_parts_compare_as_numbers():
+    assert version_key("10.0") > version_key("9.0")
+    assert sort_versions(["10.0", "9.0", "1.2", "9.10", "9.9"]) == ["1.2", "9.0", "9.9", "9.10", "10.0"]
+
+def test_partial_versions_equal_full_form():
+    assert version_key("2") == version_key("2.0") == version_key("2.0.0")
+
+def test_prerelease_sorts_before_release():
+    assert sort_versions(["1.0", "1.0-beta"]) == ["1.0-beta", "1.0"]
+
+@pytest.mark.parametrize("version, requirement, expected", [
+    ("10.0", "9.0+", True),
+    ("9.0", "10.0+", False),
+    ("3.0", ">=3.0", True),
+    ("3.0", ">3.0", False),
+    ("1.5", "==1.5", True),
+    ("1.5.0", "==1.5", True),
+    ("1.0", "", True),
+])
+def test_satisfies(version, requirement, expected):
+    assert satisfies(version, requirement) is expected
+
+def test_filter_versions_matches_one_by_one_check():
+    # Long lists take the numpy path, short ones are checked one by one
+    versions = sort_versions([f"{major}.{minor}" for major in range(1, 12) for minor in range(3)])
+    assert len(versions) >= VECTORIZE_MIN_VERSIONS
+    requirements = ["9.1+", ">=2.0"]
+    expected = [index for index, version in enumerate(versions)
+                if all(satisfies(version, requirement) for requirement in requirements)]
+    assert filter_versions(versions, requirements) == expected
+    assert versions[expected[0]] == "9.1"
+    assert versions[expected[-1]] == "11.2"
+    assert filter_versions(versions[:4], ["1.1+"]) == [1, 2, 3]
+
+def test_cell_text():
+    assert cell_text(None) == ""
+    assert cell_text(float("nan")) == ""
+    assert cell_text(" 2.0 ") == "2.0"
+    assert cell_text(2.5) == "2.5"